@@ -1,16 +1,21 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
+from app.core.principal_cache import principal_cache
 from app.core.security import decode_access_token
 from app.db.session import get_db
 from app.models.user import User
+from app.schemas.user import Principal
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
+settings = get_settings()
 
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+async def get_current_user(db: AsyncSession = Depends(get_db), token: str = Depends(oauth2_scheme)) -> Principal:
     token_data = decode_access_token(token)
     if not token_data or not token_data.sub:
         raise HTTPException(
@@ -18,30 +23,41 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    user = db.query(User).filter(User.email == token_data.sub).first()
+
+    # Fast path: the signed claims carry the user id, so a warm cache answers
+    # without touching the database. Tokens issued before id was a claim fall
+    # through to the email lookup below.
+    if settings.auth_stateless and token_data.id is not None:
+        if token_data.is_active is False:
+            raise HTTPException(status_code=400, detail="Inactive user")
+        principal = principal_cache.get(token_data.id)
+        if principal is None:
+            user = await db.get(User, token_data.id)
+            if not user or user.email != token_data.sub:
+                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+            principal = Principal.model_validate(user)
+            principal_cache.put(principal)
+        return principal
+
+    user = await db.scalar(select(User).where(User.email == token_data.sub))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-    return user
+    return Principal.model_validate(user)
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+async def get_current_active_user(current_user: Principal = Depends(get_current_user)) -> Principal:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
 
-def get_current_admin(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_admin(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Admin access required")
     return current_user
 
 
-def get_current_referee(current_user: User = Depends(get_current_active_user)) -> User:
+async def get_current_referee(current_user: Principal = Depends(get_current_active_user)) -> Principal:
     if current_user.role != "referee":
         raise HTTPException(status_code=403, detail="Referee access required")
     return current_user
-
-
-
-
-
@@ -0,0 +1,78 @@
+import base64
+from datetime import datetime
+
+from fastapi import HTTPException
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.serialization import rows_as_dicts, schema_columns
+from app.models.match import Match
+from app.schemas.match import MatchOut
+from app.services.player_feed import feed_order
+
+
+def encode_cursor(scheduled_at: datetime | None, match_id: int) -> str:
+    raw = f"{scheduled_at.isoformat() if scheduled_at else ''}|{match_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime | None, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        scheduled_at, match_id = raw.split("|")
+        return (datetime.fromisoformat(scheduled_at) if scheduled_at else None), int(match_id)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+async def paginate_matches(
+    db: AsyncSession,
+    query: Select,
+    cursor: str | None,
+    limit: int,
+) -> ORJSONResponse:
+    """Keyset page over (scheduled_at, id), unscheduled matches last, as a MatchPage body.
+
+    Each page seeks straight to the cursor position through the
+    (scheduled_at, id) index, so deep pages cost the same as the first.
+    Only MatchOut's columns are selected and the rows go straight to orjson
+    (see app.core.serialization), so routes return this response as is.
+    """
+    if cursor:
+        scheduled_at, match_id = decode_cursor(cursor)
+        if scheduled_at is None:
+            query = query.where(Match.scheduled_at.is_(None), Match.id > match_id)
+        else:
+            query = query.where(or_(
+                Match.scheduled_at > scheduled_at,
+                and_(Match.scheduled_at == scheduled_at, Match.id > match_id),
+                Match.scheduled_at.is_(None),
+            ))
+
+    query = (
+        query.with_only_columns(*schema_columns(MatchOut, Match))
+        .order_by(Match.scheduled_at.asc().nulls_last(), Match.id.asc())
+        .limit(limit + 1)
+    )
+    rows = (await db.execute(query)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_cursor = encode_cursor(last.scheduled_at, last.id)
+    return ORJSONResponse({"items": rows_as_dicts(MatchOut, rows), "next_cursor": next_cursor})
+
+
+def paginate_rows(rows: list[dict], cursor: str | None, limit: int) -> ORJSONResponse:
+    """The same MatchPage as paginate_matches, over MatchOut rows already in memory and in feed order."""
+    if cursor:
+        scheduled_at, match_id = decode_cursor(cursor)
+        position = (scheduled_at is None, scheduled_at or 0, match_id)
+        rows = [row for row in rows if feed_order(row) > position]
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["scheduled_at"], rows[-1]["id"])
+    return ORJSONResponse({"items": rows, "next_cursor": next_cursor})
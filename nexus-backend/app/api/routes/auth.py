@@ -2,19 +2,21 @@ from datetime import timedelta
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_active_user
+from app.api.deps import get_current_active_user, get_current_admin
 from app.core.config import get_settings
-from app.core.security import (
-    create_access_token,
-    get_password_hash,
-    verify_password,
-)
+from app.core.hashing import password_hasher
+from app.core.http_cache import response_cache
+from app.core.invalidation import invalidate
+from app.core.principal_cache import principal_cache
+from app.core.security import create_access_token
 from app.db.session import get_db
 from app.models.user import User
 from app.models.player import Player
-from app.schemas.user import Token, UserCreate, UserOut
+from app.schemas.user import Principal, Token, UserCreate, UserOut
+from app.services.leaderboard import leaderboard
 
 
 router = APIRouter(prefix="/auth", tags=["auth"])
@@ -25,24 +27,26 @@ settings = get_settings()
 # REGISTER (JSON BODY)
 # =========================
 @router.post("/register", response_model=UserOut)
-def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
-    existing = db.query(User).filter(User.email == user_in.email).first()
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)) -> UserOut:
+    existing = await db.scalar(select(User).where(User.email == user_in.email))
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
         )
 
+    # bcrypt runs in the hasher pool; raises HasherBusy (503) when saturated
+    hashed_password = await password_hasher.hash(user_in.password)
     db_user = User(
         email=user_in.email,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         role=user_in.role,
         is_active=True,   # ✅ IMPORTANT (prevents response validation issues)
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     # Auto-create player profile if role is "player"
     if user_in.role == "player":
@@ -56,7 +60,11 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
             total_points=0,
         )
         db.add(player)
-        db.commit()
+        await db.flush()
+        invalidate(db, players=[player.id], responses=("players",))
+        await db.commit()
+        leaderboard.upsert(player.id, player_name, 0, 0, 0)
+        await response_cache.bump("players")
     
     return db_user
 
@@ -65,28 +73,37 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)) -> UserOut:
 # LOGIN (FORM DATA ONLY)
 # =========================
 @router.post("/login", response_model=Token)
-def login(
+async def login(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ) -> Token:
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
 
-    if not user or not verify_password(
-        form_data.password,
-        user.hashed_password,
-    ):
+    verified, new_hash = False, None
+    if user:
+        verified, new_hash = await password_hasher.verify_and_update(
+            form_data.password,
+            user.hashed_password,
+        )
+
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    # Stored hash predates the current bcrypt cost; upgrade it transparently
+    if new_hash:
+        user.hashed_password = new_hash
+        await db.commit()
+
     access_token_expires = timedelta(
         minutes=settings.access_token_expire_minutes
     )
 
     access_token = create_access_token(
-        data={"sub": user.email, "role": user.role},
+        data={"sub": user.email, "role": user.role, "id": user.id, "is_active": user.is_active},
         expires_delta=access_token_expires,
     )
 
@@ -101,7 +118,28 @@ def login(
 # CURRENT USER
 # =========================
 @router.get("/me", response_model=UserOut)
-def read_users_me(
-    current_user: User = Depends(get_current_active_user),
+async def read_users_me(
+    current_user: Principal = Depends(get_current_active_user),
 ) -> UserOut:
     return current_user
+
+
+# =========================
+# DEACTIVATE USER (ADMIN)
+# =========================
+@router.post("/users/{user_id}/deactivate", response_model=UserOut)
+async def deactivate_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin),
+) -> UserOut:
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    user.is_active = False
+    invalidate(db, principals=[user_id])
+    await db.commit()
+    # Drop the cached principal so the next request with this user's token reloads it
+    principal_cache.invalidate(user_id)
+    return user
@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+
+from fastapi import APIRouter, Depends
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_referee
+from app.db.session import get_db
+from app.models.match import Match
+from app.models.match_event import MatchEvent
+from app.models.player import Player
+from app.schemas.event import MatchEventAck, MatchEventBatch
+from app.services.live_scores import live_scores
+
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+def _naive_utc(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None) if value.tzinfo else value
+
+
+@router.post("", response_model=MatchEventAck, status_code=202)
+async def ingest_events(
+    batch: MatchEventBatch,
+    db: AsyncSession = Depends(get_db),
+    referee=Depends(get_current_referee),
+):
+    """Append live events from game servers; scores catch up within LIVE_FLUSH_MS"""
+    match_ids = {event.match_id for event in batch.events}
+    player_ids = {event.player_id for event in batch.events}
+    status = dict((await db.execute(select(Match.id, Match.status).where(Match.id.in_(match_ids)))).all())
+    known_players = set(await db.scalars(select(Player.id).where(Player.id.in_(player_ids))))
+
+    rejected: dict[int, str] = {}
+    for match_id in match_ids:
+        if match_id not in status:
+            rejected[match_id] = "Match not found"
+        elif status[match_id] != "Live":
+            rejected[match_id] = "Match is not live"
+    for event in batch.events:
+        if event.player_id not in known_players and event.match_id not in rejected:
+            rejected[event.match_id] = f"Player {event.player_id} not found"
+
+    received_at = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = [
+        {
+            "match_id": event.match_id,
+            "player_id": event.player_id,
+            "team": event.team,
+            "kind": event.kind,
+            "points": event.points,
+            "occurred_at": _naive_utc(event.occurred_at) if event.occurred_at else received_at,
+            "received_at": received_at,
+        }
+        for event in batch.events
+        if event.match_id not in rejected
+    ]
+    if rows:
+        # One multi-row INSERT for the batch; the aggregate is written behind (app.services.live_scores)
+        await db.execute(insert(MatchEvent), rows)
+        await db.commit()
+        live_scores.add(rows)
+    return MatchEventAck(accepted=len(rows), rejected=rejected)
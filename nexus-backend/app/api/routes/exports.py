@@ -0,0 +1,76 @@
+"""Streaming NDJSON / CSV exports of whole tables.
+
+Rows come off a server-side cursor (AsyncSession.stream) in fixed-size
+partitions and are encoded and flushed one partition at a time, so memory
+stays flat whatever the row count. The generator opens its own session,
+on a read replica when there is one, because the response body is still
+being produced after the route function has returned. For exports too big
+to hold a connection open, queue an "export" job instead (POST /jobs), which
+writes a file to download from GET /jobs/{id}/file.
+"""
+import csv
+import io
+from typing import AsyncIterator, Literal
+import zlib
+
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.api.deps import get_current_admin
+from app.db.session import read_router
+from app.services.exports import MEDIA_TYPES, PARTITION_ROWS, encode_partition, export_filename, export_query
+
+
+router = APIRouter(prefix="/exports", tags=["exports"])
+
+
+async def _encoded_rows(sessionmaker: async_sessionmaker, query: Select, format: str) -> AsyncIterator[bytes]:
+    async with sessionmaker() as db:
+        result = await db.stream(query.execution_options(yield_per=PARTITION_ROWS))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(columns)
+        async for partition in result.partitions():
+            encode_partition(buffer, writer, columns, partition, format)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+
+async def _gzipped(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31 = gzip container
+    async for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+@router.get("/{dataset}")
+async def export_dataset(
+    dataset: Literal["tournaments", "matches", "match-players", "players"],
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    tournament_id: int | None = None,
+    admin=Depends(get_current_admin),
+):
+    """Stream a full table as NDJSON or CSV, optionally gzipped and filtered to one tournament"""
+    sessionmaker = read_router.pick(request.headers.get("authorization"))
+    body = _encoded_rows(sessionmaker, export_query(dataset, tournament_id), format)
+    filename = export_filename(dataset, format, gzip)
+    media_type = MEDIA_TYPES[format]
+    if gzip:
+        body = _gzipped(body)
+        media_type = "application/gzip"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,45 @@
+import os
+
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_current_admin
+from app.core.instrumentation import profiler
+from app.db.pool_metrics import session_metrics
+from app.db.session import (
+    async_engine,
+    async_pool_metrics,
+    engine,
+    read_engines,
+    read_pool_metrics,
+    read_router,
+    sync_pool_metrics,
+)
+
+
+router = APIRouter(prefix="/internal", tags=["internal"])
+
+
+@router.get("/db-pool")
+async def get_db_pool_metrics(admin=Depends(get_current_admin)):
+    """Pool and session counters for this worker process (one entry per uvicorn worker)."""
+    return {
+        "pid": os.getpid(),
+        "sync": sync_pool_metrics.snapshot(engine.pool),
+        "async": async_pool_metrics.snapshot(async_engine.sync_engine.pool),
+        "read": [
+            metrics.snapshot(read_engine.sync_engine.pool)
+            for read_engine, metrics in zip(read_engines, read_pool_metrics)
+        ],
+        "routing": read_router.snapshot(),
+        "sessions": session_metrics.snapshot(),
+    }
+
+
+@router.get("/slow-requests")
+async def get_slow_requests(admin=Depends(get_current_admin)):
+    """Profiled requests slower than PROFILE_SLOW_MS, newest first, with SQL and collapsed stacks."""
+    return {
+        "pid": os.getpid(),
+        "enabled": profiler.enabled,
+        "requests": [slow.as_dict() for slow in reversed(profiler.slow)],
+    }
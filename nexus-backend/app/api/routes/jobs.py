@@ -0,0 +1,99 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import FileResponse, ORJSONResponse
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin
+from app.core.config import get_settings
+from app.db.session import get_db
+from app.models.job import Job
+from app.schemas.job import JOB_PARAMS, JobAccepted, JobOut, JobSubmit
+from app.schemas.user import Principal
+from app.services.jobs import request_cancel, submit_job
+
+
+settings = get_settings()
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+def job_accepted(job: Job, created: bool) -> ORJSONResponse:
+    """202 with the job to poll; also used by the admin routes that hand their work to a job."""
+    body = JobAccepted(**JobOut.model_validate(job).model_dump(), deduplicated=not created)
+    return ORJSONResponse(
+        status_code=202,
+        content=body.model_dump(mode="json"),
+        headers={"Location": f"{settings.api_v1_prefix}/jobs/{job.id}"},
+    )
+
+
+@router.post("", response_model=JobAccepted, status_code=202)
+async def create_job(
+    job_in: JobSubmit,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin),
+):
+    """Queue a background job; an identical queued or running job is returned instead of a new one"""
+    try:
+        params = JOB_PARAMS[job_in.kind].model_validate(job_in.params)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    job, created = await submit_job(db, job_in.kind, params, admin.id)
+    return job_accepted(job, created)
+
+
+@router.get("", response_model=list[JobOut])
+async def list_jobs(
+    status: str | None = None,
+    kind: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    """Most recent jobs first"""
+    query = select(Job).order_by(Job.id.desc()).limit(limit)
+    if status:
+        query = query.where(Job.status == status)
+    if kind:
+        query = query.where(Job.kind == kind)
+    return list(await db.scalars(query))
+
+
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(job_id: int, db: AsyncSession = Depends(get_db), admin=Depends(get_current_admin)):
+    """Status and progress of a job"""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=JobOut)
+async def cancel_job(job_id: int, db: AsyncSession = Depends(get_db), admin=Depends(get_current_admin)):
+    """Cancel a queued job, or ask a running one to stop; its writes are rolled back"""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not await request_cancel(db, job):
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return job
+
+
+@router.get("/{job_id}/file")
+async def download_job_file(job_id: int, db: AsyncSession = Depends(get_db), admin=Depends(get_current_admin)):
+    """The file a finished export job wrote"""
+    job = await db.get(Job, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    filename = (job.result or {}).get("file")
+    if job.status != "succeeded" or not filename:
+        raise HTTPException(status_code=404, detail="Job has no file")
+    path = os.path.join(settings.job_output_dir, filename)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=410, detail="Job file no longer available")
+    # A guessed type would label the gzip bytes text/csv; same type as the streaming export route
+    media_type = "application/gzip" if filename.endswith(".gz") else None
+    return FileResponse(path, filename=filename, media_type=media_type)
@@ -1,32 +1,54 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy import func, desc
-from sqlalchemy.orm import Session
+from typing import Literal
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.http_cache import response_cache
 from app.db.session import get_db
-from app.models.player import Player
+from app.services.leaderboard import leaderboard
 
 
 router = APIRouter(prefix="/leaderboard", tags=["leaderboard"])
 
 
 @router.get("")
-def get_leaderboard(db: Session = Depends(get_db)):
-    # Get all players ordered by total points (descending), then wins
-    players = db.query(Player).order_by(
-        desc(Player.total_points),
-        desc(Player.wins)
-    ).limit(50).all()
-    
-    leaderboard = []
-    for rank, player in enumerate(players, start=1):
-        leaderboard.append({
-            "rank": rank,
-            "player": player.player_name,
-            "wins": player.wins,
-            "losses": player.losses,
-            "points": player.total_points,
-            "player_id": player.id,
-        })
-    
-    return leaderboard
+async def get_leaderboard(
+    request: Request,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    by: Literal["points", "rating"] = "points",
+    db: AsyncSession = Depends(get_db),
+):
+    # Served from the in-memory rank index; the DB is only read to build it once
+    async def build():
+        await leaderboard.ensure_loaded(db)
+        return orjson.dumps(leaderboard.page(offset, limit, by))
+    return await response_cache.respond(request, ["players"], build)
+
+
+@router.get("/players/{player_id}")
+async def get_player_rank(
+    player_id: int,
+    by: Literal["points", "rating"] = "points",
+    db: AsyncSession = Depends(get_db),
+):
+    await leaderboard.ensure_loaded(db)
+    entry = leaderboard.entry_for(player_id, by)
+    if not entry:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return entry
+
 
+@router.get("/players/{player_id}/around")
+async def get_players_around(
+    player_id: int,
+    radius: int = Query(5, ge=0, le=100),
+    by: Literal["points", "rating"] = "points",
+    db: AsyncSession = Depends(get_db),
+):
+    await leaderboard.ensure_loaded(db)
+    players = leaderboard.around(player_id, radius, by)
+    if not players:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return players
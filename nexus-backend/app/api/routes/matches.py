@@ -1,159 +1,311 @@
-import secrets
 from datetime import datetime
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_admin, get_current_active_user
-from app.db.session import get_db
+from app.api.pagination import paginate_matches, paginate_rows
+from app.api.routes.jobs import job_accepted
+from app.core.config import get_settings
+from app.core.http_cache import response_cache
+from app.core.invalidation import invalidate
+from app.core.serialization import dump, rows_as_dicts, select_for
+from app.core.realtime import publish_match_diff
+from app.db.session import get_db, get_read_db
 from app.models.match import Match
+from app.models.team import Team
 from app.models.tournament import Tournament
-from app.models.user import User
-from app.schemas.match import MatchCreate, MatchOut, MatchUpdate, MatchResult, RoomCodeValidate
+from app.schemas.match import (
+    MatchCreate,
+    MatchOut,
+    MatchPage,
+    MatchResult,
+    MatchUpdate,
+    RoomCodeAllocate,
+    ScheduleReport,
+    ScheduleRequest,
+)
+from app.schemas.job import FixturesJobParams, JobAccepted
 from app.schemas.tournament import GenerateFixtures
+from app.schemas.user import Principal
+from app.services.fixtures import generate_tournament_fixtures
+from app.services.jobs import submit_job
+from app.services.player_feed import match_row, player_feed
+from app.services.room_codes import RoomCodesExhausted, room_codes
+from app.services.scheduler import plan_schedule, set_match_slot
+from app.services.teams import team_count
 
 
-router = APIRouter(prefix="/matches", tags=["matches"])
-
+settings = get_settings()
 
-def generate_room_code() -> str:
-    """Generate a 6-character alphanumeric room code"""
-    return secrets.token_urlsafe(6).upper()[:6]
+router = APIRouter(prefix="/matches", tags=["matches"])
 
 
-@router.get("", response_model=list[MatchOut])
-def list_matches(
+@router.get("", response_model=MatchPage)
+async def list_matches(
     tournament_id: int | None = None,
-    db: Session = Depends(get_db),
+    status: str | None = None,
+    team: str | None = None,
+    team_id: int | None = None,
+    scheduled_from: datetime | None = None,
+    scheduled_to: datetime | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    query = db.query(Match)
+    query = select(Match)
     if tournament_id:
-        query = query.filter(Match.tournament_id == tournament_id)
-    return query.all()
+        query = query.where(Match.tournament_id == tournament_id)
+    if status:
+        query = query.where(Match.status == status)
+    if team:
+        query = query.where(or_(Match.team1_name == team, Match.team2_name == team))
+    if team_id:
+        query = query.where(or_(Match.team1_id == team_id, Match.team2_id == team_id))
+    if scheduled_from:
+        query = query.where(Match.scheduled_at >= scheduled_from)
+    if scheduled_to:
+        query = query.where(Match.scheduled_at < scheduled_to)
+    return await paginate_matches(db, query, cursor, limit)
 
 
 @router.get("/{match_id}", response_model=MatchOut)
-def get_match(match_id: int, db: Session = Depends(get_db)):
-    match = db.query(Match).filter(Match.id == match_id).first()
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
-    return match
+async def get_match(match_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        match = await db.get(Match, match_id)
+        if not match:
+            raise HTTPException(status_code=404, detail="Match not found")
+        return dump(MatchOut, match)
+    return await response_cache.respond(request, ["matches"], build)
 
 
 @router.post("", response_model=MatchOut)
-def create_match(
+async def create_match(
     match_in: MatchCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
     # Verify tournament exists
-    tournament = db.query(Tournament).filter(Tournament.id == match_in.tournament_id).first()
+    tournament = await db.get(Tournament, match_in.tournament_id)
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
+    team_ids = {team_id for team_id in (match_in.team1_id, match_in.team2_id) if team_id is not None}
+    if team_ids:
+        found = set(await db.scalars(
+            select(Team.id).where(Team.id.in_(team_ids), Team.tournament_id == match_in.tournament_id)
+        ))
+        if found != team_ids:
+            raise HTTPException(status_code=404, detail="Team not found in this tournament")
     
     match = Match(**match_in.model_dump())
     db.add(match)
-    db.commit()
-    db.refresh(match)
+    invalidate(db, teams=team_ids, responses=("matches",))
+    await db.commit()
+    await db.refresh(match)
+    await response_cache.bump("matches")
+    player_feed.add_matches([match_row(match)])
     return match
 
 
-@router.post("/generate-fixtures", response_model=list[MatchOut])
-def generate_fixtures(
+@router.post(
+    "/generate-fixtures",
+    response_model=list[MatchOut],
+    responses={202: {"model": JobAccepted, "description": "Large field: generated by a background job"}},
+)
+async def generate_fixtures(
     fixtures_in: GenerateFixtures,
-    db: Session = Depends(get_db),
-    admin=Depends(get_current_admin),
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin),
 ):
-    tournament = db.query(Tournament).filter(Tournament.id == fixtures_in.tournament_id).first()
+    tournament = await db.get(Tournament, fixtures_in.tournament_id)
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
+    default_teams = tournament.number_of_teams or 16
     
-    num_teams = tournament.number_of_teams or 16
+    if await team_count(db, tournament.id, default_teams) > settings.fixtures_inline_max_teams:
+        params = FixturesJobParams(tournament_id=tournament.id, format=fixtures_in.format)
+        return job_accepted(*await submit_job(db, "fixtures", params, admin.id))
     
-    # Simple single elimination bracket generation
-    matches = []
-    round_num = 1
-    teams_remaining = num_teams
+    try:
+        matches = await db.run_sync(generate_tournament_fixtures, tournament.id, fixtures_in.format, default_teams)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    invalidate(
+        db,
+        teams={team_id for match in matches for team_id in (match.team1_id, match.team2_id) if team_id is not None},
+        responses=("matches",),
+    )
+    await db.commit()
+    await response_cache.bump("matches")
+    player_feed.add_matches([match_row(match) for match in matches])
     
-    while teams_remaining > 1:
-        matches_in_round = teams_remaining // 2
-        for i in range(matches_in_round):
-            match = Match(
-                tournament_id=tournament.id,
-                team1_name=f"Team {i * 2 + 1}",
-                team2_name=f"Team {i * 2 + 2}",
-                status="Scheduled",
-            )
-            matches.append(match)
-        
-        teams_remaining = matches_in_round
-        round_num += 1
+    return matches
+
+
+@router.post("/schedule", response_model=ScheduleReport)
+async def schedule_matches(
+    schedule_in: ScheduleRequest,
+    apply: bool = False,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    """Assign times and stations to a tournament's matches; `apply` writes them"""
+    if not await db.get(Tournament, schedule_in.tournament_id):
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    rows = rows_as_dicts(MatchOut, (await db.execute(
+        select_for(MatchOut, Match).where(Match.tournament_id == schedule_in.tournament_id)
+    )).all())
     
-    db.add_all(matches)
-    db.commit()
-    for match in matches:
-        db.refresh(match)
+    try:
+        # CPU-bound over the whole field, so keep it off the event loop
+        placements, report = await run_in_threadpool(
+            plan_schedule,
+            rows,
+            schedule_in.stations,
+            [(window.start, window.end) for window in schedule_in.windows],
+            schedule_in.match_minutes,
+            schedule_in.rest_minutes,
+            schedule_in.reschedule,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return matches
+    if apply and placements:
+        # One executemany for the whole field
+        await db.execute(set_match_slot, [
+            {"b_match_id": p.match_id, "b_scheduled_at": p.scheduled_at, "b_station": p.station}
+            for p in placements
+        ])
+        invalidate(db, matches=[p.match_id for p in placements], responses=("matches",))
+        await db.commit()
+        await response_cache.bump("matches")
+        by_id = {row["id"]: row for row in rows}
+        for p in placements:
+            row = by_id[p.match_id]
+            row.update(scheduled_at=p.scheduled_at, station=p.station)
+            player_feed.update_match(row)
+            publish_match_diff(p.match_id, row["tournament_id"], {"scheduled_at": p.scheduled_at, "station": p.station})
+        report["applied"] = True
+    return report
 
 
 @router.put("/{match_id}/room-code", response_model=MatchOut)
-def generate_room_code_for_match(
+async def generate_room_code_for_match(
     match_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
-    match = db.query(Match).filter(Match.id == match_id).first()
+    match = await db.get(Match, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
+    if match.status == "Completed":
+        raise HTTPException(status_code=400, detail="Match is already completed")
     
-    # Generate unique room code
-    while True:
-        code = generate_room_code()
-        existing = db.query(Match).filter(Match.room_code == code).first()
-        if not existing:
-            break
-    
-    match.room_code = code
-    db.commit()
-    db.refresh(match)
+    invalidate(db, matches=[match.id], responses=("matches",))
+    try:
+        await room_codes.allocate(db, [match.id])
+    except RoomCodesExhausted as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    await db.commit()
+    await db.refresh(match)
+    await response_cache.bump("matches")
+    player_feed.update_match(match_row(match))
+    publish_match_diff(match.id, match.tournament_id, {"room_code": match.room_code})
     return match
 
 
+@router.post("/room-codes", response_model=list[MatchOut])
+async def allocate_round_room_codes(
+    selection: RoomCodeAllocate,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    """Give every open match of a tournament round that has no code one, in a single write"""
+    query = select(Match).where(
+        Match.tournament_id == selection.tournament_id,
+        Match.room_code.is_(None),
+        Match.status != "Completed",
+    )
+    if selection.round_number is not None:
+        query = query.where(Match.round_number == selection.round_number)
+    if selection.bracket is not None:
+        query = query.where(Match.bracket == selection.bracket)
+    match_ids = (await db.scalars(query.with_only_columns(Match.id).order_by(Match.id))).all()
+    
+    invalidate(db, matches=match_ids, responses=("matches",))
+    try:
+        await room_codes.allocate(db, list(match_ids))
+    except RoomCodesExhausted as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    await db.commit()
+    await response_cache.bump("matches")
+    matches = (await db.scalars(
+        select(Match).where(Match.id.in_(match_ids)).order_by(Match.id)
+        .execution_options(populate_existing=True)
+    )).all() if match_ids else []
+    for match in matches:
+        player_feed.update_match(match_row(match))
+        publish_match_diff(match.id, match.tournament_id, {"room_code": match.room_code})
+    return matches
+
+
 @router.put("/{match_id}", response_model=MatchOut)
-def update_match(
+async def update_match(
     match_id: int,
     match_in: MatchUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
-    match = db.query(Match).filter(Match.id == match_id).first()
+    match = await db.get(Match, match_id)
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
     
     update_data = match_in.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(match, field, value)
+    if match.status == "Completed" and match.room_code is not None:
+        # Completed matches hand their room code back for reuse
+        match.room_code = None
+        update_data["room_code"] = None
     
-    db.commit()
-    db.refresh(match)
+    # Members of a newly assigned team don't have this match in their feeds yet
+    new_teams = [update_data[field] for field in ("team1_id", "team2_id") if update_data.get(field) is not None]
+    invalidate(db, matches=[match.id], teams=new_teams, responses=("matches",))
+    await db.commit()
+    if match.room_code is None:
+        room_codes.release(match.id)
+    await db.refresh(match)
+    await response_cache.bump("matches")
+    player_feed.update_match(match_row(match))
+    if update_data:
+        publish_match_diff(match.id, match.tournament_id, update_data)
     return match
 
 
-@router.get("/player/my-matches", response_model=list[MatchOut])
-def get_my_matches(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+@router.get("/player/my-matches", response_model=MatchPage)
+async def get_my_matches(
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
 ):
-    # For now, return all matches. Later, filter by player's team
-    return db.query(Match).filter(Match.status.in_(["Scheduled", "Live"])).all()
+    """Scheduled and Live matches of the teams the current player is on"""
+    # The feed cache is filled from here, so this reads the primary (see get_read_db)
+    player_id = await player_feed.player_id_for(db, current_user.id)
+    rows = await player_feed.get(db, player_id) if player_id is not None else []
+    return paginate_rows(rows, cursor, limit)
 
 
-@router.get("/player/fixtures/{tournament_id}", response_model=list[MatchOut])
-def get_tournament_fixtures(
+@router.get("/player/fixtures/{tournament_id}", response_model=MatchPage)
+async def get_tournament_fixtures(
     tournament_id: int,
-    db: Session = Depends(get_db),
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return db.query(Match).filter(Match.tournament_id == tournament_id).all()
+    query = select(Match).where(Match.tournament_id == tournament_id)
+    return await paginate_matches(db, query, cursor, limit)
 
 
@@ -1,58 +1,138 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.api.deps import get_current_active_user
-from app.db.session import get_db
+from app.api.deps import get_current_active_user, get_current_admin
+from app.api.pagination import decode_cursor, encode_cursor
+from app.api.routes.jobs import job_accepted
+from app.core.http_cache import response_cache
+from app.core.invalidation import invalidate
+from app.core.serialization import dump, dump_rows, select_for
+from app.db.session import get_db, get_read_db
 from app.models.player import Player
-from app.models.user import User
-from app.schemas.player import PlayerOut, PlayerCreate
+from app.schemas.job import JobAccepted, RerateJobParams, StatsRebuildJobParams
+from app.schemas.player import PlayerCreate, PlayerHistoryPage, PlayerOut, PlayerProfile
+from app.schemas.user import Principal
+from app.services.history import player_history
+from app.services.jobs import submit_job
+from app.services.leaderboard import leaderboard
 
 
 router = APIRouter(prefix="/players", tags=["players"])
 
 
 @router.get("", response_model=list[PlayerOut])
-def list_players(db: Session = Depends(get_db)):
+async def list_players(request: Request, db: AsyncSession = Depends(get_db)):
     """Get all players"""
-    return db.query(Player).all()
+    async def build():
+        return dump_rows(PlayerOut, (await db.execute(select_for(PlayerOut, Player).order_by(Player.id))).all())
+    return await response_cache.respond(request, ["players"], build)
 
 
 @router.get("/me", response_model=PlayerOut | None)
-def get_my_player(
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+async def get_my_player(
+    current_user: Principal = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get current user's player profile"""
     if current_user.role != "player":
         return None
-    return db.query(Player).filter(Player.user_id == current_user.id).first()
+    return await db.scalar(select(Player).where(Player.user_id == current_user.id))
 
 
 @router.post("", response_model=PlayerOut)
-def create_player(
+async def create_player(
     player_in: PlayerCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
     """Create a player profile (usually called when user registers as player)"""
     # Check if player already exists for this user
-    existing = db.query(Player).filter(Player.user_id == player_in.user_id).first()
+    existing = await db.scalar(select(Player).where(Player.user_id == player_in.user_id))
     if existing:
         return existing
     
     player = Player(**player_in.model_dump())
     db.add(player)
-    db.commit()
-    db.refresh(player)
+    await db.flush()
+    invalidate(db, players=[player.id], responses=("players",))
+    await db.commit()
+    await db.refresh(player)
+    leaderboard.upsert(player.id, player.player_name, player.wins, player.losses, player.total_points)
+    await response_cache.bump("players")
     return player
 
 
+@router.post("/stats/rebuild", response_model=JobAccepted, status_code=202)
+async def rebuild_stats(
+    apply: bool = False,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin),
+):
+    """Queue a recompute of player stats from match results; the job's result reports drift, `apply` writes the fix"""
+    # Streams and crunches the whole match_players table, so it runs as a background job
+    return job_accepted(*await submit_job(db, "stats_rebuild", StatsRebuildJobParams(apply=apply), admin.id))
+
+
+@router.post("/ratings/replay", response_model=JobAccepted, status_code=202)
+async def replay_ratings(
+    apply: bool = False,
+    db: AsyncSession = Depends(get_db),
+    admin: Principal = Depends(get_current_admin),
+):
+    """Queue a re-rate of every completed match in order; `apply` writes the new ratings"""
+    return job_accepted(*await submit_job(db, "rerate", RerateJobParams(apply=apply), admin.id))
+
+
 @router.get("/{player_id}", response_model=PlayerOut)
-def get_player(player_id: int, db: Session = Depends(get_db)):
+async def get_player(player_id: int, request: Request, db: AsyncSession = Depends(get_db)):
     """Get a specific player"""
-    player = db.query(Player).filter(Player.id == player_id).first()
-    if not player:
-        from fastapi import HTTPException
-        raise HTTPException(status_code=404, detail="Player not found")
-    return player
+    async def build():
+        player = await db.get(Player, player_id)
+        if not player:
+            raise HTTPException(status_code=404, detail="Player not found")
+        return dump(PlayerOut, player)
+    return await response_cache.respond(request, ["players"], build)
+
+
+@router.get("/{player_id}/history", response_model=PlayerHistoryPage)
+async def get_player_history(
+    player_id: int,
+    request: Request,
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+):
+    """Completed matches of a player, newest first (by scheduled time), with lineups and results"""
+    before = decode_cursor(cursor) if cursor else None
+
+    async def build():
+        if not await db.scalar(select(Player.id).where(Player.id == player_id)):
+            raise HTTPException(status_code=404, detail="Player not found")
+        entries, next_key = await player_history(db, player_id, before, limit)
+        return dump(PlayerHistoryPage, PlayerHistoryPage(
+            items=entries,
+            next_cursor=encode_cursor(*next_key) if next_key is not None else None,
+        ))
+    return await response_cache.respond(request, ["players", "matches"], build)
+
 
+@router.get("/{player_id}/profile", response_model=PlayerProfile)
+async def get_player_profile(player_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    """Player stats, leaderboard positions and the last 10 matches"""
+    async def build():
+        player = await db.get(Player, player_id)
+        if not player:
+            raise HTTPException(status_code=404, detail="Player not found")
+        recent, _ = await player_history(db, player_id, limit=10)
+        await leaderboard.ensure_loaded(db)
+        played = player.wins + player.losses
+        return dump(PlayerProfile, PlayerProfile(
+            **PlayerOut.model_validate(player).model_dump(),
+            matches_played=played,
+            win_rate=round(player.wins / played, 4) if played else 0.0,
+            rank=leaderboard.rank_of(player_id),
+            rating_rank=leaderboard.rank_of(player_id, "rating"),
+            recent_matches=recent,
+        ))
+    return await response_cache.respond(request, ["players", "matches"], build)
 
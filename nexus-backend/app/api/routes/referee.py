@@ -1,132 +1,134 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_referee
-from app.db.session import get_db
+from app.core.http_cache import response_cache
+from app.core.invalidation import invalidate
+from app.core.realtime import publish_leaderboard_entries, publish_match_diff
+from app.db.session import get_db, get_read_db
 from app.models.match import Match
-from app.models.match_player import MatchPlayer
 from app.models.player import Player
-from app.schemas.match import RoomCodeValidate, MatchOut
+from app.schemas.match import MatchOut, MatchResultBatch, MatchResultBatchOutcome, RoomCodeValidate
 from app.schemas.player import MatchResultWithScores
+from app.services.leaderboard import leaderboard
+from app.services.live_scores import live_scores
+from app.services.player_feed import player_feed
+from app.services.results import record_results
+from app.services.room_codes import room_codes
 
 
 router = APIRouter(prefix="/referee", tags=["referee"])
 
 
 @router.post("/validate-code", response_model=MatchOut)
-def validate_match_code(
+async def validate_match_code(
     code_data: RoomCodeValidate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     referee=Depends(get_current_referee),
 ):
-    match = db.query(Match).filter(Match.room_code == code_data.code.upper()).first()
+    code = code_data.code.strip().upper()
+    match_id = await room_codes.lookup(db, code)
+    match = await db.get(Match, match_id) if match_id is not None else None
+    if match is not None and match.room_code != code:
+        # Stale entry: another worker recycled or moved the code
+        room_codes.release(match.id)
+        match_id = await room_codes.lookup(db, code)
+        match = await db.get(Match, match_id) if match_id is not None else None
     if not match:
         raise HTTPException(status_code=404, detail="Invalid match code")
     return match
 
 
+async def _after_results(db: AsyncSession, matches: list[Match], player_ids: set[int]) -> None:
+    """Post-commit fan-out: caches, leaderboard and live viewers."""
+    for match in matches:
+        room_codes.release(match.id)
+    player_feed.remove_matches([match.id for match in matches])
+    ranked = (await db.execute(
+        select(Player.id, Player.player_name, Player.wins, Player.losses, Player.total_points, Player.rating)
+        .where(Player.id.in_(player_ids))
+    )).all() if player_ids else []
+    for entry in ranked:
+        leaderboard.upsert(*entry)
+    await response_cache.bump("matches", "players")
+
+    for match in matches:
+        publish_match_diff(match.id, match.tournament_id, {
+            "status": match.status,
+            "score_team1": match.score_team1,
+            "score_team2": match.score_team2,
+            "room_code": None,
+        })
+    publish_leaderboard_entries([
+        entry for entry in (leaderboard.entry_for(player_id) for player_id, *_ in ranked) if entry
+    ])
+
+
 @router.post("/matches/{match_id}/result", response_model=MatchOut)
-def submit_match_result(
+async def submit_match_result(
     match_id: int,
     result: MatchResultWithScores,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     referee=Depends(get_current_referee),
 ):
-    match = db.query(Match).filter(Match.id == match_id).first()
-    if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
-    
-    # Validate that player scores sum to match scores
-    team1_sum = sum(p.score for p in result.team1_players)
-    team2_sum = sum(p.score for p in result.team2_players)
+    # Waits for a flush of this worker already writing the match (SQLite ignores its row lock)
+    await live_scores.flush([match_id])
+    [outcome], player_ids = await record_results(db, [(match_id, result)])
+    if outcome.error:
+        raise HTTPException(status_code=outcome.status_code, detail=outcome.error)
     
-    if team1_sum != result.score_team1:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Team 1 player scores ({team1_sum}) do not match match score ({result.score_team1})"
-        )
-    
-    if team2_sum != result.score_team2:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Team 2 player scores ({team2_sum}) do not match match score ({result.score_team2})"
+    invalidate(db, matches=[match_id], players=player_ids, responses=("matches", "players"))
+    await db.commit()
+    await _after_results(db, [outcome.match], player_ids)
+    return outcome.match
+
+
+@router.post("/matches/results", response_model=list[MatchResultBatchOutcome])
+async def submit_match_results(
+    batch: MatchResultBatch,
+    db: AsyncSession = Depends(get_db),
+    referee=Depends(get_current_referee),
+):
+    """Submit many results at once; valid ones are applied together in one transaction"""
+    await live_scores.flush([item.match_id for item in batch.results])
+    outcomes, player_ids = await record_results(
+        db, [(item.match_id, item) for item in batch.results]
+    )
+    recorded = [outcome.match for outcome in outcomes if outcome.error is None]
+    if recorded:
+        invalidate(db, matches=[match.id for match in recorded], players=player_ids, responses=("matches", "players"))
+        await db.commit()
+        await _after_results(db, recorded, player_ids)
+    return [
+        MatchResultBatchOutcome(
+            match_id=outcome.match_id,
+            ok=outcome.error is None,
+            status_code=outcome.status_code,
+            error=outcome.error,
+            match=outcome.match,
         )
-    
-    # Validate all players exist
-    all_player_ids = [p.player_id for p in result.team1_players] + [p.player_id for p in result.team2_players]
-    players = db.query(Player).filter(Player.id.in_(all_player_ids)).all()
-    if len(players) != len(all_player_ids):
-        raise HTTPException(status_code=404, detail="One or more players not found")
-    
-    # Update match scores
-    match.score_team1 = result.score_team1
-    match.score_team2 = result.score_team2
-    match.status = "Completed"
-    
-    # Delete existing player scores for this match (in case of resubmission)
-    db.query(MatchPlayer).filter(MatchPlayer.match_id == match_id).delete()
-    
-    # Create match player scores
-    match_players = []
-    for player_score in result.team1_players:
-        match_players.append(MatchPlayer(
-            match_id=match_id,
-            player_id=player_score.player_id,
-            team="team1",
-            score=player_score.score
-        ))
-    
-    for player_score in result.team2_players:
-        match_players.append(MatchPlayer(
-            match_id=match_id,
-            player_id=player_score.player_id,
-            team="team2",
-            score=player_score.score
-        ))
-    
-    db.add_all(match_players)
-    
-    # Update player stats
-    winner_team = "team1" if result.score_team1 > result.score_team2 else "team2"
-    
-    for player_score in result.team1_players:
-        player = db.query(Player).filter(Player.id == player_score.player_id).first()
-        if player:
-            player.total_points += player_score.score
-            if winner_team == "team1":
-                player.wins += 1
-            else:
-                player.losses += 1
-    
-    for player_score in result.team2_players:
-        player = db.query(Player).filter(Player.id == player_score.player_id).first()
-        if player:
-            player.total_points += player_score.score
-            if winner_team == "team2":
-                player.wins += 1
-            else:
-                player.losses += 1
-    
-    db.commit()
-    db.refresh(match)
-    return match
+        for outcome in outcomes
+    ]
 
 
 @router.get("/pending-matches", response_model=list[MatchOut])
-def get_pending_matches(
+async def get_pending_matches(
     referee=Depends(get_current_referee),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return db.query(Match).filter(
+    return (await db.scalars(select(Match).where(
         Match.status.in_(["Scheduled", "Live"]),
         Match.room_code.isnot(None)
-    ).all()
+    ))).all()
 
 
 @router.get("/completed-matches", response_model=list[MatchOut])
-def get_completed_matches(
+async def get_completed_matches(
     referee=Depends(get_current_referee),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
-    return db.query(Match).filter(Match.status == "Completed").order_by(Match.scheduled_at.desc()).limit(10).all()
+    return (await db.scalars(
+        select(Match).where(Match.status == "Completed").order_by(Match.scheduled_at.desc()).limit(10)
+    )).all()
 
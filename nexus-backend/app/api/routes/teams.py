@@ -0,0 +1,81 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.deps import get_current_admin
+from app.core.invalidation import invalidate
+from app.db.session import get_db, get_read_db
+from app.models.team import Team
+from app.models.team_member import TeamMember
+from app.models.tournament import Tournament
+from app.schemas.team import TeamCreate, TeamMembersUpdate, TeamOut
+from app.services.player_feed import player_feed
+from app.services.teams import missing_players, replace_roster, roster_ids
+
+
+router = APIRouter(prefix="/teams", tags=["teams"])
+
+
+def _team_out(team: Team, player_ids: list[int]) -> TeamOut:
+    return TeamOut(id=team.id, tournament_id=team.tournament_id, name=team.name, seed=team.seed, player_ids=player_ids)
+
+
+@router.get("", response_model=list[TeamOut])
+async def list_teams(tournament_id: int, db: AsyncSession = Depends(get_read_db)):
+    """A tournament's teams in seed order, with their rosters"""
+    teams = list(await db.scalars(
+        select(Team).where(Team.tournament_id == tournament_id).order_by(Team.seed.asc().nulls_last(), Team.id)
+    ))
+    rosters = await roster_ids(db, [team.id for team in teams])
+    return [_team_out(team, rosters[team.id]) for team in teams]
+
+
+@router.post("", response_model=TeamOut)
+async def create_team(
+    team_in: TeamCreate,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    if not await db.get(Tournament, team_in.tournament_id):
+        raise HTTPException(status_code=404, detail="Tournament not found")
+    player_ids = list(dict.fromkeys(team_in.player_ids))
+    if await missing_players(db, set(player_ids)):
+        raise HTTPException(status_code=404, detail="One or more players not found")
+
+    team = Team(tournament_id=team_in.tournament_id, name=team_in.name, seed=team_in.seed)
+    db.add(team)
+    try:
+        await db.flush()
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="Team name already used in this tournament")
+    if player_ids:
+        await db.execute(insert(TeamMember), [{"team_id": team.id, "player_id": pid} for pid in player_ids])
+    invalidate(db, feeds=player_ids)
+    await db.commit()
+    # Their cached feeds don't know about the new team
+    player_feed.evict_players(player_ids)
+    return _team_out(team, player_ids)
+
+
+@router.put("/{team_id}/members", response_model=TeamOut)
+async def update_team_members(
+    team_id: int,
+    members_in: TeamMembersUpdate,
+    db: AsyncSession = Depends(get_db),
+    admin=Depends(get_current_admin),
+):
+    """Replace the team's roster"""
+    team = await db.get(Team, team_id)
+    if not team:
+        raise HTTPException(status_code=404, detail="Team not found")
+    player_ids = list(dict.fromkeys(members_in.player_ids))
+    if await missing_players(db, set(player_ids)):
+        raise HTTPException(status_code=404, detail="One or more players not found")
+
+    previous = await replace_roster(db, team.id, player_ids)
+    invalidate(db, feeds={*previous, *player_ids})
+    await db.commit()
+    player_feed.evict_players({*previous, *player_ids})
+    return _team_out(team, player_ids)
@@ -1,7 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.api.deps import get_current_admin
+from app.core.http_cache import response_cache
+from app.core.invalidation import invalidate
+from app.core.serialization import dump, dump_rows, select_for
 from app.db.session import get_db
 from app.models.tournament import Tournament
 from app.schemas.tournament import TournamentCreate, TournamentOut, TournamentUpdate, GenerateFixtures
@@ -11,39 +14,48 @@ router = APIRouter(prefix="/tournaments", tags=["tournaments"])
 
 
 @router.get("", response_model=list[TournamentOut])
-def list_tournaments(db: Session = Depends(get_db)):
-    return db.query(Tournament).all()
+async def list_tournaments(request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        return dump_rows(
+            TournamentOut,
+            (await db.execute(select_for(TournamentOut, Tournament).order_by(Tournament.id))).all(),
+        )
+    return await response_cache.respond(request, ["tournaments"], build)
 
 
 @router.post("", response_model=TournamentOut)
-def create_tournament(
+async def create_tournament(
     tournament_in: TournamentCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
     tournament = Tournament(**tournament_in.model_dump())
     db.add(tournament)
-    db.commit()
-    db.refresh(tournament)
+    invalidate(db, responses=("tournaments",))
+    await db.commit()
+    await db.refresh(tournament)
+    await response_cache.bump("tournaments")
     return tournament
 
 
 @router.get("/{tournament_id}", response_model=TournamentOut)
-def get_tournament(tournament_id: int, db: Session = Depends(get_db)):
-    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-    if not tournament:
-        raise HTTPException(status_code=404, detail="Tournament not found")
-    return tournament
+async def get_tournament(tournament_id: int, request: Request, db: AsyncSession = Depends(get_db)):
+    async def build():
+        tournament = await db.get(Tournament, tournament_id)
+        if not tournament:
+            raise HTTPException(status_code=404, detail="Tournament not found")
+        return dump(TournamentOut, tournament)
+    return await response_cache.respond(request, ["tournaments"], build)
 
 
 @router.put("/{tournament_id}", response_model=TournamentOut)
-def update_tournament(
+async def update_tournament(
     tournament_id: int,
     tournament_in: TournamentUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     admin=Depends(get_current_admin),
 ):
-    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
+    tournament = await db.get(Tournament, tournament_id)
     if not tournament:
         raise HTTPException(status_code=404, detail="Tournament not found")
     
@@ -51,8 +63,10 @@ def update_tournament(
     for field, value in update_data.items():
         setattr(tournament, field, value)
     
-    db.commit()
-    db.refresh(tournament)
+    invalidate(db, responses=("tournaments",))
+    await db.commit()
+    await db.refresh(tournament)
+    await response_cache.bump("tournaments")
     return tournament
 
 
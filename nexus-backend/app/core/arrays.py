@@ -0,0 +1,7 @@
+"""NumPy helpers for the vectorized offline passes (stats rebuild, rating replay)."""
+import numpy as np
+
+
+def rows_to_array(rows, columns: int, dtype=np.int64) -> np.ndarray:
+    """Result rows as a 2-D array (plain tuples; NumPy is slow on Row objects)."""
+    return np.array([tuple(row) for row in rows], dtype=dtype).reshape(-1, columns)
@@ -0,0 +1,76 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor
+import threading
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.core.config import get_settings
+from app.core.security import get_password_hash, verify_and_update_password
+
+
+settings = get_settings()
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing queue is full; callers should retry later."""
+
+    def __init__(self, retry_after: int) -> None:
+        super().__init__("Password hashing is saturated")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool with a bounded backlog.
+
+    bcrypt holds a core for a few hundred ms per call. Running it in worker
+    processes keeps it off the event loop and the request threadpool, and the
+    pending cap turns a login storm into fast 503s instead of a queue that
+    starves every other endpoint.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int) -> None:
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor: Executor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    async def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HasherBusy(self.retry_after)
+            self._pending += 1
+        try:
+            if self.workers <= 0:
+                return await run_in_threadpool(fn, *args)
+            future = self._get_executor().submit(fn, *args)
+            return await asyncio.wrap_future(future)
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> tuple[bool, str | None]:
+        return await self._run(verify_and_update_password, password, hashed_password)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+    retry_after=settings.password_hash_retry_after,
+)
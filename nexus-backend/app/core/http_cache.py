@@ -0,0 +1,187 @@
+"""Versioned response cache with strong ETags for read-heavy GET routes.
+
+Every cached route names the data namespaces it reads ("tournaments",
+"matches", "players"). Write routes bump those namespaces' version counters
+after they commit. The ETag is a hash of the route, its query string and
+the current versions (plus a per-process epoch for the local backend,
+whose counters restart at 0 in every worker), so:
+
+- a client sending the current ETag in If-None-Match gets a 304 without the
+  route touching the database;
+- the encoded body is stored under the ETag, so a repeat read costs one
+  cache lookup, and entries for old versions just age out of the LRU.
+
+The backend is pluggable: an in-process LRU (default) or a shared store
+(Redis, or the in-memory stand-in used for tests) so versions and bodies
+are shared across workers.
+"""
+from collections import OrderedDict
+import hashlib
+import secrets
+import time
+from typing import Awaitable, Callable
+
+from fastapi import Request, Response
+
+from app.core.config import get_settings
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # optional dependency, only needed for http_cache_backend="redis"
+    redis_asyncio = None
+
+
+settings = get_settings()
+
+
+class LocalLRUBackend:
+    """Per-process cache; versions are local to the worker."""
+
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        # Counters start at 0 in every process, so version 3 here and version 3 in another
+        # worker (or before a restart) are different bodies; the epoch keeps their ETags apart
+        self.epoch = secrets.token_hex(8)
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def versions(self, namespaces: list[str]) -> list[int]:
+        # setdefault, so bump_local(None) knows every namespace a cached body depends on
+        return [self._versions.setdefault(namespace, 0) for namespace in namespaces]
+
+    async def bump(self, namespace: str) -> None:
+        self._versions[namespace] = self._versions.get(namespace, 0) + 1
+
+
+class InMemorySharedStore:
+    """Stand-in for a Redis client (get/set/mget/incr) for tests and single-node runs."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, tuple[bytes, float | None]] = {}
+
+    def _live(self, key: str) -> bytes | None:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        value, expires = item
+        if expires is not None and expires < time.monotonic():
+            del self._data[key]
+            return None
+        return value
+
+    async def get(self, key: str) -> bytes | None:
+        return self._live(key)
+
+    async def mget(self, keys: list[str]) -> list[bytes | None]:
+        return [self._live(key) for key in keys]
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self._data[key] = (value, time.monotonic() + ex if ex else None)
+
+    async def incr(self, key: str) -> int:
+        value = int(self._live(key) or 0) + 1
+        self._data[key] = (str(value).encode(), None)
+        return value
+
+
+class SharedStoreBackend:
+    """Cache over a Redis-compatible client, shared by every worker."""
+
+    def __init__(self, client, prefix: str = "nexus:http:") -> None:
+        self.client = client
+        self.prefix = prefix
+        self.epoch = ""  # versions are shared, so every worker agrees on them
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(self.prefix + key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self.client.set(self.prefix + key, value, ex=ttl)
+
+    async def versions(self, namespaces: list[str]) -> list[int]:
+        values = await self.client.mget([f"{self.prefix}v:{namespace}" for namespace in namespaces])
+        return [int(value or 0) for value in values]
+
+    async def bump(self, namespace: str) -> None:
+        await self.client.incr(f"{self.prefix}v:{namespace}")
+
+
+class ResponseCache:
+    def __init__(self, backend, max_age: int, ttl: int) -> None:
+        self.backend = backend
+        self.max_age = max_age
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    async def bump(self, *namespaces: str) -> None:
+        for namespace in namespaces:
+            await self.backend.bump(namespace)
+
+    async def bump_local(self, namespaces: list[str] | None = None) -> None:
+        """Another worker wrote: bump versions only this process holds (None: every namespace).
+
+        Shared backends already saw that worker's bump, so this is a no-op for them.
+        """
+        if not isinstance(self.backend, LocalLRUBackend):
+            return
+        await self.bump(*(list(self.backend._versions) if namespaces is None else namespaces))
+
+    async def respond(
+        self,
+        request: Request,
+        namespaces: list[str],
+        build: Callable[[], Awaitable[bytes]],
+    ) -> Response:
+        versions = await self.backend.versions(namespaces)
+        query = "&".join(sorted(f"{k}={v}" for k, v in request.query_params.multi_items()))
+        fingerprint = f"{request.url.path}?{query}|{self.backend.epoch}|{','.join(map(str, versions))}"
+        etag = '"' + hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest() + '"'
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"public, max-age={self.max_age}, must-revalidate",
+        }
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+
+        body = await self.backend.get(etag)
+        if body is None:
+            self.misses += 1
+            body = await build()
+            await self.backend.set(etag, body, self.ttl)
+        else:
+            self.hits += 1
+        return Response(content=body, media_type="application/json", headers=headers)
+
+
+def create_backend():
+    if settings.http_cache_backend == "redis":
+        if redis_asyncio is None:
+            raise RuntimeError("http_cache_backend='redis' requires the 'redis' package")
+        return SharedStoreBackend(redis_asyncio.from_url(settings.http_cache_url))
+    if settings.http_cache_backend == "shared-memory":
+        return SharedStoreBackend(InMemorySharedStore())
+    return LocalLRUBackend(settings.http_cache_max_entries)
+
+
+response_cache = ResponseCache(
+    create_backend(),
+    max_age=settings.http_cache_max_age,
+    ttl=settings.http_cache_ttl,
+)
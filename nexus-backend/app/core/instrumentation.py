@@ -0,0 +1,336 @@
+"""Per-request metrics and an opt-in slow request profiler.
+
+`MetricsMiddleware` (pure ASGI, so it adds no task hop) opens a
+`RequestStats` for each HTTP request in a context variable. The SQLAlchemy
+cursor hooks installed by `install_query_hooks` add every statement's
+count, time and driver row count to whatever request is current. That
+includes statements run from greenlets (AsyncSession) and worker threads
+(run_sync / run_in_threadpool), because both inherit the context.
+
+When the request finishes, its numbers go into histograms labelled by
+route template (not raw path), which `/metrics` renders in the Prometheus
+text format.
+
+Profiling is off unless PROFILE_SAMPLE_RATE > 0. A sampled request also
+records each SQL statement it ran and, every PROFILE_INTERVAL_MS, the
+stack of every thread. If it then takes longer than PROFILE_SLOW_MS, the
+collapsed stacks (flamegraph.pl / speedscope format) and statements are
+kept in memory, served at /internal/slow-requests and optionally written
+under PROFILE_DIR. The event loop thread is shared, so stacks taken
+during a slow request also show whatever else the loop ran at the time.
+"""
+from bisect import bisect_left
+from collections import Counter, deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import os
+import random
+import sys
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import get_settings
+
+
+settings = get_settings()
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+
+@dataclass(slots=True)
+class RequestStats:
+    queries: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    # Only collected for profiled requests: statement -> [count, seconds]
+    statements: dict[str, list] | None = None
+
+
+current_request: ContextVar[RequestStats | None] = ContextVar("current_request", default=None)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Labelled histograms and counters for this worker process."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latency: dict[tuple, Histogram] = {}
+        self.db_time: dict[tuple, Histogram] = {}
+        self.queries: dict[tuple, Histogram] = {}
+        self.rows: Counter = Counter()
+
+    def record(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+        key = (method, route)
+        with self._lock:
+            latency = self.latency.get((*key, status))
+            if latency is None:
+                latency = self.latency[(*key, status)] = Histogram(LATENCY_BUCKETS)
+            latency.observe(elapsed)
+            if key not in self.db_time:
+                self.db_time[key] = Histogram(LATENCY_BUCKETS)
+                self.queries[key] = Histogram(QUERY_BUCKETS)
+            self.db_time[key].observe(stats.db_time)
+            self.queries[key].observe(stats.queries)
+            self.rows[key] += stats.rows
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            _render_histograms(
+                lines, "http_request_duration_seconds", "Request latency by route",
+                ("method", "route", "status"), self.latency,
+            )
+            _render_histograms(
+                lines, "http_request_db_seconds", "Time spent in SQL per request",
+                ("method", "route"), self.db_time,
+            )
+            _render_histograms(
+                lines, "http_request_queries", "SQL statements per request",
+                ("method", "route"), self.queries,
+            )
+            lines.append("# HELP http_request_db_rows_total Rows reported by the driver (affected, or fetched where known)")
+            lines.append("# TYPE http_request_db_rows_total counter")
+            for (method, route), value in sorted(self.rows.items()):
+                lines.append(f"http_request_db_rows_total{_labels(('method', 'route'), (method, route))} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(names: tuple, values: tuple, **extra) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _render_histograms(lines: list[str], name: str, help: str, label_names: tuple, series: dict) -> None:
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} histogram")
+    for values, histogram in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(label_names, values, le=bound)} {cumulative}")
+        lines.append(f"{name}_bucket{_labels(label_names, values, le='+Inf')} {histogram.count}")
+        lines.append(f"{name}_sum{_labels(label_names, values)} {histogram.sum}")
+        lines.append(f"{name}_count{_labels(label_names, values)} {histogram.count}")
+
+
+def render_histogram(lines: list[str], name: str, help: str, histogram: Histogram) -> None:
+    """One unlabelled histogram."""
+    _render_histograms(lines, name, help, (), {(): histogram})
+
+
+def render_samples(lines: list[str], name: str, help: str, kind: str, samples: list[tuple[dict, float]]) -> None:
+    """A gauge or counter family: one line per (labels, value) pair."""
+    lines.append(f"# HELP {name} {help}")
+    lines.append(f"# TYPE {name} {kind}")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {value}")
+
+
+class StackSampler:
+    """Samples every thread's stack while at least one profiled request is running."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._active: dict[int, Counter] = {}
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> tuple[int, Counter]:
+        samples: Counter = Counter()
+        with self._lock:
+            token = id(samples)
+            self._active[token] = samples
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+                self._thread.start()
+        return token, samples
+
+    def stop(self, token: int) -> None:
+        with self._lock:
+            self._active.pop(token, None)
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    return
+                targets = list(self._active.values())
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                collapsed = ";".join([names.get(ident, str(ident)), *reversed(stack)])
+                for samples in targets:
+                    samples[collapsed] += 1
+            time.sleep(self.interval)
+
+
+@dataclass
+class SlowRequest:
+    method: str
+    path: str
+    route: str
+    status: int
+    duration_ms: float
+    queries: int
+    db_ms: float
+    statements: list[dict]
+    stacks: list[str] = field(repr=False)
+
+    def as_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 1),
+            "queries": self.queries,
+            "db_ms": round(self.db_ms, 1),
+            "statements": self.statements,
+            "stacks": self.stacks,
+        }
+
+
+class Profiler:
+    def __init__(self, sample_rate: float, slow_seconds: float, interval: float, keep: int, directory: str) -> None:
+        self.sample_rate = sample_rate
+        self.slow_seconds = slow_seconds
+        self.directory = directory
+        self.sampler = StackSampler(interval)
+        self.slow: deque[SlowRequest] = deque(maxlen=keep)
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0
+
+    def should_sample(self) -> bool:
+        return self.enabled and random.random() < self.sample_rate
+
+    def finish(self, scope: dict, route: str, status: int, elapsed: float, stats: RequestStats, samples: Counter) -> None:
+        if elapsed < self.slow_seconds:
+            return
+        statements = sorted(
+            ({"sql": sql, "count": count, "ms": round(seconds * 1000, 2)}
+             for sql, (count, seconds) in (stats.statements or {}).items()),
+            key=lambda item: -item["ms"],
+        )
+        slow = SlowRequest(
+            method=scope["method"],
+            path=scope["path"],
+            route=route,
+            status=status,
+            duration_ms=elapsed * 1000,
+            queries=stats.queries,
+            db_ms=stats.db_time * 1000,
+            statements=statements,
+            stacks=[f"{stack} {count}" for stack, count in samples.most_common()],
+        )
+        self.slow.append(slow)
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+            name = f"{time.strftime('%Y%m%d-%H%M%S')}-{scope['method']}-{route.strip('/').replace('/', '_') or 'root'}.folded"
+            with open(os.path.join(self.directory, name), "w") as out:
+                out.write("\n".join(slow.stacks) + "\n")
+
+
+registry = Registry()
+profiler = Profiler(
+    sample_rate=settings.profile_sample_rate,
+    slow_seconds=settings.profile_slow_ms / 1000,
+    interval=settings.profile_interval_ms / 1000,
+    keep=settings.profile_keep,
+    directory=settings.profile_dir,
+)
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request.set(stats)
+        status = 500
+        sampling = profiler.should_sample()
+        if sampling:
+            stats.statements = {}
+            sample_token, samples = profiler.sampler.start()
+
+        async def send_wrapper(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            current_request.reset(token)
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            registry.record(scope["method"], route_path, status, elapsed, stats)
+            if sampling:
+                profiler.sampler.stop(sample_token)
+                profiler.finish(scope, route_path, status, elapsed, stats, samples)
+
+
+def install_query_hooks(engine: Engine) -> None:
+    """Attribute every statement run on `engine` to the current request."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if current_request.get() is not None:
+            conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        stats = current_request.get()
+        if stats is None:
+            return
+        starts = conn.info.get("query_start")
+        elapsed = time.perf_counter() - starts.pop() if starts else 0.0
+        stats.queries += 1
+        stats.db_time += elapsed
+        rowcount = getattr(cursor, "rowcount", -1)
+        if rowcount and rowcount > 0:
+            stats.rows += rowcount
+        if stats.statements is not None:
+            entry = stats.statements.setdefault(" ".join(statement.split())[:500], [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
@@ -0,0 +1,261 @@
+"""Cache invalidation across worker processes over Postgres LISTEN/NOTIFY.
+
+Every worker keeps its own in-memory caches (leaderboard, principals,
+response versions, room codes, player feeds) and updates them itself after
+its writes commit. Other workers learn about those writes from this bus:
+
+- a writer names what it changed with `invalidate(db, matches=[...], ...)`
+  before committing. The keys wait in `session.info`; the session's commit
+  sends them as `pg_notify` inside the same transaction, so Postgres
+  delivers them exactly when the write becomes visible and never for a
+  rolled-back one;
+- each worker holds one asyncpg connection LISTENing on the channel and
+  applies incoming messages through the per-topic handlers it was started
+  with (app.services.cache_invalidation), which evict or re-read the keyed
+  entries. Messages from this process are skipped: its caches are already
+  up to date.
+
+A listener that loses its connection may have missed messages, so on every
+(re)connect each handler is called with ALL and drops everything it holds.
+
+With SQLite, or INVALIDATION_BACKEND=local, messages go through an
+in-process bus instead: every bus started in this process receives them
+after the commit. A single worker has nobody else to tell, so this only
+keeps the code path (and the metrics) the same as in production.
+"""
+import asyncio
+from collections import Counter
+from collections.abc import Awaitable, Callable, Iterable
+import json
+import logging
+import threading
+import time
+import uuid
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.core.instrumentation import LATENCY_BUCKETS, Histogram
+
+try:
+    import asyncpg
+except ImportError:  # optional dependency, only needed for the postgres backend
+    asyncpg = None
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+ALL = "*"  # as a topic's keys: everything in that cache
+PENDING_KEY = "invalidations"
+MAX_KEYS_PER_MESSAGE = 500  # keeps a NOTIFY payload well under Postgres' 8000 byte limit
+RECONNECT_SECONDS = 2.0
+
+notify = text("SELECT pg_notify(:channel, :payload)")
+
+Handler = Callable[[list | None], Awaitable[None]]
+
+
+def invalidate(session, **topics: Iterable | str) -> None:
+    """Have `session`'s next commit tell the other workers these keys changed.
+
+    Topics are the keys of the handlers the bus was started with; pass ALL
+    instead of keys to drop a whole cache. Works on sync and async
+    sessions. Keys stay queued through a rollback, so a retried commit
+    still sends them.
+    """
+    pending: dict[str, set | str] = session.info.setdefault(PENDING_KEY, {})
+    for topic, keys in topics.items():
+        if keys == ALL or pending.get(topic) == ALL:
+            pending[topic] = ALL
+        else:
+            pending.setdefault(topic, set()).update(keys)
+
+
+def encode_messages(origin: str, pending: dict[str, set | str]) -> list[str]:
+    sent_at = time.time()
+    payloads = []
+    for topic, keys in pending.items():
+        if keys == ALL:
+            chunks = [ALL]
+        else:
+            ordered = sorted(keys)
+            if not ordered:
+                continue
+            chunks = [ordered[i:i + MAX_KEYS_PER_MESSAGE] for i in range(0, len(ordered), MAX_KEYS_PER_MESSAGE)]
+        for chunk in chunks:
+            payloads.append(json.dumps({"o": origin, "t": topic, "k": chunk, "s": sent_at}, separators=(",", ":")))
+    return payloads
+
+
+def listen_dsn(database_url: str) -> str:
+    """A plain postgresql:// DSN for asyncpg from a SQLAlchemy URL."""
+    return make_url(database_url).set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class InvalidationBus:
+    def __init__(self, backend: str, dsn: str, channel: str) -> None:
+        self.backend = backend
+        self.dsn = dsn
+        self.channel = channel
+        self.origin = uuid.uuid4().hex[:12]
+        self.handlers: dict[str, Handler] = {}
+        self.listening = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._lock = threading.Lock()
+        self.published: Counter = Counter()
+        self.applied: Counter = Counter()
+        self.failed = 0
+        self.resyncs = 0
+        self.lag = Histogram(LATENCY_BUCKETS)  # seconds from the writer's commit to applied here
+
+    async def start(self, handlers: dict[str, Handler]) -> None:
+        if self._tasks:
+            return
+        self.handlers = handlers
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks.append(asyncio.create_task(self._apply_loop()))
+        if self.backend == "postgres":
+            if asyncpg is None:
+                raise RuntimeError("invalidation_backend='postgres' requires the 'asyncpg' package")
+            self._tasks.append(asyncio.create_task(self._listen()))
+        else:
+            with _local_lock:
+                _local_buses.append(self)
+            self.listening = True
+
+    async def stop(self) -> None:
+        with _local_lock:
+            if self in _local_buses:
+                _local_buses.remove(self)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self.listening = False
+
+    # Writer side: SQLAlchemy session events, see install_session_events
+
+    def before_commit(self, session: Session) -> None:
+        pending = session.info.get(PENDING_KEY)
+        if not pending:
+            return
+        payloads = encode_messages(self.origin, pending)
+        if self.backend == "postgres":
+            for payload in payloads:
+                session.execute(notify, {"channel": self.channel, "payload": payload})
+        session.info["invalidations_sending"] = payloads
+
+    def after_commit(self, session: Session) -> None:
+        session.info.pop(PENDING_KEY, None)
+        payloads = session.info.pop("invalidations_sending", None)
+        if not payloads:
+            return
+        with self._lock:
+            for payload in payloads:
+                self.published[json.loads(payload)["t"]] += 1
+        if self.backend != "postgres":
+            with _local_lock:
+                buses = list(_local_buses)
+            for bus in buses:
+                for payload in payloads:
+                    bus.receive(payload)
+
+    # Listener side
+
+    def receive(self, payload: str) -> None:
+        """Queue a message for the apply loop; safe from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed invalidation message %r", payload[:200])
+            return
+        if message.get("o") == self.origin:
+            return
+        loop.call_soon_threadsafe(self._queue.put_nowait, message)
+
+    def _on_notify(self, connection, pid: int, channel: str, payload: str) -> None:
+        self.receive(payload)
+
+    async def _apply_loop(self) -> None:
+        while True:
+            message = await self._queue.get()
+            topic, keys = message["t"], message["k"]
+            handler = self.handlers.get(topic)
+            if handler is None:
+                continue
+            try:
+                await handler(None if keys == ALL else keys)
+            except Exception:
+                # The entries stay as they were until their TTL or the next message
+                self.failed += 1
+                logger.exception("Applying %s invalidation failed", topic)
+                continue
+            self.applied[topic] += 1
+            self.lag.observe(max(time.time() - message["s"], 0.0))
+
+    async def resync(self) -> None:
+        """Drop everything the handlers cover; messages may have been missed."""
+        self.resyncs += 1
+        for topic, handler in self.handlers.items():
+            try:
+                await handler(None)
+            except Exception:
+                logger.exception("Resetting %s after a listener reconnect failed", topic)
+
+    async def _listen(self) -> None:
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                closed = asyncio.get_running_loop().create_future()
+
+                def on_close(_connection) -> None:
+                    if not closed.done():
+                        closed.set_result(None)
+
+                connection.add_termination_listener(on_close)
+                await connection.add_listener(self.channel, self._on_notify)
+                self.listening = True
+                await self.resync()
+                await closed
+                logger.warning("Invalidation listener lost its connection; reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Invalidation listener failed; retrying in %ss", RECONNECT_SECONDS)
+            finally:
+                self.listening = False
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+
+_local_buses: list[InvalidationBus] = []
+_local_lock = threading.Lock()
+
+
+def install_session_events(bus: InvalidationBus) -> None:
+    """Send queued invalidations with every commit, of sync and async sessions alike."""
+    event.listen(Session, "before_commit", bus.before_commit)
+    event.listen(Session, "after_commit", bus.after_commit)
+
+
+def create_bus() -> InvalidationBus:
+    backend = settings.invalidation_backend
+    if backend == "auto":
+        backend = "postgres" if settings.database_url.startswith("postgresql") else "local"
+    dsn = listen_dsn(settings.database_url) if backend == "postgres" else ""
+    return InvalidationBus(backend, dsn, settings.invalidation_channel)
+
+
+invalidation_bus = create_bus()
+install_session_events(invalidation_bus)
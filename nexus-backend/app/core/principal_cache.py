@@ -0,0 +1,59 @@
+from collections import OrderedDict
+import threading
+import time
+
+from app.core.config import get_settings
+from app.schemas.user import Principal
+
+
+settings = get_settings()
+
+
+class PrincipalCache:
+    """Small TTL + LRU map of user id -> Principal.
+
+    Entries are loaded from the database once and then served for `ttl`
+    seconds. Anything that changes a user's role or active flag must call
+    `invalidate` so the next request reloads it.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, Principal]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Principal | None:
+        with self._lock:
+            item = self._entries.get(user_id)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._entries[user_id]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return item[1]
+
+    def put(self, principal: Principal) -> None:
+        with self._lock:
+            self._entries[principal.id] = (time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(principal.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.auth_principal_cache_size,
+    ttl=settings.auth_principal_ttl_seconds,
+)
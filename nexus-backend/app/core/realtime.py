@@ -0,0 +1,157 @@
+import asyncio
+from collections import OrderedDict
+import json
+import logging
+
+from fastapi import WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+
+from app.core.config import get_settings
+
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+
+def tournament_topic(tournament_id: int) -> str:
+    return f"tournament:{tournament_id}"
+
+
+def match_topic(match_id: int) -> str:
+    return f"match:{match_id}"
+
+
+LEADERBOARD_TOPIC = "leaderboard"
+
+
+class Subscriber:
+    """One WebSocket connection and its outbound backlog.
+
+    The backlog is keyed by entity (e.g. "match:12"), so a burst of updates
+    to the same match collapses into one merged diff. If it still grows past
+    `max_pending` distinct entities, the client can't keep up and is dropped.
+    """
+
+    def __init__(self, websocket: WebSocket, max_pending: int) -> None:
+        self.websocket = websocket
+        self.max_pending = max_pending
+        # key -> (message, pre-encoded frame or None once merged)
+        self.pending: OrderedDict[str, tuple[dict, str | None]] = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.dropped = False
+
+    def offer(self, key: str, message: dict, encoded: str) -> bool:
+        queued = self.pending.get(key)
+        if queued is not None:
+            # Copy on merge: `message` is shared by every subscriber of the topic
+            merged = {**queued[0], "data": {**queued[0]["data"], **message["data"]}}
+            self.pending[key] = (merged, None)
+            return True
+        if len(self.pending) >= self.max_pending:
+            return False
+        self.pending[key] = (message, encoded)
+        self.wakeup.set()
+        return True
+
+    def drop(self) -> None:
+        self.dropped = True
+        self.pending.clear()
+        self.wakeup.set()
+
+    async def send_loop(self, flush_interval: float) -> None:
+        while True:
+            await self.wakeup.wait()
+            if self.dropped:
+                # 1013 = "try again later"; the client should reconnect and resync
+                await self.websocket.close(code=1013)
+                return
+            # Give a burst a moment to coalesce before flushing it
+            if flush_interval:
+                await asyncio.sleep(flush_interval)
+            self.wakeup.clear()
+            batch = list(self.pending.values())
+            self.pending.clear()
+            if len(batch) == 1 and batch[0][1] is not None:
+                # Common case: reuse the frame encoded once in Hub.publish
+                await self.websocket.send_text(batch[0][1])
+            elif batch:
+                await self.websocket.send_text(json.dumps([message for message, _ in batch]))
+
+
+class Hub:
+    """In-process pub/sub fan-out from write routes to WebSocket viewers."""
+
+    def __init__(self, max_pending: int, flush_interval: float) -> None:
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.topics: dict[str, set[Subscriber]] = {}
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def connections(self) -> int:
+        return sum(len(subscribers) for subscribers in self.topics.values())
+
+    def publish(self, topic: str, data: dict, key: str | None = None) -> None:
+        """Queue `data` for every subscriber of `topic`; never blocks the caller."""
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return
+        self.published += 1
+        message = {"topic": topic, "data": data}
+        encoded = json.dumps([message])
+        key = key or topic
+        for subscriber in list(subscribers):
+            if not subscriber.offer(key, message, encoded):
+                self.dropped += 1
+                subscriber.drop()
+                subscribers.discard(subscriber)
+
+    async def serve(self, websocket: WebSocket, topic: str) -> None:
+        await websocket.accept()
+        subscriber = Subscriber(websocket, self.max_pending)
+        self.topics.setdefault(topic, set()).add(subscriber)
+        sender = asyncio.create_task(subscriber.send_loop(self.flush_interval))
+        try:
+            # Clients don't send anything meaningful; reading just notices disconnects
+            while not sender.done():
+                receiver = asyncio.create_task(websocket.receive_text())
+                done, _ = await asyncio.wait({receiver, sender}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver not in done:
+                    receiver.cancel()
+                    break
+                receiver.result()
+        except WebSocketDisconnect:
+            pass
+        except Exception:
+            logger.exception("WebSocket subscriber on %s failed", topic)
+        finally:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self.topics[topic]
+            if sender.done():
+                # Retrieve it so a failed send (client already gone) isn't logged as unhandled
+                if not sender.cancelled():
+                    sender.exception()
+            else:
+                sender.cancel()
+
+
+hub = Hub(
+    max_pending=settings.ws_max_pending,
+    flush_interval=settings.ws_flush_interval_ms / 1000,
+)
+
+
+def publish_match_diff(match_id: int, tournament_id: int, diff: dict) -> None:
+    """Push changed match fields to the match's and its tournament's viewers."""
+    data = jsonable_encoder({"id": match_id, **diff})
+    hub.publish(match_topic(match_id), data)
+    hub.publish(tournament_topic(tournament_id), data, key=match_topic(match_id))
+
+
+def publish_leaderboard_entries(entries: list[dict]) -> None:
+    for entry in entries:
+        hub.publish(LEADERBOARD_TOPIC, entry, key=f"player:{entry['player_id']}")
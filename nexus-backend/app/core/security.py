@@ -8,8 +8,15 @@ from app.core.config import get_settings
 from app.schemas.user import TokenData
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 settings = get_settings()
+# Pinning min == max == default makes any hash with another cost "need update"
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -20,6 +27,11 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password[:72])
 
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify, and return a replacement hash when the stored one uses outdated settings."""
+    return pwd_context.verify_and_update(plain_password[:72], hashed_password)
+
+
 def create_access_token(data: dict[str, Any], expires_delta: timedelta | None = None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -37,7 +49,12 @@ def decode_access_token(token: str) -> TokenData | None:
         role: str | None = payload.get("role")
         if sub is None:
             return None
-        return TokenData(sub=sub, role=role)
+        return TokenData(
+            sub=sub,
+            role=role,
+            id=payload.get("id"),
+            is_active=payload.get("is_active"),
+        )
     except JWTError:
         return None
 
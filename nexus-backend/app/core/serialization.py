@@ -0,0 +1,50 @@
+"""JSON encoding for API responses.
+
+Two paths:
+
+- `dump` validates ORM objects against a response schema with a cached
+  TypeAdapter and lets pydantic-core write the JSON, for single objects
+  and small lists.
+- `select_for` / `rows_as_dicts` serve large lists: they select only the
+  columns named by the schema's fields (no ORM identity map, no hydrated
+  instances) and hand plain dicts to orjson, skipping validation entirely.
+  The rows come straight from the table the schema mirrors, so they are
+  already the right shape and type.
+"""
+from functools import lru_cache
+from typing import Any, Sequence
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import Select, select
+
+
+@lru_cache
+def type_adapter(schema: Any) -> TypeAdapter:
+    return TypeAdapter(schema)
+
+
+def dump(schema: Any, obj: Any) -> bytes:
+    """Validate ORM objects (or plain rows) against `schema` and encode to JSON bytes."""
+    adapter = type_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(obj, from_attributes=True))
+
+
+@lru_cache
+def schema_columns(schema: type[BaseModel], model: type) -> tuple:
+    """The mapped columns of `model` behind each field of `schema`, in field order."""
+    return tuple(getattr(model, name) for name in schema.model_fields)
+
+
+def select_for(schema: type[BaseModel], model: type) -> Select:
+    return select(*schema_columns(schema, model))
+
+
+def rows_as_dicts(schema: type[BaseModel], rows: Sequence) -> list[dict]:
+    """Rows from `select_for(schema, ...)` as dicts keyed by field name."""
+    names = tuple(schema.model_fields)
+    return [dict(zip(names, row)) for row in rows]
+
+
+def dump_rows(schema: type[BaseModel], rows: Sequence) -> bytes:
+    return orjson.dumps(rows_as_dicts(schema, rows))
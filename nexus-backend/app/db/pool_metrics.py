@@ -0,0 +1,158 @@
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import Pool
+
+
+class PoolMetrics:
+    """Counters for one engine's connection pool.
+
+    Checkout wait covers everything between asking the pool for a connection
+    and getting it back: queueing for a free slot, opening an overflow
+    connection and any pre-ping.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.checkout_timeouts = 0
+        self.overflow_events = 0
+        self.max_in_use = 0
+        self.connects = 0
+        self.pings = 0
+        self.ping_failures = 0
+
+    def record_checkout(self, wait: float, in_use: int, overflowed: bool) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_total += wait
+            self.checkout_wait_max = max(self.checkout_wait_max, wait)
+            self.max_in_use = max(self.max_in_use, in_use)
+            if overflowed:
+                self.overflow_events += 1
+
+    def snapshot(self, pool: Pool) -> dict:
+        with self._lock:
+            data = {
+                "pool": pool.status(),
+                "checkouts": self.checkouts,
+                "checkout_wait_avg_ms": (
+                    self.checkout_wait_total / self.checkouts * 1000 if self.checkouts else 0.0
+                ),
+                "checkout_wait_max_ms": self.checkout_wait_max * 1000,
+                "checkout_timeouts": self.checkout_timeouts,
+                "overflow_events": self.overflow_events,
+                "max_in_use": self.max_in_use,
+                "connects": self.connects,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+            }
+        # QueuePool-style gauges; other pool classes (e.g. SQLite in-memory) lack them
+        for gauge in ("size", "checkedin", "checkedout", "overflow"):
+            if hasattr(pool, gauge):
+                data[gauge if gauge != "checkedout" else "in_use"] = getattr(pool, gauge)()
+        return data
+
+
+class SessionMetrics:
+    """How long requests hold an ORM session, open to close."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.active = 0
+        self.hold_total = 0.0
+        self.hold_max = 0.0
+
+    def session_opened(self) -> float:
+        with self._lock:
+            self.opened += 1
+            self.active += 1
+        return time.perf_counter()
+
+    def session_closed(self, started: float) -> None:
+        held = time.perf_counter() - started
+        with self._lock:
+            self.active -= 1
+            self.hold_total += held
+            self.hold_max = max(self.hold_max, held)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            closed = self.opened - self.active
+            return {
+                "opened": self.opened,
+                "active": self.active,
+                "hold_avg_ms": self.hold_total / closed * 1000 if closed else 0.0,
+                "hold_max_ms": self.hold_max * 1000,
+            }
+
+
+class InstrumentedPoolMixin:
+    metrics: PoolMetrics
+
+    def connect(self):
+        overflow_before = self.overflow() if hasattr(self, "overflow") else 0
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            with self.metrics._lock:
+                self.metrics.checkout_timeouts += 1
+            raise
+        overflow_after = self.overflow() if hasattr(self, "overflow") else 0
+        in_use = self.checkedout() if hasattr(self, "checkedout") else 0
+        self.metrics.record_checkout(
+            time.perf_counter() - start,
+            in_use,
+            overflowed=overflow_after > 0 and overflow_after > overflow_before,
+        )
+        return connection
+
+
+def instrumented_pool_class(pool_class: type[Pool], metrics: PoolMetrics) -> type[Pool]:
+    return type(
+        f"Instrumented{pool_class.__name__}",
+        (InstrumentedPoolMixin, pool_class),
+        {"metrics": metrics},
+    )
+
+
+def install_pool_listeners(pool: Pool, metrics: PoolMetrics, pre_ping: str, idle_seconds: int) -> None:
+    """Count connects and, for the "idle" strategy, ping only connections that sat unused."""
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        with metrics._lock:
+            metrics.connects += 1
+
+    if pre_ping != "idle":
+        return
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if checked_in_at is None or time.monotonic() - checked_in_at < idle_seconds:
+            return
+        with metrics._lock:
+            metrics.pings += 1
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception:
+            with metrics._lock:
+                metrics.ping_failures += 1
+            # The pool discards this connection and retries the checkout
+            raise exc.DisconnectionError()
+
+
+session_metrics = SessionMetrics()
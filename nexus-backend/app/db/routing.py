@@ -0,0 +1,112 @@
+import itertools
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from app.core.security import decode_access_token
+
+
+def user_id_from_authorization(header: str | None) -> int | None:
+    """The user id claim of a "Bearer <token>" header, without a database lookup."""
+    if not header:
+        return None
+    scheme, _, token = header.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    token_data = decode_access_token(token)
+    return token_data.id if token_data else None
+
+
+class RecentWriters:
+    """User ids that committed on the primary within the last `window` seconds.
+
+    Per worker process: a user whose next request lands on another worker
+    can still read from a replica, so keep the window above replica lag
+    rather than relying on it to cover a whole client session.
+    """
+
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._lock = threading.Lock()
+        self._until: dict[int, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._until)
+
+    def mark(self, user_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._until[user_id] = now + self.window
+            if len(self._until) > 1024:
+                self._until = {uid: until for uid, until in self._until.items() if until > now}
+
+    def is_recent(self, user_id: int) -> bool:
+        until = self._until.get(user_id)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            with self._lock:
+                self._until.pop(user_id, None)
+            return False
+        return True
+
+
+class WriteSession(Session):
+    """Sync session class behind the primary AsyncSession, so commits can be observed."""
+
+
+def track_writers(recent_writers: RecentWriters) -> None:
+    """Mark the requesting user as a recent writer whenever a primary session commits.
+
+    get_db stores the request's Authorization header in `session.info`;
+    sessions opened outside a request (scripts, background work) have none
+    and are ignored.
+    """
+
+    @event.listens_for(WriteSession, "after_commit")
+    def after_commit(session: Session) -> None:
+        user_id = user_id_from_authorization(session.info.get("authorization"))
+        if user_id is not None:
+            recent_writers.mark(user_id)
+
+
+class ReadRouter:
+    """Picks the sessionmaker for a read: a replica round-robin, or the primary for recent writers."""
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: list[async_sessionmaker],
+        recent_writers: RecentWriters,
+    ) -> None:
+        self.primary = primary
+        self.replicas = replicas
+        self.recent_writers = recent_writers
+        self._next = itertools.cycle(range(len(replicas))) if replicas else None
+        self._lock = threading.Lock()
+        self.routed = {"sticky": 0, **{f"read-{i}": 0 for i in range(len(replicas))}}
+
+    def pick(self, authorization: str | None) -> async_sessionmaker:
+        if not self.replicas:
+            return self.primary
+        if self.recent_writers:
+            user_id = user_id_from_authorization(authorization)
+            if user_id is not None and self.recent_writers.is_recent(user_id):
+                with self._lock:
+                    self.routed["sticky"] += 1
+                return self.primary
+        with self._lock:
+            index = next(self._next)
+            self.routed[f"read-{index}"] += 1
+        return self.replicas[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "replicas": len(self.replicas),
+                "recent_writers": len(self.recent_writers),
+                "routed": dict(self.routed),
+            }
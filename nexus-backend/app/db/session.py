@@ -1,12 +1,87 @@
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
 from app.core.config import get_settings
+from app.db.pool_metrics import (
+    PoolMetrics,
+    install_pool_listeners,
+    instrumented_pool_class,
+    session_metrics,
+)
+from app.db.routing import ReadRouter, RecentWriters, WriteSession, track_writers
 
 
 settings = get_settings()
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+def to_async_url(url: str) -> str:
+    """Map a sync driver URL onto its asyncio driver (psycopg2 -> asyncpg, sqlite -> aiosqlite)."""
+    scheme, sep, rest = url.partition("://")
+    drivers = {
+        "postgresql": "postgresql+asyncpg",
+        "postgresql+psycopg2": "postgresql+asyncpg",
+        "sqlite": "sqlite+aiosqlite",
+    }
+    return drivers.get(scheme, scheme) + sep + rest
+
+
+def engine_options(url: str, pool_class: type[Pool], metrics: PoolMetrics) -> dict:
+    """Pool sizing, pre-ping and statement timeout from Settings for one engine."""
+    if url.startswith("sqlite") and (":memory:" in url or url.rstrip("/").endswith(":")):
+        # In-memory SQLite uses a single shared connection; there is no pool to tune
+        return {}
+    options = {
+        "poolclass": instrumented_pool_class(pool_class, metrics),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pre_ping == "always",
+    }
+    if settings.db_statement_timeout_ms and url.startswith("postgresql"):
+        timeout = str(settings.db_statement_timeout_ms)
+        if "+asyncpg" in url:
+            options["connect_args"] = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return options
+
+
+sync_pool_metrics = PoolMetrics("sync")
+async_pool_metrics = PoolMetrics("async")
+
+# Sync engine: startup DDL, offline scripts and anything run off the event loop
+engine = create_engine(
+    settings.database_url,
+    **engine_options(settings.database_url, QueuePool, sync_pool_metrics),
+)
+
+# Async engine: used by every API route
+async_database_url = settings.async_database_url or to_async_url(settings.database_url)
+async_engine = create_async_engine(
+    async_database_url,
+    **engine_options(async_database_url, AsyncAdaptedQueuePool, async_pool_metrics),
+)
+
+# Read replicas: only routes that depend on get_read_db use them
+read_pool_metrics = [PoolMetrics(f"read-{i}") for i in range(len(settings.read_database_urls))]
+read_engines = [
+    create_async_engine(
+        to_async_url(url),
+        **engine_options(to_async_url(url), AsyncAdaptedQueuePool, metrics),
+    )
+    for url, metrics in zip(settings.read_database_urls, read_pool_metrics)
+]
+
+for _engine, _metrics in (
+    (engine, sync_pool_metrics),
+    (async_engine.sync_engine, async_pool_metrics),
+    *((read_engine.sync_engine, metrics) for read_engine, metrics in zip(read_engines, read_pool_metrics)),
+):
+    install_pool_listeners(_engine.pool, _metrics, settings.db_pre_ping, settings.db_pre_ping_idle_seconds)
 
 
 class Base(DeclarativeBase):
@@ -14,16 +89,56 @@ class Base(DeclarativeBase):
 
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    sync_session_class=WriteSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+ReadSessionLocals = [
+    async_sessionmaker(bind=read_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+    for read_engine in read_engines
+]
 
+recent_writers = RecentWriters(settings.read_your_writes_seconds)
+read_router = ReadRouter(AsyncSessionLocal, ReadSessionLocals, recent_writers)
+if read_engines:
+    track_writers(recent_writers)
 
-def get_db():
-    db = SessionLocal()
+
+async def get_db(request: Request):
+    """Session on the primary, for writes and for reads that must see them."""
+    started = session_metrics.session_opened()
     try:
-        yield db
+        async with AsyncSessionLocal() as db:
+            if read_engines:
+                # Lets a commit on this session mark the caller for read-your-writes
+                db.info["authorization"] = request.headers.get("authorization")
+            yield db
     finally:
-        db.close()
+        session_metrics.session_closed(started)
 
 
+async def get_read_db(request: Request):
+    """Session on a read replica (round-robin) for lag-tolerant reads.
 
+    Falls back to the primary when no replicas are configured, and for a
+    user who committed on the primary within READ_YOUR_WRITES_SECONDS. Not
+    for routes that fill the response cache: a body read from a lagging
+    replica would be cached under the version its write just bumped.
+    """
+    started = session_metrics.session_opened()
+    try:
+        async with read_router.pick(request.headers.get("authorization"))() as db:
+            yield db
+    finally:
+        session_metrics.session_closed(started)
 
 
+def get_sync_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
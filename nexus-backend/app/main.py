@@ -1,4 +1,8 @@
-from fastapi import FastAPI
+import asyncio
+
+from fastapi import FastAPI, Request, WebSocket
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.routes import auth as auth_routes
@@ -7,14 +11,41 @@ from app.api.routes import matches as matches_routes
 from app.api.routes import referee as referee_routes
 from app.api.routes import leaderboard as leaderboard_routes
 from app.api.routes import players as players_routes
+from app.api.routes import internal as internal_routes
+from app.api.routes import exports as exports_routes
+from app.api.routes import teams as teams_routes
+from app.api.routes import jobs as jobs_routes
+from app.api.routes import events as events_routes
 from app.core.config import get_settings
-from app.db.session import engine
+from app.core.hashing import HasherBusy, password_hasher
+from app.core.instrumentation import (
+    MetricsMiddleware,
+    install_query_hooks,
+    registry,
+    render_histogram,
+    render_samples,
+)
+from app.core.invalidation import invalidation_bus
+from app.core.realtime import LEADERBOARD_TOPIC, hub, match_topic, tournament_topic
+from app.db.pool_metrics import session_metrics
+from app.db.session import (
+    async_engine,
+    async_pool_metrics,
+    engine,
+    read_engines,
+    read_pool_metrics,
+    sync_pool_metrics,
+)
 from app.models import Base
+from app.services.cache_invalidation import HANDLERS as INVALIDATION_HANDLERS
+from app.services.job_kinds import HANDLERS
+from app.services.jobs import job_runner
+from app.services.live_scores import live_scores
 
 
 settings = get_settings()
 
-app = FastAPI(title="Nexus Arena API")
+app = FastAPI(title="Nexus Arena API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +54,20 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# Outermost, so latency covers CORS and error handling too
+app.add_middleware(MetricsMiddleware)
+
+for _engine in (engine, async_engine.sync_engine, *(read_engine.sync_engine for read_engine in read_engines)):
+    install_query_hooks(_engine)
+
+
+@app.exception_handler(HasherBusy)
+async def hasher_busy_handler(request: Request, exc: HasherBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Too many login attempts in progress, retry shortly"},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 
 @app.on_event("startup")
@@ -31,12 +76,98 @@ def on_startup():
     Base.metadata.create_all(bind=engine)
 
 
+@app.on_event("startup")
+async def start_background_work():
+    # Job workers hand cache refreshes back to this loop when a job succeeds
+    job_runner.start(HANDLERS, asyncio.get_running_loop())
+    live_scores.start()
+    # Applies cache invalidations committed by other workers
+    await invalidation_bus.start(INVALIDATION_HANDLERS)
+
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Running jobs stop at their next progress report and go back to the queue
+    await run_in_threadpool(job_runner.stop)
+    # Write out live event totals still held in memory
+    await live_scores.stop()
+    await invalidation_bus.stop()
+    password_hasher.shutdown()
+    await async_engine.dispose()
+    for read_engine in read_engines:
+        await read_engine.dispose()
+
+
 app.include_router(auth_routes.router, prefix=settings.api_v1_prefix)
 app.include_router(tournaments_routes.router, prefix=settings.api_v1_prefix)
 app.include_router(matches_routes.router, prefix=settings.api_v1_prefix)
 app.include_router(referee_routes.router, prefix=settings.api_v1_prefix)
 app.include_router(leaderboard_routes.router, prefix=settings.api_v1_prefix)
 app.include_router(players_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(internal_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(exports_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(teams_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(jobs_routes.router, prefix=settings.api_v1_prefix)
+app.include_router(events_routes.router, prefix=settings.api_v1_prefix)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus text exposition for this worker process."""
+    lines = registry.render().splitlines()
+    pools = [
+        ({"pool": "sync"}, engine.pool, sync_pool_metrics),
+        ({"pool": "async"}, async_engine.sync_engine.pool, async_pool_metrics),
+        *(({"pool": metrics.name}, read_engine.sync_engine.pool, metrics)
+          for read_engine, metrics in zip(read_engines, read_pool_metrics)),
+    ]
+    snapshots = [(labels, metrics.snapshot(pool)) for labels, pool, metrics in pools]
+    render_samples(lines, "db_pool_in_use", "Connections checked out", "gauge",
+                   [(labels, snap.get("in_use", 0)) for labels, snap in snapshots])
+    render_samples(lines, "db_pool_checkout_timeouts_total", "Checkouts that hit pool_timeout", "counter",
+                   [(labels, snap["checkout_timeouts"]) for labels, snap in snapshots])
+    render_samples(lines, "db_sessions_active", "ORM sessions open", "gauge",
+                   [({}, session_metrics.snapshot()["active"])])
+    render_samples(lines, "jobs_finished_total", "Background jobs run by this process, by outcome", "counter",
+                   [({"status": status}, count) for status, count in job_runner.counts.items()])
+    render_samples(lines, "live_events_total", "Live match events accepted by this process", "counter",
+                   [({}, live_scores.events)])
+    render_samples(lines, "live_score_flushes_total", "Write-behind flushes of live scores", "counter",
+                   [({}, live_scores.flushes)])
+    render_samples(lines, "live_matches_pending", "Matches with event totals not yet written", "gauge",
+                   [({}, len(live_scores))])
+    render_samples(lines, "cache_invalidations_published_total", "Invalidations sent with this process's commits",
+                   "counter", [({"topic": topic}, count) for topic, count in sorted(invalidation_bus.published.items())])
+    render_samples(lines, "cache_invalidations_applied_total", "Invalidations from other workers applied here",
+                   "counter", [({"topic": topic}, count) for topic, count in sorted(invalidation_bus.applied.items())])
+    render_samples(lines, "cache_invalidations_failed_total", "Invalidations whose handler raised", "counter",
+                   [({}, invalidation_bus.failed)])
+    render_samples(lines, "cache_invalidation_resyncs_total", "Full cache drops after the listener (re)connected",
+                   "counter", [({}, invalidation_bus.resyncs)])
+    render_samples(lines, "cache_invalidation_listening", "1 while the invalidation listener is connected", "gauge",
+                   [({"backend": invalidation_bus.backend}, int(invalidation_bus.listening))])
+    render_histogram(lines, "cache_invalidation_lag_seconds", "From the writer's commit to applied in this worker",
+                     invalidation_bus.lag)
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
+# =========================
+# LIVE UPDATES (WEBSOCKETS)
+# =========================
+# Each message is a JSON list of {"topic", "data"} diffs; bursts are coalesced per entity.
+@app.websocket(f"{settings.api_v1_prefix}/ws/tournaments/{{tournament_id}}")
+async def tournament_updates(websocket: WebSocket, tournament_id: int):
+    await hub.serve(websocket, tournament_topic(tournament_id))
+
+
+@app.websocket(f"{settings.api_v1_prefix}/ws/matches/{{match_id}}")
+async def match_updates(websocket: WebSocket, match_id: int):
+    await hub.serve(websocket, match_topic(match_id))
+
+
+@app.websocket(f"{settings.api_v1_prefix}/ws/leaderboard")
+async def leaderboard_updates(websocket: WebSocket):
+    await hub.serve(websocket, LEADERBOARD_TOPIC)
 
 
 
@@ -4,8 +4,12 @@ from app.models.tournament import Tournament
 from app.models.match import Match
 from app.models.player import Player
 from app.models.match_player import MatchPlayer
+from app.models.team import Team
+from app.models.team_member import TeamMember
+from app.models.job import Job
+from app.models.match_event import MatchEvent
 
-__all__ = ["Base", "User", "Tournament", "Match", "Player", "MatchPlayer"]
+__all__ = ["Base", "User", "Tournament", "Match", "Player", "MatchPlayer", "Team", "TeamMember", "Job", "MatchEvent"]
 
 
 
@@ -0,0 +1,48 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import JSON, Boolean, DateTime, Float, ForeignKey, Index, String, Text, text
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+_active = text("status IN ('queued', 'running')")
+
+
+def utcnow() -> datetime:
+    """Naive UTC, like every other DateTime column here."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class Job(Base):
+    """A unit of background work, run by app.services.jobs."""
+
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # At most one queued or running job per dedup key: repeated submits find it instead
+        Index(
+            "uq_jobs_active_dedup_key", "dedup_key",
+            unique=True, postgresql_where=_active, sqlite_where=_active,
+        ),
+        # Claiming the oldest queued job
+        Index("ix_jobs_status_id", "status", "id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    kind: Mapped[str] = mapped_column(String(50), nullable=False)
+    params: Mapped[dict] = mapped_column(JSON, nullable=False, default=dict)
+    dedup_key: Mapped[str] = mapped_column(String(255), nullable=False)
+    # queued -> running -> succeeded / failed / cancelled
+    status: Mapped[str] = mapped_column(String(20), nullable=False, default="queued")
+    progress: Mapped[float] = mapped_column(Float, nullable=False, default=0.0)  # 0..1
+    message: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    result: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    cancel_requested: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    created_by: Mapped[int | None] = mapped_column(ForeignKey("users.id"), nullable=True)
+    worker: Mapped[str | None] = mapped_column(String(100), nullable=True)  # "host:pid:thread" of the runner
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import String, DateTime, Integer, ForeignKey
+from sqlalchemy import String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -12,19 +12,37 @@ if TYPE_CHECKING:
 
 class Match(Base):
     __tablename__ = "matches"
+    __table_args__ = (
+        Index("ix_matches_tournament_id_status", "tournament_id", "status"),
+        Index("ix_matches_status_scheduled_at", "status", "scheduled_at"),
+        # Keyset pagination order
+        Index("ix_matches_scheduled_at_id", "scheduled_at", "id"),
+        # A team's upcoming matches, from either side (see app.services.player_feed)
+        Index("ix_matches_team1_id_status", "team1_id", "status"),
+        Index("ix_matches_team2_id_status", "team2_id", "status"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     tournament_id: Mapped[int] = mapped_column(ForeignKey("tournaments.id"), nullable=False)
     team1_name: Mapped[str] = mapped_column(String(255), nullable=False)
     team2_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    # Set once the side is a known team; None while it is a placeholder such as "Winner R1-3"
+    team1_id: Mapped[int | None] = mapped_column(ForeignKey("teams.id"), nullable=True)
+    team2_id: Mapped[int | None] = mapped_column(ForeignKey("teams.id"), nullable=True)
     scheduled_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    station: Mapped[str | None] = mapped_column(String(50), nullable=True)  # server / station, see app.services.scheduler
     status: Mapped[str] = mapped_column(String(50), default="Scheduled")
-    room_code: Mapped[str | None] = mapped_column(String(16), nullable=True, index=True)
+    room_code: Mapped[str | None] = mapped_column(String(16), nullable=True, unique=True, index=True)
     score_team1: Mapped[int | None] = mapped_column(Integer, nullable=True)
     score_team2: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    round_number: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    bracket: Mapped[str | None] = mapped_column(String(50), nullable=True)  # see app.services.fixtures
 
     # Relationships
-    player_scores: Mapped[list["MatchPlayer"]] = relationship("MatchPlayer", back_populates="match")
+    # Never walk this lazily (one query per match); load lineups explicitly, see app.services.history
+    player_scores: Mapped[list["MatchPlayer"]] = relationship(
+        "MatchPlayer", back_populates="match", lazy="raise_on_sql"
+    )
 
 
 
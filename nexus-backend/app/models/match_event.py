@@ -0,0 +1,26 @@
+from datetime import datetime
+
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db.session import Base
+
+
+class MatchEvent(Base):
+    """One in-match event (kill, objective, ...) reported by a game server. Append-only."""
+
+    __tablename__ = "match_events"
+    __table_args__ = (
+        # A match's event log in arrival order
+        Index("ix_match_events_match_id_id", "match_id", "id"),
+    )
+
+    # High volume: 64-bit on Postgres; SQLite only autoincrements INTEGER PRIMARY KEY
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    match_id: Mapped[int] = mapped_column(ForeignKey("matches.id"), nullable=False)
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id"), nullable=False)
+    team: Mapped[str] = mapped_column(String(10), nullable=False)  # "team1" or "team2"
+    kind: Mapped[str] = mapped_column(String(30), nullable=False)
+    points: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+    occurred_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # game server clock
+    received_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Integer, ForeignKey,String
+from sqlalchemy import Integer, Float, ForeignKey, Index, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -6,12 +6,20 @@ from app.db.session import Base
 
 class MatchPlayer(Base):
     __tablename__ = "match_players"
+    __table_args__ = (
+        # A player's history rows (see app.services.history)
+        Index("ix_match_players_player_id_match_id", "player_id", "match_id"),
+        # Lineups of a set of matches
+        Index("ix_match_players_match_id", "match_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     match_id: Mapped[int] = mapped_column(ForeignKey("matches.id"), nullable=False)
     player_id: Mapped[int] = mapped_column(ForeignKey("players.id"), nullable=False)
     team: Mapped[str] = mapped_column(String(50), nullable=False)  # "team1" or "team2"
     score: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Rating change this result gave the player, so a resubmission can reverse it
+    rating_delta: Mapped[float | None] = mapped_column(Float, nullable=True)
 
     # Relationships
     match: Mapped["Match"] = relationship("Match", back_populates="player_scores")
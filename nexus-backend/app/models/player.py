@@ -1,4 +1,4 @@
-from sqlalchemy import String, Integer, ForeignKey
+from sqlalchemy import String, Integer, Float, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.session import Base
@@ -13,10 +13,15 @@ class Player(Base):
     wins: Mapped[int] = mapped_column(Integer, default=0)
     losses: Mapped[int] = mapped_column(Integer, default=0)
     total_points: Mapped[int] = mapped_column(Integer, default=0)
+    # Team Elo, maintained by app.services.ratings
+    rating: Mapped[float] = mapped_column(Float, default=1500.0, server_default="1500")
 
     # Relationships
     user: Mapped["User"] = relationship("User", back_populates="player")
-    match_scores: Mapped[list["MatchPlayer"]] = relationship("MatchPlayer", back_populates="player")
+    # Never walk this lazily; use app.services.history
+    match_scores: Mapped[list["MatchPlayer"]] = relationship(
+        "MatchPlayer", back_populates="player", lazy="raise_on_sql"
+    )
 
 
 
@@ -0,0 +1,23 @@
+from sqlalchemy import String, Integer, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.session import Base
+
+
+class Team(Base):
+    __tablename__ = "teams"
+    __table_args__ = (
+        # Also serves "teams of a tournament" lookups
+        UniqueConstraint("tournament_id", "name", name="uq_teams_tournament_id_name"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    tournament_id: Mapped[int] = mapped_column(ForeignKey("tournaments.id"), nullable=False)
+    name: Mapped[str] = mapped_column(String(255), nullable=False)
+    seed: Mapped[int | None] = mapped_column(Integer, nullable=True)  # 1 is the top seed
+
+    # Relationships
+    # Never walk this lazily; rosters are loaded in bulk (see app.api.routes.teams)
+    members: Mapped[list["TeamMember"]] = relationship(
+        "TeamMember", back_populates="team", lazy="raise_on_sql"
+    )
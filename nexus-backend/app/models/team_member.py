@@ -0,0 +1,21 @@
+from sqlalchemy import ForeignKey, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from app.db.session import Base
+
+
+class TeamMember(Base):
+    __tablename__ = "team_members"
+    __table_args__ = (
+        # A team's roster
+        UniqueConstraint("team_id", "player_id", name="uq_team_members_team_id_player_id"),
+        # A player's teams (see app.services.player_feed)
+        Index("ix_team_members_player_id_team_id", "player_id", "team_id"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    team_id: Mapped[int] = mapped_column(ForeignKey("teams.id"), nullable=False)
+    player_id: Mapped[int] = mapped_column(ForeignKey("players.id"), nullable=False)
+
+    # Relationships
+    team: Mapped["Team"] = relationship("Team", back_populates="members")
@@ -0,0 +1,23 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+
+class MatchEventIn(BaseModel):
+    match_id: int
+    player_id: int
+    team: Literal["team1", "team2"]
+    kind: str = Field(min_length=1, max_length=30)  # "kill", "objective", ...
+    points: int = 1  # added to the player's and the team's live score
+    occurred_at: datetime | None = None  # defaults to arrival time
+
+
+class MatchEventBatch(BaseModel):
+    events: list[MatchEventIn] = Field(min_length=1, max_length=5000)
+
+
+class MatchEventAck(BaseModel):
+    accepted: int
+    # match id -> why that match's events in the batch were dropped
+    rejected: dict[int, str] = {}
@@ -0,0 +1,63 @@
+from datetime import datetime
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict
+
+
+JobKind = Literal["fixtures", "stats_rebuild", "rerate", "export"]
+
+
+# Parameters per job kind; validated and normalised before deduplication
+class FixturesJobParams(BaseModel):
+    tournament_id: int
+    format: str = "Single Elimination"
+
+
+class StatsRebuildJobParams(BaseModel):
+    apply: bool = False
+
+
+class RerateJobParams(BaseModel):
+    apply: bool = False
+
+
+class ExportJobParams(BaseModel):
+    dataset: Literal["tournaments", "matches", "match-players", "players"]
+    format: Literal["ndjson", "csv"] = "ndjson"
+    gzip: bool = True
+    tournament_id: int | None = None
+
+
+JOB_PARAMS: dict[str, type[BaseModel]] = {
+    "fixtures": FixturesJobParams,
+    "stats_rebuild": StatsRebuildJobParams,
+    "rerate": RerateJobParams,
+    "export": ExportJobParams,
+}
+
+
+class JobSubmit(BaseModel):
+    kind: JobKind
+    params: dict = {}
+
+
+class JobOut(BaseModel):
+    id: int
+    kind: str
+    params: dict
+    status: str
+    progress: float
+    message: str | None = None
+    result: dict | None = None
+    error: str | None = None
+    cancel_requested: bool
+    created_at: datetime
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class JobAccepted(JobOut):
+    """Response to a submit: the new job, or the identical one already queued or running."""
+    deduplicated: bool = False
@@ -1,13 +1,20 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.player import MatchResultWithScores
 
 
 class MatchBase(BaseModel):
     tournament_id: int
     team1_name: str
     team2_name: str
+    team1_id: int | None = None
+    team2_id: int | None = None
     scheduled_at: datetime | None = None
+    station: str | None = None
     status: str = "Scheduled"
+    round_number: int | None = None
+    bracket: str | None = None
 
 
 class MatchCreate(MatchBase):
@@ -16,6 +23,7 @@ class MatchCreate(MatchBase):
 
 class MatchUpdate(BaseModel):
     scheduled_at: datetime | None = None
+    station: str | None = None
     status: str | None = None
     room_code: str | None = None
     score_team1: int | None = None
@@ -28,8 +36,12 @@ class MatchOut(MatchBase):
     score_team1: int | None = None
     score_team2: int | None = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class MatchPage(BaseModel):
+    items: list[MatchOut]
+    next_cursor: str | None = None
 
 
 class MatchResult(BaseModel):
@@ -41,3 +53,54 @@ class RoomCodeValidate(BaseModel):
     code: str
 
 
+class RoomCodeAllocate(BaseModel):
+    """Select a round of a tournament to give room codes to in one go."""
+    tournament_id: int
+    round_number: int | None = None
+    bracket: str | None = None
+
+
+
+
+class ScheduleWindow(BaseModel):
+    start: datetime
+    end: datetime
+
+
+class ScheduleRequest(BaseModel):
+    """Stations and time windows to spread a tournament's matches over."""
+    tournament_id: int
+    stations: list[str] = Field(min_length=1, max_length=1000)
+    windows: list[ScheduleWindow] = Field(min_length=1)
+    match_minutes: int = Field(30, ge=1)
+    rest_minutes: int = Field(0, ge=0)  # minimum gap between two matches of one team
+    reschedule: bool = False  # also move matches that already have a time
+
+
+class ScheduleReport(BaseModel):
+    matches: int
+    scheduled: int
+    pinned: int
+    unscheduled: list[int]
+    slots: int
+    stations: int
+    first_start: datetime | None = None
+    last_end: datetime | None = None
+    elapsed_s: float
+    applied: bool
+
+
+class MatchResultBatchItem(MatchResultWithScores):
+    match_id: int
+
+
+class MatchResultBatch(BaseModel):
+    results: list[MatchResultBatchItem] = Field(min_length=1, max_length=500)
+
+
+class MatchResultBatchOutcome(BaseModel):
+    match_id: int
+    ok: bool
+    status_code: int
+    error: str | None = None
+    match: MatchOut | None = None
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict
 
 
 class PlayerBase(BaseModel):
@@ -15,9 +17,46 @@ class PlayerOut(PlayerBase):
     wins: int
     losses: int
     total_points: int
+    rating: float
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class LineupEntry(BaseModel):
+    player_id: int
+    player_name: str
+    score: int
+
+
+class PlayerMatchEntry(BaseModel):
+    """One completed match from a player's point of view."""
+    match_id: int
+    tournament_id: int
+    scheduled_at: datetime | None = None
+    round_number: int | None = None
+    bracket: str | None = None
+    team: str  # "team1" or "team2"
+    team_name: str
+    opponent_name: str
+    score: int  # this player's own score
+    team_score: int
+    opponent_score: int
+    result: str  # "win" or "loss", as counted in wins/losses
+    teammates: list[LineupEntry]
+    opponents: list[LineupEntry]
+
+
+class PlayerHistoryPage(BaseModel):
+    items: list[PlayerMatchEntry]
+    next_cursor: str | None = None
+
 
-    class Config:
-        from_attributes = True
+class PlayerProfile(PlayerOut):
+    matches_played: int
+    win_rate: float
+    rank: int | None = None
+    rating_rank: int | None = None
+    recent_matches: list[PlayerMatchEntry]
 
 
 class PlayerScoreInput(BaseModel):
@@ -28,7 +67,9 @@ class PlayerScoreInput(BaseModel):
 class MatchResultWithScores(BaseModel):
     score_team1: int
     score_team2: int
-    team1_players: list[PlayerScoreInput]  # List of player scores for team 1
-    team2_players: list[PlayerScoreInput]  # List of player scores for team 2
+    # Player scores per team. Leave both out on a match fed by live events to
+    # accept the aggregated lineups; the score must then match the live totals.
+    team1_players: list[PlayerScoreInput] | None = None
+    team2_players: list[PlayerScoreInput] | None = None
 
 
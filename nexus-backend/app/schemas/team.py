@@ -0,0 +1,22 @@
+from pydantic import BaseModel, ConfigDict
+
+
+class TeamCreate(BaseModel):
+    tournament_id: int
+    name: str
+    seed: int | None = None
+    player_ids: list[int] = []
+
+
+class TeamMembersUpdate(BaseModel):
+    player_ids: list[int]
+
+
+class TeamOut(BaseModel):
+    id: int
+    tournament_id: int
+    name: str
+    seed: int | None = None
+    player_ids: list[int] = []
+
+    model_config = ConfigDict(from_attributes=True)
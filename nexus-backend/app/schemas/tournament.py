@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
 
 class TournamentBase(BaseModel):
@@ -25,8 +25,7 @@ class TournamentOut(TournamentBase):
     id: int
     status: str
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class GenerateFixtures(BaseModel):
@@ -38,4 +38,19 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     sub: str | None = None
     role: str | None = None
+    id: int | None = None
+    is_active: bool | None = None
+
+
+# =========================
+# Authenticated Principal
+# =========================
+class Principal(BaseModel):
+    """What the auth dependencies hand to routes: enough to authorize, no ORM instance."""
+    id: int
+    email: str
+    role: str
+    is_active: bool
+
+    model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,100 @@
+"""How each worker applies invalidations sent by the others; see app.core.invalidation for the bus.
+
+Writers call `invalidate(db, <topic>=keys)` before committing, with these topics:
+
+- players: player ids whose stats or rating changed; their leaderboard entries are re-read;
+- principals: user ids whose role or active flag changed; their cached principals are dropped;
+- responses: response cache namespaces to bump (only matters for the per-worker backend);
+- matches: match ids whose row changed; feeds and room codes take the current rows;
+- teams: team ids that gained matches; cached feeds of their members are dropped;
+- feeds: player ids whose rosters changed; their cached feeds are dropped.
+
+Every handler receives None instead of keys when the whole cache must go
+(ALL, or a listener reconnect).
+"""
+from sqlalchemy import select
+
+from app.core.http_cache import response_cache
+from app.core.invalidation import Handler
+from app.core.principal_cache import principal_cache
+from app.core.serialization import rows_as_dicts, select_for
+from app.db.session import AsyncSessionLocal
+from app.models.match import Match
+from app.models.player import Player
+from app.schemas.match import MatchOut
+from app.services.leaderboard import leaderboard
+from app.services.player_feed import player_feed
+from app.services.room_codes import room_codes
+
+
+async def refresh_players(player_ids: list[int] | None) -> None:
+    if player_ids is None:
+        leaderboard.reset()
+        return
+    if not leaderboard.loaded:
+        return
+    async with AsyncSessionLocal() as db:
+        rows = (await db.execute(
+            select(Player.id, Player.player_name, Player.wins, Player.losses, Player.total_points, Player.rating)
+            .where(Player.id.in_(player_ids))
+        )).all()
+    for row in rows:
+        leaderboard.upsert(*row)
+    for player_id in set(player_ids) - {row.id for row in rows}:
+        leaderboard.remove(player_id)
+
+
+async def drop_principals(user_ids: list[int] | None) -> None:
+    if user_ids is None:
+        principal_cache.clear()
+        return
+    for user_id in user_ids:
+        principal_cache.invalidate(user_id)
+
+
+async def bump_responses(namespaces: list[str] | None) -> None:
+    await response_cache.bump_local(namespaces)
+
+
+async def refresh_matches(match_ids: list[int] | None) -> None:
+    if match_ids is None:
+        room_codes.reset()
+        player_feed.reset()
+        return
+    if not room_codes.loaded and not len(player_feed):
+        return
+    async with AsyncSessionLocal() as db:
+        rows = rows_as_dicts(MatchOut, (await db.execute(
+            select_for(MatchOut, Match).where(Match.id.in_(match_ids))
+        )).all())
+    for row in rows:
+        room_codes.refresh(row["id"], row["room_code"])
+        player_feed.update_match(row)
+    gone = set(match_ids) - {row["id"] for row in rows}
+    for match_id in gone:
+        room_codes.release(match_id)
+    player_feed.remove_matches(gone)
+
+
+async def drop_team_feeds(team_ids: list[int] | None) -> None:
+    if team_ids is None:
+        player_feed.reset()
+        return
+    player_feed.evict_teams(team_ids)
+
+
+async def drop_player_feeds(player_ids: list[int] | None) -> None:
+    if player_ids is None:
+        player_feed.reset()
+        return
+    player_feed.evict_players(player_ids)
+
+
+HANDLERS: dict[str, Handler] = {
+    "players": refresh_players,
+    "principals": drop_principals,
+    "responses": bump_responses,
+    "matches": refresh_matches,
+    "teams": drop_team_feeds,
+    "feeds": drop_player_feeds,
+}
@@ -0,0 +1,93 @@
+"""Table exports shared by the streaming /exports routes and export jobs.
+
+`write_export` is the job side: it streams the same query on a sync
+session into a file under JOB_OUTPUT_DIR, reporting progress per
+partition, so large exports can be fetched later instead of held open.
+"""
+from collections.abc import Callable
+import csv
+from datetime import date, datetime
+import gzip
+import io
+import json
+
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.models.tournament import Tournament
+
+
+PARTITION_ROWS = 5000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+def export_query(dataset: str, tournament_id: int | None) -> Select:
+    if dataset == "tournaments":
+        query = select(*Tournament.__table__.c).order_by(Tournament.id)
+        if tournament_id is not None:
+            query = query.where(Tournament.id == tournament_id)
+    elif dataset == "matches":
+        query = select(*Match.__table__.c).order_by(Match.id)
+        if tournament_id is not None:
+            query = query.where(Match.tournament_id == tournament_id)
+    elif dataset == "match-players":
+        query = select(*MatchPlayer.__table__.c).order_by(MatchPlayer.id)
+        if tournament_id is not None:
+            query = query.join(Match, Match.id == MatchPlayer.match_id).where(Match.tournament_id == tournament_id)
+    else:
+        query = select(*Player.__table__.c).order_by(Player.id)
+    return query
+
+
+def encode_partition(buffer: io.StringIO, writer, columns: list[str], partition, format: str) -> None:
+    if format == "csv":
+        writer.writerows(partition)
+    else:
+        for row in partition:
+            buffer.write(json.dumps(dict(zip(columns, row)), default=json_default))
+            buffer.write("\n")
+
+
+def write_export(
+    db: Session,
+    path: str,
+    query: Select,
+    format: str,
+    compress: bool,
+    progress: Callable[[float | None, str], None] | None = None,
+) -> int:
+    """Write the query's rows to `path`; returns the row count."""
+    total = db.scalar(select(func.count()).select_from(query.order_by(None).subquery())) or 0
+    opener = gzip.open if compress else open
+    written = 0
+    with opener(path, "wt", encoding="utf-8", newline="") as out:
+        result = db.connection().execute(query.execution_options(yield_per=PARTITION_ROWS))
+        columns = list(result.keys())
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        if format == "csv":
+            writer.writerow(columns)
+        for partition in result.partitions():
+            encode_partition(buffer, writer, columns, partition, format)
+            out.write(buffer.getvalue())
+            buffer.seek(0)
+            buffer.truncate()
+            written += len(partition)
+            if progress:
+                progress(written / max(total, 1), f"Wrote {written} of {total} rows")
+        out.write(buffer.getvalue())
+    return written
+
+
+def export_filename(dataset: str, format: str, compress: bool) -> str:
+    return f"{dataset}.{format}" + (".gz" if compress else "")
@@ -0,0 +1,322 @@
+"""Fixture generation for the tournament formats offered by GenerateFixtures.
+
+The builders are pure: they take seeded team names (best seed first) and
+return Fixture rows. Knockout rounds that depend on earlier results get
+placeholder names such as "Winner W1-3" (winners bracket, round 1, match 3)
+until results fill them in. `persist_fixtures` writes a whole set with one
+bulk INSERT ... RETURNING, linking each side to its team id when it is a
+real team rather than a placeholder.
+
+`generate_tournament_fixtures` does the whole thing for one tournament on a
+sync session, so the same code runs inside a request (through
+`AsyncSession.run_sync`) and in a background job for large fields.
+"""
+from dataclasses import dataclass
+
+import networkx as nx
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.models.match import Match
+from app.services.jobs import Progress
+from app.services.results import winner_of
+from app.services.teams import tournament_teams
+
+
+SINGLE_ELIMINATION = "Single Elimination"
+DOUBLE_ELIMINATION = "Double Elimination"
+ROUND_ROBIN = "Round Robin"
+SWISS = "Swiss System"
+FORMATS = (SINGLE_ELIMINATION, DOUBLE_ELIMINATION, ROUND_ROBIN, SWISS)
+
+# Placeholder label prefix per bracket: "Winner W1-3" is the winner of match 3 of winners round 1
+BRACKET_PREFIXES = {"main": "R", "winners": "W", "losers": "L", "grand_final": "GF"}
+
+
+@dataclass(slots=True)
+class Fixture:
+    bracket: str  # "main", "winners", "losers", "grand_final", "round_robin" or "swiss"
+    round_number: int
+    team1_name: str
+    team2_name: str
+
+
+class _Bracket:
+    """Plays sources (team names or placeholders) against each other round by round.
+
+    A source of None is a bye: the other side advances without a match.
+    """
+
+    def __init__(self, fixtures: list[Fixture], bracket: str, prefix: str) -> None:
+        self.fixtures = fixtures
+        self.bracket = bracket
+        self.prefix = prefix
+        self._round_counts: dict[int, int] = {}
+
+    def play(self, round_number: int, a: str | None, b: str | None) -> tuple[str | None, str | None]:
+        if a is None:
+            return b, None
+        if b is None:
+            return a, None
+        number = self._round_counts.get(round_number, 0) + 1
+        self._round_counts[round_number] = number
+        self.fixtures.append(Fixture(self.bracket, round_number, a, b))
+        label = f"{self.prefix}{round_number}-{number}"
+        return f"Winner {label}", f"Loser {label}"
+
+    def play_round(self, round_number: int, sources: list[str | None]) -> tuple[list, list]:
+        winners, losers = [], []
+        for i in range(0, len(sources) - 1, 2):
+            winner, loser = self.play(round_number, sources[i], sources[i + 1])
+            winners.append(winner)
+            losers.append(loser)
+        if len(sources) % 2:
+            winners.append(sources[-1])
+        return winners, losers
+
+
+def _seed_positions(size: int) -> list[int]:
+    """Standard bracket order for `size` slots (a power of two), 1-based seeds: 1 v size, 2 v size-1, ..."""
+    positions = [1]
+    while len(positions) < size:
+        total = len(positions) * 2 + 1
+        positions = [seed for s in positions for seed in (s, total - s)]
+    return positions
+
+
+def _seeded_slots(teams: list[str]) -> list[str | None]:
+    size = 1
+    while size < len(teams):
+        size *= 2
+    # Seeds past the field are byes, so the top seeds skip round one
+    return [teams[seed - 1] if seed <= len(teams) else None for seed in _seed_positions(size)]
+
+
+def _check_field(teams: list[str]) -> None:
+    if len(teams) < 2:
+        raise ValueError("At least two teams are required")
+
+
+def single_elimination(teams: list[str]) -> list[Fixture]:
+    _check_field(teams)
+    fixtures: list[Fixture] = []
+    bracket = _Bracket(fixtures, "main", BRACKET_PREFIXES["main"])
+    sources = _seeded_slots(teams)
+    round_number = 1
+    while len(sources) > 1:
+        sources, _ = bracket.play_round(round_number, sources)
+        round_number += 1
+    return fixtures
+
+
+def double_elimination(teams: list[str]) -> list[Fixture]:
+    _check_field(teams)
+    fixtures: list[Fixture] = []
+    winners = _Bracket(fixtures, "winners", BRACKET_PREFIXES["winners"])
+    losers = _Bracket(fixtures, "losers", BRACKET_PREFIXES["losers"])
+
+    sources = _seeded_slots(teams)
+    dropped: list[list[str | None]] = []
+    round_number = 1
+    while len(sources) > 1:
+        sources, round_losers = winners.play_round(round_number, sources)
+        dropped.append(round_losers)
+        round_number += 1
+    winners_champion = sources[0]
+
+    # Losers round 1 pairs the winners-bracket round 1 losers. After that each
+    # winners round feeds its losers in (reversed, to delay rematches), and
+    # the survivors play each other whenever more than one remains.
+    lb_round = 1
+    lb_sources, _ = losers.play_round(lb_round, dropped[0])
+    for round_losers in dropped[1:]:
+        lb_round += 1
+        lb_sources = [
+            losers.play(lb_round, survivor, dropped_in)[0]
+            for survivor, dropped_in in zip(lb_sources, reversed(round_losers))
+        ]
+        if len(lb_sources) > 1:
+            lb_round += 1
+            lb_sources, _ = losers.play_round(lb_round, lb_sources)
+    losers_champion = lb_sources[0]
+
+    _Bracket(fixtures, "grand_final", BRACKET_PREFIXES["grand_final"]).play(1, winners_champion, losers_champion)
+    return fixtures
+
+
+def round_robin(teams: list[str]) -> list[Fixture]:
+    """Circle method: fix the first team, rotate the rest one place per round."""
+    _check_field(teams)
+    field: list[str | None] = list(teams)
+    if len(field) % 2:
+        field.append(None)
+    n = len(field)
+    fixtures: list[Fixture] = []
+    for round_number in range(1, n):
+        for i in range(n // 2):
+            home, away = field[i], field[n - 1 - i]
+            if home is not None and away is not None:
+                # Alternate sides so no team is always listed first
+                if round_number % 2 == 0 and i == 0:
+                    home, away = away, home
+                fixtures.append(Fixture("round_robin", round_number, home, away))
+        field = [field[0], field[-1], *field[1:-1]]
+    return fixtures
+
+
+def swiss_round(
+    teams: list[str],
+    standings: dict[str, int],
+    played: set[frozenset[str]],
+    byes: set[str],
+    round_number: int,
+) -> list[Fixture]:
+    """Pair one Swiss round over current standings.
+
+    Teams are ranked by points (seed order breaks ties) and paired without
+    rematches at minimum total cost (see _pair_min_cost). Round one pairs
+    the top half of the seeds against the bottom half. With an odd field
+    the lowest-ranked team that hasn't had a bye sits out.
+    """
+    _check_field(teams)
+    seed = {team: i for i, team in enumerate(teams)}
+    ranked = sorted(teams, key=lambda team: (-standings.get(team, 0), seed[team]))
+    if len(ranked) % 2:
+        bye = next((team for team in reversed(ranked) if team not in byes), ranked[-1])
+        ranked.remove(bye)
+
+    if round_number == 1:
+        half = len(ranked) // 2
+        return [Fixture("swiss", 1, a, b) for a, b in zip(ranked[:half], ranked[half:])]
+
+    pairs = _pair_min_cost(ranked, [standings.get(team, 0) for team in ranked], played)
+    if pairs is None:
+        raise ValueError("No valid Swiss pairing without rematches")
+    return [Fixture("swiss", round_number, a, b) for a, b in pairs]
+
+
+def _pair_min_cost(
+    ranked: list[str],
+    points: list[int],
+    played: set[frozenset[str]],
+) -> list[tuple[str, str]] | None:
+    """Rematch-free pairing of `ranked` with the lowest total cost, or None.
+
+    A pair costs its score difference squared, then its rank distance, so
+    the pairing keeps scores as level as possible and pairs equal scores
+    closest-ranked. Solved exactly as a minimum-cost perfect matching over
+    the pairs that haven't met (Edmonds' blossom algorithm, O(n^3)).
+    """
+    n = len(ranked)
+    scale = n * n  # above any total rank distance, so score differences always dominate
+    graph = nx.Graph()
+    graph.add_nodes_from(range(n))
+    costs = {
+        (i, j): (points[i] - points[j]) ** 2 * scale + (j - i)
+        for i in range(n)
+        for j in range(i + 1, n)
+        if frozenset((ranked[i], ranked[j])) not in played
+    }
+    if not costs:
+        return None
+    # networkx maximises weight, so weigh each pair by how much cheaper it is than the dearest;
+    # among perfect matchings (all the same size) that is the cheapest one
+    ceiling = max(costs.values()) + 1
+    graph.add_weighted_edges_from((i, j, ceiling - cost) for (i, j), cost in costs.items())
+    matching = nx.max_weight_matching(graph, maxcardinality=True)
+    if 2 * len(matching) != n:
+        return None
+    return [(ranked[i], ranked[j]) for i, j in sorted(tuple(sorted(pair)) for pair in matching)]
+
+
+def build_fixtures(format: str, teams: list[str]) -> list[Fixture]:
+    """Fixtures for the whole event; Swiss only returns its opening round."""
+    if format == SINGLE_ELIMINATION:
+        return single_elimination(teams)
+    if format == DOUBLE_ELIMINATION:
+        return double_elimination(teams)
+    if format == ROUND_ROBIN:
+        return round_robin(teams)
+    if format == SWISS:
+        return swiss_round(teams, {}, set(), set(), 1)
+    raise ValueError(f"Unknown format '{format}', expected one of: {', '.join(FORMATS)}")
+
+
+def persist_fixtures(
+    db: Session,
+    tournament_id: int,
+    fixtures: list[Fixture],
+    team_ids: dict[str, int] | None = None,
+) -> list[Match]:
+    team_ids = team_ids or {}
+    rows = [
+        {
+            "tournament_id": tournament_id,
+            "team1_name": fixture.team1_name,
+            "team2_name": fixture.team2_name,
+            "team1_id": team_ids.get(fixture.team1_name),
+            "team2_id": team_ids.get(fixture.team2_name),
+            "round_number": fixture.round_number,
+            "bracket": fixture.bracket,
+            "status": "Scheduled",
+        }
+        for fixture in fixtures
+    ]
+    if not rows:
+        return []
+    return list(db.scalars(insert(Match).returning(Match), rows))
+
+
+def next_swiss_round(db: Session, tournament_id: int, teams: list[str]) -> list[Fixture]:
+    """Pair the next Swiss round from the tournament's completed Swiss matches."""
+    history = db.execute(
+        select(Match.round_number, Match.team1_name, Match.team2_name, Match.status, Match.score_team1, Match.score_team2)
+        .where(Match.tournament_id == tournament_id, Match.bracket == "swiss")
+    ).all()
+
+    standings: dict[str, int] = {}
+    played: set[frozenset[str]] = set()
+    appeared: dict[int, set[str]] = {}
+    for round_number, team1, team2, status, score1, score2 in history:
+        if status != "Completed":
+            raise ValueError(f"Swiss round {round_number} is not complete yet")
+        winner = team1 if winner_of(score1 or 0, score2 or 0) == "team1" else team2
+        standings[winner] = standings.get(winner, 0) + 1
+        played.add(frozenset((team1, team2)))
+        appeared.setdefault(round_number, set()).update((team1, team2))
+
+    # A team missing from a past round had the bye, which scores as a win
+    byes: set[str] = set()
+    for round_teams in appeared.values():
+        for team in teams:
+            if team not in round_teams:
+                byes.add(team)
+                standings[team] = standings.get(team, 0) + 1
+
+    return swiss_round(teams, standings, played, byes, max(appeared, default=0) + 1)
+
+
+def generate_tournament_fixtures(
+    db: Session,
+    tournament_id: int,
+    format: str,
+    default_teams: int,
+    progress: Progress | None = None,
+) -> list[Match]:
+    """Build and insert the fixtures for a tournament (Swiss: its next round).
+
+    Uses the registered teams in seed order, or creates "Team 1".."Team N"
+    on first use. Raises ValueError for an unknown format or an unpairable
+    field. `progress` is called once the pairing is done, before anything
+    is inserted. Does not commit.
+    """
+    team_rows = tournament_teams(db, tournament_id, default_teams)
+    teams = [team.name for team in team_rows]
+    if format == SWISS:
+        fixtures = next_swiss_round(db, tournament_id, teams)
+    else:
+        fixtures = build_fixtures(format, teams)
+    if progress:
+        progress(0.5, f"Saving {len(fixtures)} matches")
+    # One INSERT ... RETURNING for the whole set instead of a refresh per match
+    return persist_fixtures(db, tournament_id, fixtures, {team.name: team.id for team in team_rows})
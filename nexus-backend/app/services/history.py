@@ -0,0 +1,100 @@
+"""A player's completed matches with scores, results and both lineups.
+
+A page always takes two statements however long it is: one keyset query
+over the player's match_players rows (found through the (player_id,
+match_id) index) joined to their matches, and one query for the lineups
+of every match on the page.
+
+Newest first means by Match.scheduled_at, descending, with unscheduled
+matches last and the match id breaking ties; match ids follow insertion
+order, which is not play order once fixtures are rescheduled.
+"""
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.schemas.player import LineupEntry, PlayerMatchEntry
+from app.services.results import winner_of
+
+
+async def player_history(
+    db: AsyncSession,
+    player_id: int,
+    before: tuple[datetime | None, int] | None = None,
+    limit: int = 20,
+) -> tuple[list[PlayerMatchEntry], tuple[datetime | None, int] | None]:
+    """Up to `limit` entries after the (scheduled_at, match_id) key `before`, and the key to continue from (or None)."""
+    query = (
+        select(
+            MatchPlayer.match_id,
+            MatchPlayer.team,
+            MatchPlayer.score,
+            Match.tournament_id,
+            Match.scheduled_at,
+            Match.round_number,
+            Match.bracket,
+            Match.team1_name,
+            Match.team2_name,
+            Match.score_team1,
+            Match.score_team2,
+        )
+        .join(Match, Match.id == MatchPlayer.match_id)
+        .where(MatchPlayer.player_id == player_id, Match.status == "Completed")
+        .order_by(Match.scheduled_at.desc().nulls_last(), MatchPlayer.match_id.desc())
+        .limit(limit + 1)
+    )
+    if before is not None:
+        scheduled_at, match_id = before
+        if scheduled_at is None:
+            query = query.where(Match.scheduled_at.is_(None), MatchPlayer.match_id < match_id)
+        else:
+            query = query.where(or_(
+                Match.scheduled_at < scheduled_at,
+                and_(Match.scheduled_at == scheduled_at, MatchPlayer.match_id < match_id),
+                Match.scheduled_at.is_(None),
+            ))
+    rows = (await db.execute(query)).all()
+
+    next_key = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_key = (rows[-1].scheduled_at, rows[-1].match_id)
+    if not rows:
+        return [], None
+
+    lineups: dict[tuple[int, str], list[LineupEntry]] = defaultdict(list)
+    for match_id, team, lineup_player_id, score, player_name in await db.execute(
+        select(MatchPlayer.match_id, MatchPlayer.team, MatchPlayer.player_id, MatchPlayer.score, Player.player_name)
+        .join(Player, Player.id == MatchPlayer.player_id)
+        .where(MatchPlayer.match_id.in_([row.match_id for row in rows]))
+        .order_by(MatchPlayer.id)
+    ):
+        lineups[match_id, team].append(LineupEntry(player_id=lineup_player_id, player_name=player_name, score=score))
+
+    entries = []
+    for row in rows:
+        on_team1 = row.team == "team1"
+        other = "team2" if on_team1 else "team1"
+        score_team1, score_team2 = row.score_team1 or 0, row.score_team2 or 0
+        entries.append(PlayerMatchEntry(
+            match_id=row.match_id,
+            tournament_id=row.tournament_id,
+            scheduled_at=row.scheduled_at,
+            round_number=row.round_number,
+            bracket=row.bracket,
+            team=row.team,
+            team_name=row.team1_name if on_team1 else row.team2_name,
+            opponent_name=row.team2_name if on_team1 else row.team1_name,
+            score=row.score,
+            team_score=score_team1 if on_team1 else score_team2,
+            opponent_score=score_team2 if on_team1 else score_team1,
+            result="win" if winner_of(score_team1, score_team2) == row.team else "loss",
+            teammates=[entry for entry in lineups[row.match_id, row.team] if entry.player_id != player_id],
+            opponents=lineups[row.match_id, other],
+        ))
+    return entries, next_key
@@ -0,0 +1,110 @@
+"""What each background job kind does; see app.services.jobs for the runner.
+
+Every handler takes a JobContext, validates its params with the kind's
+schema from app.schemas.job, does the work on its own sync session and
+returns the JSON result stored on the job.
+"""
+import os
+
+from app.core.config import get_settings
+from app.core.http_cache import response_cache
+from app.core.invalidation import ALL, invalidate
+from app.db.session import SessionLocal
+from app.models.tournament import Tournament
+from app.schemas.job import ExportJobParams, FixturesJobParams, RerateJobParams, StatsRebuildJobParams
+from app.services.exports import export_filename, export_query, write_export
+from app.services.fixtures import generate_tournament_fixtures
+from app.services.jobs import Handler, JobContext
+from app.services.leaderboard import leaderboard
+from app.services.player_feed import match_row, player_feed
+from app.services.ratings import run_replay
+from app.services.stats_rebuild import run_rebuild
+from app.services.teams import tournament_teams
+
+
+settings = get_settings()
+
+
+async def _players_changed() -> None:
+    leaderboard.reset()
+    await response_cache.bump("players")
+
+
+def _tell_workers_players_changed() -> None:
+    # The rebuild committed inside its service; this commit only carries the notification
+    with SessionLocal() as db:
+        invalidate(db, players=ALL, responses=("players",))
+        db.commit()
+
+
+def generate_fixtures(ctx: JobContext) -> dict:
+    params = FixturesJobParams.model_validate(ctx.params)
+    ctx.progress(0.0, "Pairing teams", force=True)
+    with SessionLocal() as db:
+        tournament = db.get(Tournament, params.tournament_id)
+        if not tournament:
+            raise ValueError("Tournament not found")
+        default_teams = tournament.number_of_teams or 16
+        # Commit the default teams first, so a cancel at the progress call after pairing
+        # (see JobContext.progress) finds no uncommitted writes to throw away
+        tournament_teams(db, tournament.id, default_teams)
+        db.commit()
+        matches = generate_tournament_fixtures(db, tournament.id, params.format, default_teams, ctx.progress)
+        invalidate(
+            db,
+            teams={team_id for match in matches for team_id in (match.team1_id, match.team2_id) if team_id is not None},
+            responses=("matches",),
+        )
+        db.commit()
+        rows = [match_row(match) for match in matches]
+
+    async def refresh() -> None:
+        await response_cache.bump("matches")
+        player_feed.add_matches(rows)
+
+    ctx.after_success(refresh)
+    return {"tournament_id": params.tournament_id, "matches": len(rows)}
+
+
+def rebuild_stats(ctx: JobContext) -> dict:
+    params = StatsRebuildJobParams.model_validate(ctx.params)
+    report = run_rebuild(params.apply, progress=ctx.progress)
+    if report["applied"]:
+        _tell_workers_players_changed()
+        ctx.after_success(_players_changed)
+    return report
+
+
+def replay_ratings(ctx: JobContext) -> dict:
+    params = RerateJobParams.model_validate(ctx.params)
+    report = run_replay(params.apply, progress=ctx.progress)
+    if report["applied"]:
+        _tell_workers_players_changed()
+        ctx.after_success(_players_changed)
+    return report
+
+
+def export(ctx: JobContext) -> dict:
+    params = ExportJobParams.model_validate(ctx.params)
+    os.makedirs(settings.job_output_dir, exist_ok=True)
+    filename = f"job-{ctx.job_id}-" + export_filename(params.dataset, params.format, params.gzip)
+    path = os.path.join(settings.job_output_dir, filename)
+    try:
+        with SessionLocal() as db:
+            rows = write_export(
+                db, path, export_query(params.dataset, params.tournament_id),
+                params.format, params.gzip, ctx.progress,
+            )
+    except BaseException:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return {"file": filename, "rows": rows, "bytes": os.path.getsize(path)}
+
+
+HANDLERS: dict[str, Handler] = {
+    "fixtures": generate_fixtures,
+    "stats_rebuild": rebuild_stats,
+    "rerate": replay_ratings,
+    "export": export,
+}
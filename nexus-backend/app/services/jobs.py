@@ -0,0 +1,319 @@
+"""Background jobs for heavy admin operations, persisted in the jobs table.
+
+Requests submit a job and return 202 at once; clients poll GET /jobs/{id}
+for status and progress. Each app process runs JOB_WORKERS threads that
+claim queued jobs with a conditional UPDATE (status 'queued' -> 'running'),
+so several processes can share one queue without double-running a job.
+
+Submitting deduplicates: the key is the kind plus a hash of the normalised
+parameters, and a partial unique index allows one queued or running job
+per key, so a repeated submit gets the job already in flight.
+
+Handlers (app.services.job_kinds) run in the worker thread on their own
+sync sessions. They call `ctx.progress(...)`, which records progress and a
+heartbeat and is where cancellation and shutdown take effect, so call it
+only when the work session holds no uncommitted writes: the job is then
+cancelled with nothing half-written. Cache refreshes that must happen on
+the event loop are registered with `ctx.after_success` and run there before
+the job is marked succeeded.
+"""
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import timedelta
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+
+from pydantic import BaseModel
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.job import ACTIVE_JOB_STATUSES, Job, utcnow
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+PROGRESS_INTERVAL = 0.5  # seconds between progress writes of one job
+HOOK_TIMEOUT = 30
+
+
+class JobCancelled(Exception):
+    """Raised from ctx.progress once a cancel was requested."""
+
+
+class JobInterrupted(Exception):
+    """Raised from ctx.progress while the runner is stopping; the job goes back to the queue."""
+
+
+def dedup_key(kind: str, params: dict) -> str:
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, separators=(",", ":")).encode()).hexdigest()
+    return f"{kind}:{digest}"
+
+
+# What job handlers pass to the services they call; JobContext.progress is one
+Progress = Callable[[float | None, str], None]
+
+
+class JobContext:
+    def __init__(self, runner: "JobRunner", job_id: int, params: dict) -> None:
+        self.runner = runner
+        self.job_id = job_id
+        self.params = params
+        self.hooks: list[Callable[[], Awaitable[None]]] = []
+        self._last_write = 0.0
+
+    def progress(self, fraction: float | None, message: str | None = None, force: bool = False) -> None:
+        """Record progress (0..1) and a heartbeat; raises if the job should stop.
+
+        Writes are throttled to one per PROGRESS_INTERVAL, so calling this
+        per chunk or per item is cheap.
+        """
+        if self.runner.stopping.is_set():
+            raise JobInterrupted()
+        now = time.monotonic()
+        if not force and now - self._last_write < PROGRESS_INTERVAL:
+            return
+        self._last_write = now
+        values = {"heartbeat_at": utcnow()}
+        if fraction is not None:
+            values["progress"] = min(max(fraction, 0.0), 1.0)
+        if message is not None:
+            values["message"] = message[:255]
+        try:
+            with SessionLocal() as db:
+                cancel = db.scalar(
+                    update(Job).where(Job.id == self.job_id).values(**values).returning(Job.cancel_requested)
+                )
+                db.commit()
+        except OperationalError:
+            # Progress is advisory; SQLite refuses the write while a long read holds the file
+            logger.debug("Progress write for job %s skipped", self.job_id, exc_info=True)
+            return
+        if cancel:
+            raise JobCancelled()
+
+    def after_success(self, hook: Callable[[], Awaitable[None]]) -> None:
+        """Run `hook()` on the event loop once the handler has returned."""
+        self.hooks.append(hook)
+
+
+Handler = Callable[[JobContext], dict]
+
+
+class JobRunner:
+    def __init__(self, workers: int, poll_seconds: float, stale_seconds: int) -> None:
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.stale_seconds = stale_seconds
+        self.handlers: dict[str, Handler] = {}
+        self.stopping = threading.Event()
+        self._wake = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stale_lock = threading.Lock()
+        self._next_stale_check = 0.0
+        self.counts = {"succeeded": 0, "failed": 0, "cancelled": 0, "requeued": 0}
+
+    def start(self, handlers: dict[str, Handler], loop: asyncio.AbstractEventLoop | None = None) -> None:
+        self.handlers = handlers
+        self._loop = loop
+        if self.workers <= 0 or self._threads:
+            return
+        self.stopping.clear()
+        self._next_stale_check = 0.0
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(f"{prefix}:{i}",), name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 30) -> None:
+        """Stop claiming; running jobs stop at their next progress call and are requeued.
+
+        Blocks until the workers exit, so call it off the event loop.
+        """
+        self.stopping.set()
+        self._wake.set()
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(max(deadline - time.monotonic(), 0))
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+
+    def wake(self) -> None:
+        """A job was just queued; don't wait for the next poll."""
+        self._wake.set()
+
+    def fail_stale(self) -> int:
+        """Fail running jobs whose worker stopped sending heartbeats (e.g. a killed process)."""
+        cutoff = utcnow() - timedelta(seconds=self.stale_seconds)
+        with SessionLocal() as db:
+            failed = db.execute(
+                update(Job)
+                .where(Job.status == "running", Job.heartbeat_at < cutoff)
+                .values(status="failed", error="Worker stopped responding", finished_at=utcnow())
+            ).rowcount
+            db.commit()
+        return failed
+
+    def _check_stale(self) -> None:
+        """Run fail_stale every stale_seconds / 2, from whichever worker gets here first."""
+        now = time.monotonic()
+        with self._stale_lock:
+            if now < self._next_stale_check:
+                return
+            self._next_stale_check = now + self.stale_seconds / 2
+        try:
+            if failed := self.fail_stale():
+                logger.warning("Failed %s job(s) whose worker stopped sending heartbeats", failed)
+        except Exception:
+            logger.exception("Failing stale jobs failed")
+
+    def _work(self, worker: str) -> None:
+        while not self.stopping.is_set():
+            # A process killed mid-job leaves it running; any live process fails it eventually
+            self._check_stale()
+            try:
+                claimed = self._claim(worker)
+            except Exception:
+                logger.exception("Claiming a job failed")
+                claimed = None
+            if claimed is None:
+                self._wake.wait(self.poll_seconds)
+                self._wake.clear()
+                continue
+            self._run(worker, *claimed)
+
+    def _claim(self, worker: str) -> tuple[int, str, dict] | None:
+        with SessionLocal() as db:
+            candidates = db.execute(
+                select(Job.id, Job.kind, Job.params).where(Job.status == "queued").order_by(Job.id).limit(5)
+            ).all()
+            for job_id, kind, params in candidates:
+                now = utcnow()
+                # Another worker may have taken it since the select; only one UPDATE matches
+                claimed = db.execute(
+                    update(Job)
+                    .where(Job.id == job_id, Job.status == "queued")
+                    .values(status="running", worker=worker, started_at=now, heartbeat_at=now)
+                ).rowcount
+                db.commit()
+                if claimed:
+                    return job_id, kind, params
+        return None
+
+    def _run(self, worker: str, job_id: int, kind: str, params: dict) -> None:
+        ctx = JobContext(self, job_id, params)
+        try:
+            handler = self.handlers.get(kind)
+            if handler is None:
+                raise ValueError(f"Unknown job kind '{kind}'")
+            result = handler(ctx)
+            for hook in ctx.hooks:
+                self._run_hook(job_id, hook)
+        except JobCancelled:
+            self._finish(worker, job_id, "cancelled", message="Cancelled")
+        except JobInterrupted:
+            self._requeue(worker, job_id)
+        except Exception as e:
+            logger.exception("Job %s (%s) failed", job_id, kind)
+            self._finish(worker, job_id, "failed", error=f"{type(e).__name__}: {e}")
+        else:
+            self._finish(worker, job_id, "succeeded", result=result, progress=1.0)
+
+    def _run_hook(self, job_id: int, hook: Callable[[], Awaitable[None]]) -> None:
+        if self._loop is None or self._loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(hook(), self._loop).result(HOOK_TIMEOUT)
+        except Exception:
+            # The work is committed; stale caches expire on their own
+            logger.exception("After-success hook of job %s failed", job_id)
+
+    def _still_ours(self, worker: str, job_id: int) -> tuple:
+        # fail_stale on another worker may have failed a job that went quiet for too long;
+        # its outcome then stays failed instead of being overwritten when the handler returns
+        return (Job.id == job_id, Job.status == "running", Job.worker == worker)
+
+    def _finish(self, worker: str, job_id: int, status: str, **values) -> None:
+        with SessionLocal() as db:
+            finished = db.execute(
+                update(Job).where(*self._still_ours(worker, job_id))
+                .values(status=status, finished_at=utcnow(), **values)
+            ).rowcount
+            db.commit()
+        if finished == 1:
+            self.counts[status] += 1
+        else:
+            logger.warning("Job %s is no longer running on %s (failed as stale?); dropping its %s outcome", job_id, worker, status)
+
+    def _requeue(self, worker: str, job_id: int) -> None:
+        with SessionLocal() as db:
+            requeued = db.execute(
+                update(Job)
+                .where(*self._still_ours(worker, job_id))
+                .values(status="queued", worker=None, started_at=None, heartbeat_at=None, message="Requeued on shutdown")
+            ).rowcount
+            db.commit()
+        if requeued == 1:
+            self.counts["requeued"] += 1
+
+
+async def submit_job(db: AsyncSession, kind: str, params: BaseModel, user_id: int | None) -> tuple[Job, bool]:
+    """Queue a job, or return the identical one already queued or running.
+
+    Returns (job, created); commits.
+    """
+    values = params.model_dump(mode="json")
+    key = dedup_key(kind, values)
+    active = select(Job).where(Job.dedup_key == key, Job.status.in_(ACTIVE_JOB_STATUSES))
+    existing = await db.scalar(active)
+    if existing:
+        return existing, False
+    job = Job(kind=kind, params=values, dedup_key=key, created_by=user_id)
+    db.add(job)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Lost a race with an identical submit
+        await db.rollback()
+        existing = await db.scalar(active)
+        if existing is None:
+            raise
+        return existing, False
+    job_runner.wake()
+    return job, True
+
+
+async def request_cancel(db: AsyncSession, job: Job) -> bool:
+    """Cancel a queued job now, or flag a running one to stop at its next progress call.
+
+    Returns False when the job has already finished; commits.
+    """
+    if job.status == "queued":
+        cancelled = (await db.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.status == "queued")
+            .values(status="cancelled", cancel_requested=True, message="Cancelled", finished_at=utcnow())
+        )).rowcount
+        if cancelled:
+            await db.commit()
+            await db.refresh(job)
+            return True
+        await db.refresh(job)  # claimed in the meantime
+    if job.status != "running":
+        return False
+    await db.execute(update(Job).where(Job.id == job.id).values(cancel_requested=True))
+    await db.commit()
+    await db.refresh(job)
+    return True
+
+
+job_runner = JobRunner(settings.job_workers, settings.job_poll_seconds, settings.job_stale_seconds)
@@ -0,0 +1,194 @@
+from bisect import bisect_left, insort
+from dataclasses import dataclass
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.player import Player
+
+
+ORDERINGS = ("points", "rating")
+
+
+@dataclass(slots=True)
+class LeaderboardEntry:
+    player_id: int
+    player_name: str
+    wins: int
+    losses: int
+    total_points: int
+    rating: float = 1500.0
+
+    def key(self, by: str) -> tuple:
+        # Sorted ascending, so negate to get DESC order; the player id is always
+        # last and breaks ties
+        if by == "rating":
+            return (-self.rating, self.player_id)
+        return (-self.total_points, -self.wins, self.player_id)
+
+    def as_dict(self, rank: int) -> dict:
+        return {
+            "rank": rank,
+            "player": self.player_name,
+            "wins": self.wins,
+            "losses": self.losses,
+            "points": self.total_points,
+            "rating": round(self.rating, 1),
+            "player_id": self.player_id,
+        }
+
+
+class LeaderboardIndex:
+    """In-memory ranked index of players.
+
+    Keeps a sorted list of rank keys per ordering ("points" or "rating")
+    next to a player_id -> entry map, so a page read or a rank lookup is a
+    bisect plus a slice (O(log n + k)) and never touches the database once
+    loaded. Writers push changed players in with `upsert` after their
+    transaction commits; upserts arriving while the index is being loaded
+    are held and applied on top of the loaded snapshot, which may predate
+    them.
+    """
+
+    def __init__(self) -> None:
+        self._keys: dict[str, list[tuple]] = {by: [] for by in ORDERINGS}
+        self._entries: dict[int, LeaderboardEntry] = {}
+        self._lock = threading.RLock()
+        self.loaded = False
+        # player id -> upsert arguments (None: removed) seen while a load is in flight
+        self._pending: dict[int, tuple | None] | None = None
+        self._loads = 0
+        self._generation = 0  # bumped by reset, so a load that started earlier is discarded
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        # Loops only if a reset lands while the snapshot is being read
+        while not self.loaded:
+            with self._lock:
+                generation = self._generation
+                if self._pending is None:
+                    self._pending = {}
+                self._loads += 1
+            try:
+                rows = await db.execute(
+                    select(
+                        Player.id,
+                        Player.player_name,
+                        Player.wins,
+                        Player.losses,
+                        Player.total_points,
+                        Player.rating,
+                    )
+                )
+                self.load((LeaderboardEntry(*row) for row in rows), generation)
+            finally:
+                with self._lock:
+                    self._loads -= 1
+                    if not self._loads:
+                        self._pending = None
+
+    def load(self, entries, generation: int | None = None) -> None:
+        with self._lock:
+            if generation is not None and (self.loaded or generation != self._generation):
+                return  # another load won, or a reset made this snapshot stale
+            self._entries = {entry.player_id: entry for entry in entries}
+            self._keys = {
+                by: sorted(entry.key(by) for entry in self._entries.values())
+                for by in ORDERINGS
+            }
+            self.loaded = True
+            for player_id, args in (self._pending or {}).items():
+                if args is None:
+                    self.remove(player_id)
+                else:
+                    self.upsert(player_id, *args)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._keys = {by: [] for by in ORDERINGS}
+            self._entries = {}
+            self.loaded = False
+            self._generation += 1
+            if self._pending is not None:
+                self._pending.clear()
+
+    def upsert(
+        self,
+        player_id: int,
+        player_name: str,
+        wins: int,
+        losses: int,
+        total_points: int,
+        rating: float | None = None,
+    ) -> None:
+        with self._lock:
+            # Nothing to maintain until the first read has built the index
+            if not self.loaded:
+                if self._pending is not None:
+                    self._pending[player_id] = (player_name, wins, losses, total_points, rating)
+                return
+            old = self._entries.get(player_id)
+            if old is not None:
+                self._remove_keys(old)
+                if rating is None:
+                    rating = old.rating
+            entry = LeaderboardEntry(
+                player_id, player_name, wins or 0, losses or 0, total_points or 0,
+                1500.0 if rating is None else rating,
+            )
+            self._entries[player_id] = entry
+            for by, keys in self._keys.items():
+                insort(keys, entry.key(by))
+
+    def remove(self, player_id: int) -> None:
+        with self._lock:
+            if not self.loaded:
+                if self._pending is not None:
+                    self._pending[player_id] = None
+                return
+            old = self._entries.pop(player_id, None)
+            if old is not None:
+                self._remove_keys(old)
+
+    def _remove_keys(self, entry: LeaderboardEntry) -> None:
+        for by, keys in self._keys.items():
+            key = entry.key(by)
+            pos = bisect_left(keys, key)
+            if pos < len(keys) and keys[pos] == key:
+                del keys[pos]
+
+    def page(self, offset: int = 0, limit: int = 50, by: str = "points") -> list[dict]:
+        with self._lock:
+            keys = self._keys[by][offset:offset + limit]
+            return [
+                self._entries[key[-1]].as_dict(rank)
+                for rank, key in enumerate(keys, start=offset + 1)
+            ]
+
+    def rank_of(self, player_id: int, by: str = "points") -> int | None:
+        with self._lock:
+            entry = self._entries.get(player_id)
+            if entry is None:
+                return None
+            return bisect_left(self._keys[by], entry.key(by)) + 1
+
+    def entry_for(self, player_id: int, by: str = "points") -> dict | None:
+        with self._lock:
+            rank = self.rank_of(player_id, by)
+            if rank is None:
+                return None
+            return self._entries[player_id].as_dict(rank)
+
+    def around(self, player_id: int, radius: int = 5, by: str = "points") -> list[dict]:
+        with self._lock:
+            rank = self.rank_of(player_id, by)
+            if rank is None:
+                return []
+            offset = max(rank - 1 - radius, 0)
+            return self.page(offset, rank - offset + radius, by)
+
+
+leaderboard = LeaderboardIndex()
@@ -0,0 +1,198 @@
+"""Write-behind aggregation of live match events into running scores.
+
+POST /events appends each batch to match_events (the durable log) and
+hands it to `live_scores.add`, which only sums points in memory per match,
+team and player. Every LIVE_FLUSH_MS the pending sums are written in one
+transaction for all touched matches:
+
+- one executemany incrementing Match.score_team1 / score_team2;
+- one executemany incrementing existing MatchPlayer rows, and one bulk
+  INSERT for players scoring in that match for the first time;
+
+then the new scores are pushed to live viewers and player feeds. Increments
+happen in SQL, so several workers flushing the same match add up. Only
+Live matches are written, and they are locked (in id order, like
+app.services.results) for the whole flush: once a referee completes a match
+its late events stay in the log but no longer move scores.
+
+These totals are for viewers. Sums still pending on a worker that dies are
+lost from them, but not from the log: a referee submission reconciles
+against the match_events log (see app.services.results).
+"""
+import asyncio
+from collections import defaultdict
+from dataclasses import dataclass, field
+import logging
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from app.core.config import get_settings
+from app.core.http_cache import response_cache
+from app.core.invalidation import invalidate
+from app.core.realtime import publish_match_diff
+from app.core.serialization import rows_as_dicts, select_for
+from app.db.session import AsyncSessionLocal
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.schemas.match import MatchOut
+from app.services.player_feed import player_feed
+
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+matches_table = Match.__table__
+match_players_table = MatchPlayer.__table__
+
+increment_match_scores = (
+    update(matches_table)
+    .where(matches_table.c.id == bindparam("b_match_id"))
+    .values(
+        score_team1=func.coalesce(matches_table.c.score_team1, 0) + bindparam("b_team1"),
+        score_team2=func.coalesce(matches_table.c.score_team2, 0) + bindparam("b_team2"),
+    )
+)
+
+increment_player_score = (
+    update(match_players_table)
+    .where(
+        match_players_table.c.match_id == bindparam("b_match_id"),
+        match_players_table.c.player_id == bindparam("b_player_id"),
+    )
+    .values(score=match_players_table.c.score + bindparam("b_points"))
+)
+
+
+@dataclass(slots=True)
+class _Pending:
+    team1: int = 0
+    team2: int = 0
+    players: dict[int, list] = field(default_factory=dict)  # player id -> [team, points]
+
+
+class LiveScoreAggregator:
+    def __init__(self, flush_interval: float) -> None:
+        self.flush_interval = flush_interval
+        self._pending: dict[int, _Pending] = {}
+        # One flush at a time, so a referee's flush waits for the one already writing its match
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self.events = 0
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, events: list[dict]) -> None:
+        for event in events:
+            pending = self._pending.get(event["match_id"])
+            if pending is None:
+                pending = self._pending[event["match_id"]] = _Pending()
+            if event["team"] == "team1":
+                pending.team1 += event["points"]
+            else:
+                pending.team2 += event["points"]
+            entry = pending.players.setdefault(event["player_id"], [event["team"], 0])
+            entry[1] += event["points"]
+        self.events += len(events)
+
+    def _take(self, match_ids) -> dict[int, _Pending]:
+        if match_ids is None:
+            taken, self._pending = self._pending, {}
+            return taken
+        return {match_id: self._pending.pop(match_id) for match_id in match_ids if match_id in self._pending}
+
+    def _restore(self, taken: dict[int, _Pending]) -> None:
+        for match_id, pending in taken.items():
+            current = self._pending.setdefault(match_id, _Pending())
+            current.team1 += pending.team1
+            current.team2 += pending.team2
+            for player_id, (team, points) in pending.players.items():
+                current.players.setdefault(player_id, [team, 0])[1] += points
+
+    async def flush(self, match_ids=None) -> int:
+        """Write pending sums (of `match_ids`, or all); returns how many matches were written."""
+        async with self._lock:
+            taken = self._take(match_ids)
+            if not taken:
+                return 0
+            try:
+                rows = await self._write(taken)
+            except BaseException:
+                # Also on cancellation: retried on the next flush (or the one in stop()).
+                # The events themselves are already stored.
+                self._restore(taken)
+                raise
+            self.flushes += 1
+
+        if rows:
+            await response_cache.bump("matches")
+        for row in rows:
+            player_feed.update_match(row)
+            publish_match_diff(row["id"], row["tournament_id"], {
+                "score_team1": row["score_team1"],
+                "score_team2": row["score_team2"],
+            })
+        return len(rows)
+
+    async def _write(self, taken: dict[int, _Pending]) -> list[dict]:
+        async with AsyncSessionLocal() as db:
+            # Locked until the commit, so a referee can't complete one of them between this check
+            # and the increments below; results takes the same locks in the same order
+            live = list(await db.scalars(
+                select(Match.id).where(Match.id.in_(taken), Match.status == "Live")
+                .order_by(Match.id).with_for_update()
+            ))
+            if not live:
+                return []
+            existing: dict[int, set[int]] = defaultdict(set)
+            for match_id, player_id in await db.execute(
+                select(MatchPlayer.match_id, MatchPlayer.player_id).where(MatchPlayer.match_id.in_(live))
+            ):
+                existing[match_id].add(player_id)
+
+            increments, new_rows = [], []
+            for match_id in live:
+                for player_id, (team, points) in taken[match_id].players.items():
+                    if player_id in existing[match_id]:
+                        increments.append({"b_match_id": match_id, "b_player_id": player_id, "b_points": points})
+                    else:
+                        new_rows.append({"match_id": match_id, "player_id": player_id, "team": team, "score": points})
+            await db.execute(increment_match_scores, [
+                {"b_match_id": match_id, "b_team1": taken[match_id].team1, "b_team2": taken[match_id].team2}
+                for match_id in live
+            ])
+            if increments:
+                await db.execute(increment_player_score, increments)
+            if new_rows:
+                await db.execute(insert(MatchPlayer), new_rows)
+            rows = rows_as_dicts(MatchOut, (await db.execute(
+                select_for(MatchOut, Match).where(Match.id.in_(live))
+            )).all())
+            invalidate(db, matches=live, responses=("matches",))
+            await db.commit()
+            return rows
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Flushing live scores failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._lock = asyncio.Lock()  # bound to the serving loop
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            # A flush it was running puts its sums back when cancelled; the final flush writes them
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+
+
+live_scores = LiveScoreAggregator(settings.live_flush_ms / 1000)
@@ -0,0 +1,166 @@
+"""A player's upcoming (Scheduled / Live) matches, through their team rosters.
+
+Building a feed takes two indexed lookups: the player's teams from
+team_members (player_id index), then the active matches on either side of
+those teams (the (team1_id, status) and (team2_id, status) indexes).
+
+Feeds are cached per player in memory, with reverse maps from team and
+match ids to the cached players, so writers patch them in place after
+their transaction commits instead of evicting them:
+
+- new fixtures are appended to the feeds of cached members of either team;
+- a match edit (status, schedule, room code) replaces the cached row, and
+  a match that is no longer Scheduled or Live leaves every feed;
+- roster changes evict the players involved, whose team sets changed.
+
+The cache is per worker process; FEED_TTL_SECONDS bounds how long a feed
+can miss a write made on another worker.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+import time
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.serialization import rows_as_dicts, select_for
+from app.models.match import Match
+from app.models.player import Player
+from app.models.team_member import TeamMember
+from app.schemas.match import MatchOut
+
+
+settings = get_settings()
+
+ACTIVE_STATUSES = ("Scheduled", "Live")
+
+
+def match_row(match: Match) -> dict:
+    """A Match as the MatchOut-shaped dict the feed stores."""
+    return {name: getattr(match, name) for name in MatchOut.model_fields}
+
+
+def feed_order(row: dict) -> tuple:
+    # Same order as the match list pages: by schedule, unscheduled last, then id
+    return (row["scheduled_at"] is None, row["scheduled_at"] or 0, row["id"])
+
+
+@dataclass(slots=True)
+class _Feed:
+    loaded_at: float
+    team_ids: frozenset[int]
+    matches: dict[int, dict]
+
+
+class PlayerFeedCache:
+    def __init__(self, max_entries: int, ttl: float) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._feeds: OrderedDict[int, _Feed] = OrderedDict()
+        self._by_team: dict[int, set[int]] = {}
+        self._by_match: dict[int, set[int]] = {}
+        # User ids never move between players, so this is never invalidated
+        self._player_of_user: dict[int, int | None] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._feeds)
+
+    async def player_id_for(self, db: AsyncSession, user_id: int) -> int | None:
+        if user_id not in self._player_of_user:
+            player_id = await db.scalar(select(Player.id).where(Player.user_id == user_id))
+            if player_id is None:
+                return None  # may still register; don't remember the miss
+            self._player_of_user[user_id] = player_id
+        return self._player_of_user[user_id]
+
+    async def get(self, db: AsyncSession, player_id: int) -> list[dict]:
+        """The player's active matches in feed order."""
+        feed = self._feeds.get(player_id)
+        if feed is not None and time.monotonic() - feed.loaded_at < self.ttl:
+            self._feeds.move_to_end(player_id)
+            self.hits += 1
+        else:
+            self.misses += 1
+            feed = await self._load(db, player_id)
+        return sorted(feed.matches.values(), key=feed_order)
+
+    async def _load(self, db: AsyncSession, player_id: int) -> _Feed:
+        team_ids = frozenset(await db.scalars(select(TeamMember.team_id).where(TeamMember.player_id == player_id)))
+        rows = []
+        if team_ids:
+            rows = (await db.execute(
+                select_for(MatchOut, Match).where(
+                    Match.status.in_(ACTIVE_STATUSES),
+                    or_(Match.team1_id.in_(team_ids), Match.team2_id.in_(team_ids)),
+                )
+            )).all()
+        self.evict(player_id)
+        feed = _Feed(time.monotonic(), team_ids, {row["id"]: row for row in rows_as_dicts(MatchOut, rows)})
+        self._feeds[player_id] = feed
+        for team_id in team_ids:
+            self._by_team.setdefault(team_id, set()).add(player_id)
+        for match_id in feed.matches:
+            self._by_match.setdefault(match_id, set()).add(player_id)
+        while len(self._feeds) > self.max_entries:
+            self.evict(next(iter(self._feeds)))
+        return feed
+
+    def evict(self, player_id: int) -> None:
+        feed = self._feeds.pop(player_id, None)
+        if feed is None:
+            return
+        for team_id in feed.team_ids:
+            self._discard(self._by_team, team_id, player_id)
+        for match_id in feed.matches:
+            self._discard(self._by_match, match_id, player_id)
+
+    def evict_players(self, player_ids) -> None:
+        for player_id in player_ids:
+            self.evict(player_id)
+
+    def evict_teams(self, team_ids) -> None:
+        """Drop the feeds of cached members of these teams, e.g. after another worker added matches."""
+        for team_id in team_ids:
+            self.evict_players(list(self._by_team.get(team_id, ())))
+
+    def add_matches(self, rows: list[dict]) -> None:
+        """New matches (e.g. generated fixtures) join the feeds of cached members of either team."""
+        for row in rows:
+            if row["status"] not in ACTIVE_STATUSES:
+                continue
+            for team_id in (row["team1_id"], row["team2_id"]):
+                for player_id in self._by_team.get(team_id, ()):
+                    self._feeds[player_id].matches[row["id"]] = row
+                    self._by_match.setdefault(row["id"], set()).add(player_id)
+
+    def update_match(self, row: dict) -> None:
+        """A cached match changed; keep the new row, or drop it once it is no longer active."""
+        if row["status"] not in ACTIVE_STATUSES:
+            self.remove_matches([row["id"]])
+            return
+        for player_id in self._by_match.get(row["id"], ()):
+            self._feeds[player_id].matches[row["id"]] = row
+
+    def remove_matches(self, match_ids) -> None:
+        for match_id in match_ids:
+            for player_id in self._by_match.pop(match_id, ()):
+                self._feeds[player_id].matches.pop(match_id, None)
+
+    def reset(self) -> None:
+        self._feeds.clear()
+        self._by_team.clear()
+        self._by_match.clear()
+
+    @staticmethod
+    def _discard(index: dict[int, set[int]], key: int, player_id: int) -> None:
+        players = index.get(key)
+        if players is not None:
+            players.discard(player_id)
+            if not players:
+                del index[key]
+
+
+player_feed = PlayerFeedCache(settings.feed_cache_size, settings.feed_ttl_seconds)
@@ -0,0 +1,257 @@
+"""Team Elo ratings driven by match_players.
+
+A team's strength is the mean rating of its players. After a result every
+player on a team moves by the same amount, K * (actual - expected), with a
+draw scoring 0.5. The delta each player got is stored on their
+match_players row, so a resubmitted result can be reversed exactly.
+
+`rate_rows` rates results as they are submitted (see app.services.results).
+`replay_ratings` re-rates a whole season from scratch in chronological order
+(scheduled_at, then id). It splits matches into "waves": a match goes in the
+wave after the last one any of its players appeared in. No player is in two
+matches of the same wave, so a wave can be rated in one vectorized NumPy
+step and still give the same result as going match by match. An optional
+`progress(fraction, message)` callback is called per wave.
+
+    python -m app.services.ratings [--apply]
+"""
+import argparse
+from collections import defaultdict
+import json
+import time
+
+import numpy as np
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.arrays import rows_to_array
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.services.jobs import Progress
+
+
+settings = get_settings()
+
+INITIAL_RATING = 1500.0
+
+players_table = Player.__table__
+match_players_table = MatchPlayer.__table__
+
+increment_player_rating = (
+    update(players_table)
+    .where(players_table.c.id == bindparam("b_player_id"))
+    .values(rating=func.coalesce(players_table.c.rating, INITIAL_RATING) + bindparam("b_rating"))
+)
+
+set_player_rating = (
+    update(players_table)
+    .where(players_table.c.id == bindparam("b_player_id"))
+    .values(rating=bindparam("b_rating"))
+)
+
+set_rating_delta = (
+    update(match_players_table)
+    .where(match_players_table.c.id == bindparam("b_row_id"))
+    .values(rating_delta=bindparam("b_delta"))
+)
+
+
+def team1_delta(mean1, mean2, score_team1, score_team2, k: float):
+    """Rating change for each team1 player (team2 gets the negation); works on arrays too."""
+    expected = 1.0 / (1.0 + 10.0 ** ((mean2 - mean1) / 400.0))
+    actual = (np.sign(np.subtract(score_team1, score_team2)) + 1.0) / 2.0
+    return k * (actual - expected)
+
+
+def rate_rows(
+    rows: list[dict],
+    ratings: dict[int, float],
+    score_team1: int,
+    score_team2: int,
+    previous_rows=(),
+) -> dict[int, float]:
+    """Rate one result against `ratings` (updated in place).
+
+    Fills each row's rating_delta and returns the net rating change per
+    player. `previous_rows` are the match's old match_players rows on a
+    resubmission; their deltas are reversed first.
+    """
+    change: dict[int, float] = defaultdict(float)
+    for row in previous_rows:
+        if row["rating_delta"]:
+            change[row["player_id"]] -= row["rating_delta"]
+            ratings[row["player_id"]] = (ratings.get(row["player_id"]) or INITIAL_RATING) - row["rating_delta"]
+
+    team1 = [ratings.get(row["player_id"]) or INITIAL_RATING for row in rows if row["team"] == "team1"]
+    team2 = [ratings.get(row["player_id"]) or INITIAL_RATING for row in rows if row["team"] == "team2"]
+    delta = 0.0
+    if team1 and team2:
+        delta = float(team1_delta(
+            sum(team1) / len(team1), sum(team2) / len(team2),
+            score_team1, score_team2, settings.rating_k_factor,
+        ))
+    for row in rows:
+        row["rating_delta"] = delta if row["team"] == "team1" else -delta
+        change[row["player_id"]] += row["rating_delta"]
+        ratings[row["player_id"]] = (ratings.get(row["player_id"]) or INITIAL_RATING) + row["rating_delta"]
+    return change
+
+
+async def apply_rating_changes(db: AsyncSession, change: dict[int, float]) -> None:
+    params = [
+        {"b_player_id": player_id, "b_rating": value}
+        for player_id, value in change.items()
+        if value
+    ]
+    if params:
+        await db.execute(increment_player_rating, params)
+
+
+def _waves(row_pos: np.ndarray, row_player: np.ndarray, n_matches: int, n_players: int) -> np.ndarray:
+    """Wave number per match; rows must be sorted by match position."""
+    last = [0] * n_players
+    wave = [0] * n_matches
+    positions = row_pos.tolist()
+    players = row_player.tolist()
+    i, n = 0, len(positions)
+    while i < n:
+        pos = positions[i]
+        j, w = i, 0
+        while j < n and positions[j] == pos:
+            w = max(w, last[players[j]])
+            j += 1
+        w += 1
+        wave[pos] = w
+        for t in range(i, j):
+            last[players[t]] = w
+        i = j
+    return np.array(wave, dtype=np.int64)
+
+
+def replay_ratings(
+    db: Session,
+    apply: bool = False,
+    k: float | None = None,
+    chunk_size: int = 100_000,
+    progress: Progress | None = None,
+) -> dict:
+    """Re-rate every completed match in order from INITIAL_RATING."""
+    started = time.perf_counter()
+    k = settings.rating_k_factor if k is None else k
+    conn = db.connection()
+
+    stored = rows_to_array(
+        conn.execute(
+            select(Player.id, func.coalesce(Player.rating, INITIAL_RATING)).order_by(Player.id)
+        ).all(),
+        2,
+        np.float64,
+    )
+    player_ids = stored[:, 0].astype(np.int64)
+    ratings = np.full(len(player_ids), INITIAL_RATING)
+
+    matches = rows_to_array(
+        conn.execute(
+            select(
+                Match.id,
+                func.coalesce(Match.score_team1, 0),
+                func.coalesce(Match.score_team2, 0),
+            )
+            .where(Match.status == "Completed")
+            .order_by(Match.scheduled_at.asc().nulls_last(), Match.id.asc())
+        ).all(),
+        3,
+    )
+    match_ids, scores1, scores2 = matches[:, 0], matches[:, 1], matches[:, 2]
+
+    stmt = (
+        select(MatchPlayer.id, MatchPlayer.match_id, MatchPlayer.player_id, MatchPlayer.team == "team1")
+        .join(Match, Match.id == MatchPlayer.match_id)
+        .where(Match.status == "Completed")
+        .execution_options(yield_per=chunk_size)
+    )
+    chunks = [rows_to_array(chunk, 4) for chunk in conn.execute(stmt).partitions()]
+    rows = np.concatenate(chunks) if chunks else np.zeros((0, 4), dtype=np.int64)
+
+    # Chronological position of each row's match and index of each row's player
+    by_id = np.argsort(match_ids)
+    row_pos = by_id[np.searchsorted(match_ids, rows[:, 1], sorter=by_id)]
+    row_player = np.searchsorted(player_ids, rows[:, 2])
+    row_team1 = rows[:, 3].astype(bool)
+
+    order = np.argsort(row_pos, kind="stable")
+    row_pos, row_player, row_team1 = row_pos[order], row_player[order], row_team1[order]
+    row_ids = rows[order, 0]
+
+    wave = _waves(row_pos, row_player, len(match_ids), len(player_ids))
+    row_wave = wave[row_pos]
+    by_wave = np.argsort(row_wave, kind="stable")
+    bounds = np.searchsorted(row_wave[by_wave], np.arange(1, (wave.max() if len(wave) else 0) + 2))
+    row_delta = np.zeros(len(row_ids))
+    n_waves = len(bounds) - 1
+
+    for w, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]), 1):
+        sel = by_wave[start:stop]
+        local, inverse = np.unique(row_pos[sel], return_inverse=True)
+        slot = inverse * 2 + (~row_team1[sel])
+        players = row_player[sel]
+        sums = np.bincount(slot, weights=ratings[players], minlength=2 * len(local)).reshape(-1, 2)
+        counts = np.bincount(slot, minlength=2 * len(local)).reshape(-1, 2)
+        means = sums / np.maximum(counts, 1)
+        delta = team1_delta(means[:, 0], means[:, 1], scores1[local], scores2[local], k)
+        delta[(counts == 0).any(axis=1)] = 0.0
+        deltas = np.where(row_team1[sel], delta[inverse], -delta[inverse])
+        np.add.at(ratings, players, deltas)
+        row_delta[sel] = deltas
+        if progress:
+            progress(w / n_waves, f"Rated wave {w} of {n_waves}")
+
+    changed = np.abs(ratings - stored[:, 1])
+    report = {
+        "players": len(player_ids),
+        "matches": len(match_ids),
+        "rows": len(row_ids),
+        "waves": int(wave.max()) if len(wave) else 0,
+        "max_rating_change": round(float(changed.max()), 3) if len(changed) else 0.0,
+        "rated_s": round(time.perf_counter() - started, 3),
+        "applied": False,
+    }
+
+    if apply:
+        if len(player_ids):
+            db.execute(set_player_rating, [
+                {"b_player_id": int(pid), "b_rating": float(rating)}
+                for pid, rating in zip(player_ids, ratings)
+            ])
+        if len(row_ids):
+            db.execute(set_rating_delta, [
+                {"b_row_id": int(row_id), "b_delta": float(delta)}
+                for row_id, delta in zip(row_ids, row_delta)
+            ])
+        db.commit()
+        report["applied"] = True
+
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def run_replay(apply: bool = False, progress: Progress | None = None) -> dict:
+    """Replay on a fresh sync session (for threads, jobs and the CLI)."""
+    with SessionLocal() as db:
+        return replay_ratings(db, apply=apply, progress=progress)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Re-rate every completed match in order")
+    parser.add_argument("--apply", action="store_true", help="write the replayed ratings back")
+    args = parser.parse_args()
+
+    print(json.dumps(run_replay(apply=args.apply), indent=2))
+
+
+if __name__ == "__main__":
+    main()
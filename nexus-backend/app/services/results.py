@@ -0,0 +1,280 @@
+"""Recording match results: player score rows, stat counters and ratings.
+
+`record_results` applies one or many results inside the caller's
+transaction, holding row locks on their matches until it commits.
+Everything it needs is fetched up front with one query per table. Each
+result is checked in memory, and accepted results are written with one
+DELETE, one bulk INSERT and one executemany per counter, however many
+there are.
+
+A Live match fed by game server events has running totals
+(app.services.live_scores). A result that leaves out the player lists is
+reconciled against the match_events log rather than those totals, so sums
+a crashed worker never flushed still count: its score must equal the
+logged points per team, and the final lineup is both teams' rosters plus
+anyone else who scored, with the logged points (zero for rostered players
+without events). A result with player lists overrides the live totals, as
+a referee correction.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import Match
+from app.models.match_event import MatchEvent
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.schemas.player import MatchResultWithScores, PlayerScoreInput
+from app.services.ratings import apply_rating_changes, rate_rows
+from app.services.teams import roster_ids
+
+
+players_table = Player.__table__
+
+# One statement, executed as an executemany over every affected player.
+# Increments happen in SQL so concurrent submissions can't lose updates.
+increment_player_stats = (
+    update(players_table)
+    .where(players_table.c.id == bindparam("b_player_id"))
+    .values(
+        wins=players_table.c.wins + bindparam("b_wins"),
+        losses=players_table.c.losses + bindparam("b_losses"),
+        total_points=players_table.c.total_points + bindparam("b_points"),
+    )
+)
+
+
+def winner_of(score_team1: int, score_team2: int) -> str:
+    return "team1" if score_team1 > score_team2 else "team2"
+
+
+def match_player_rows(match_id: int, result: MatchResultWithScores) -> list[dict]:
+    rows = [
+        {"match_id": match_id, "player_id": p.player_id, "team": "team1", "score": p.score}
+        for p in result.team1_players
+    ]
+    rows += [
+        {"match_id": match_id, "player_id": p.player_id, "team": "team2", "score": p.score}
+        for p in result.team2_players
+    ]
+    return rows
+
+
+def stat_deltas(rows: list[dict], winner_team: str) -> dict[int, list[int]]:
+    """Aggregate match_players rows into per-player [wins, losses, points]."""
+    deltas: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+    for row in rows:
+        delta = deltas[row["player_id"]]
+        if row["team"] == winner_team:
+            delta[0] += 1
+        else:
+            delta[1] += 1
+        delta[2] += row["score"]
+    return deltas
+
+
+def net_deltas(new: dict[int, list[int]], old: dict[int, list[int]]) -> dict[int, list[int]]:
+    """Per-player difference new - old, so a resubmission only moves what changed."""
+    net: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+    for player_id, delta in new.items():
+        net[player_id] = list(delta)
+    for player_id, (wins, losses, points) in old.items():
+        delta = net[player_id]
+        delta[0] -= wins
+        delta[1] -= losses
+        delta[2] -= points
+    return net
+
+
+async def apply_stat_deltas(db: AsyncSession, deltas: dict[int, list[int]]) -> None:
+    params = [
+        {"b_player_id": player_id, "b_wins": wins, "b_losses": losses, "b_points": points}
+        for player_id, (wins, losses, points) in deltas.items()
+        if wins or losses or points
+    ]
+    if params:
+        await db.execute(increment_player_stats, params)
+
+
+async def insert_match_players(db: AsyncSession, rows: list[dict]) -> None:
+    if rows:
+        await db.execute(insert(MatchPlayer), rows)
+
+
+def score_mismatch(result: MatchResultWithScores) -> str | None:
+    """Why the player scores don't add up to the match score, if they don't."""
+    team1_sum = sum(p.score for p in result.team1_players)
+    team2_sum = sum(p.score for p in result.team2_players)
+    if team1_sum != result.score_team1:
+        return f"Team 1 player scores ({team1_sum}) do not match match score ({result.score_team1})"
+    if team2_sum != result.score_team2:
+        return f"Team 2 player scores ({team2_sum}) do not match match score ({result.score_team2})"
+    return None
+
+
+def live_result(
+    match: Match,
+    result: MatchResultWithScores,
+    logged: dict[tuple[str, int], int],
+    rosters: dict[int, list[int]],
+) -> tuple[MatchResultWithScores, tuple[int, str] | None]:
+    """The result with its lineups taken from the event log, or why it can't be.
+
+    `logged` holds the match's summed event points per (team, player id).
+    """
+    if not logged:
+        return result, (400, "Player scores are required: the match has no live events")
+    live = {"team1": 0, "team2": 0}
+    for (team, _), points in logged.items():
+        live[team] += points
+    if (result.score_team1, result.score_team2) != (live["team1"], live["team2"]):
+        return result, (
+            409,
+            f"Final score {result.score_team1}-{result.score_team2} does not match the live totals "
+            f"{live['team1']}-{live['team2']}; send player scores to override",
+        )
+    lineups: dict[str, dict[int, int]] = {"team1": {}, "team2": {}}
+    for team, team_id in (("team1", match.team1_id), ("team2", match.team2_id)):
+        for player_id in rosters.get(team_id, ()):
+            lineups[team][player_id] = 0
+    for (team, player_id), points in logged.items():
+        lineups[team][player_id] = points
+    return result.model_copy(update={
+        team: [PlayerScoreInput(player_id=player_id, score=score) for player_id, score in lineup.items()]
+        for team, lineup in (("team1_players", lineups["team1"]), ("team2_players", lineups["team2"]))
+    }), None
+
+
+@dataclass(slots=True)
+class ResultOutcome:
+    match_id: int
+    status_code: int = 200
+    error: str | None = None
+    match: Match | None = None
+
+
+async def record_results(
+    db: AsyncSession,
+    submissions: list[tuple[int, MatchResultWithScores]],
+) -> tuple[list[ResultOutcome], set[int]]:
+    """Validate and apply (match_id, result) pairs; the caller commits.
+
+    Returns one outcome per submission, in order, and the ids of every
+    player whose counters changed. A resubmitted match only moves counters
+    and ratings by the difference from its previous result.
+    """
+    outcomes = [ResultOutcome(match_id) for match_id, _ in submissions]
+    match_ids = {match_id for match_id, _ in submissions}
+    # Locked until the caller commits, so an overlapping submission for the same match waits and
+    # then sees this result as the previous one instead of applying its full deltas a second time.
+    # Locks are taken in id order so two batches can't deadlock.
+    matches = {
+        match.id: match
+        for match in (await db.scalars(
+            select(Match).where(Match.id.in_(match_ids)).order_by(Match.id)
+            .with_for_update().execution_options(populate_existing=True)
+        )).all()
+    }
+
+    # Completed matches: the previous result, to reverse
+    previous_rows: dict[int, list] = defaultdict(list)
+    with_rows = [match.id for match in matches.values() if match.status == "Completed"]
+    if with_rows:
+        for row in (await db.execute(
+            select(MatchPlayer.match_id, MatchPlayer.player_id, MatchPlayer.team,
+                   MatchPlayer.score, MatchPlayer.rating_delta)
+            .where(MatchPlayer.match_id.in_(with_rows))
+        )).mappings():
+            previous_rows[row["match_id"]].append(row)
+
+    # Live matches reconciled without player lists: the logged points and both teams' rosters
+    reconciled = {
+        match_id for match_id, result in submissions
+        if match_id in matches and matches[match_id].status == "Live"
+        and (result.team1_players is None or result.team2_players is None)
+    }
+    logged: dict[int, dict[tuple[str, int], int]] = defaultdict(dict)
+    rosters: dict[int, list[int]] = {}
+    if reconciled:
+        for match_id, team, player_id, points in await db.execute(
+            select(MatchEvent.match_id, MatchEvent.team, MatchEvent.player_id, func.sum(MatchEvent.points))
+            .where(MatchEvent.match_id.in_(reconciled))
+            .group_by(MatchEvent.match_id, MatchEvent.team, MatchEvent.player_id)
+        ):
+            logged[match_id][team, player_id] = points
+        rosters = await roster_ids(db, [
+            team_id for match_id in reconciled
+            for team_id in (matches[match_id].team1_id, matches[match_id].team2_id) if team_id is not None
+        ])
+
+    results = []
+    for outcome, (match_id, result) in zip(outcomes, submissions):
+        match = matches.get(match_id)
+        if match is None:
+            outcome.status_code, outcome.error = 404, "Match not found"
+        elif result.team1_players is None or result.team2_players is None:
+            result, error = live_result(match, result, logged[match_id] if match_id in reconciled else {}, rosters)
+            if error:
+                outcome.status_code, outcome.error = error
+        results.append(result)
+
+    submitted_ids = {
+        p.player_id
+        for outcome, result in zip(outcomes, results)
+        if not outcome.error
+        for p in (*result.team1_players, *result.team2_players)
+    }
+    previous_ids = {row["player_id"] for rows in previous_rows.values() for row in rows}
+    ratings = dict((await db.execute(
+        select(Player.id, Player.rating).where(Player.id.in_(submitted_ids | previous_ids))
+    )).all())
+
+    stat_change: dict[int, list[int]] = defaultdict(lambda: [0, 0, 0])
+    rating_change: dict[int, float] = defaultdict(float)
+    new_rows: list[dict] = []
+    recorded: set[int] = set()
+    for outcome, result in zip(outcomes, results):
+        if outcome.error:
+            continue
+        match_id = outcome.match_id
+        match = matches[match_id]
+        player_ids = [p.player_id for p in (*result.team1_players, *result.team2_players)]
+        if match_id in recorded:
+            outcome.status_code, outcome.error = 400, "Match submitted more than once"
+        elif error := score_mismatch(result):
+            outcome.status_code, outcome.error = 400, error
+        elif len(set(player_ids)) != len(player_ids) or not ratings.keys() >= set(player_ids):
+            outcome.status_code, outcome.error = 404, "One or more players not found"
+        if outcome.error:
+            continue
+
+        previous = previous_rows.get(match_id, [])
+        old_stats = stat_deltas(previous, winner_of(match.score_team1 or 0, match.score_team2 or 0))
+        rows = match_player_rows(match_id, result)
+        new_stats = stat_deltas(rows, winner_of(result.score_team1, result.score_team2))
+        for player_id, (wins, losses, points) in net_deltas(new_stats, old_stats).items():
+            total = stat_change[player_id]
+            total[0] += wins
+            total[1] += losses
+            total[2] += points
+        for player_id, value in rate_rows(
+            rows, ratings, result.score_team1, result.score_team2, previous
+        ).items():
+            rating_change[player_id] += value
+        new_rows += rows
+
+        match.score_team1 = result.score_team1
+        match.score_team2 = result.score_team2
+        match.status = "Completed"
+        match.room_code = None  # recycled; see app.services.room_codes
+        outcome.match = match
+        recorded.add(match_id)
+
+    if recorded:
+        await db.execute(delete(MatchPlayer).where(MatchPlayer.match_id.in_(recorded)))
+        await insert_match_players(db, new_rows)
+        await apply_stat_deltas(db, stat_change)
+        await apply_rating_changes(db, rating_change)
+    return outcomes, set(stat_change) | set(rating_change)
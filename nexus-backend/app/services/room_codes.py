@@ -0,0 +1,139 @@
+"""Room code allocation for matches.
+
+Codes are 6 characters from an alphabet without look-alikes (no 0/O, 1/I/L),
+about 890 million combinations. Uniqueness is enforced by the unique index
+on matches.room_code. The allocator draws codes that are not active in its
+map and writes them all in one executemany. If another worker raced it to
+a code, the unique index rejects the write, the savepoint around it rolls
+back (leaving the rest of the caller's transaction alone) and fresh codes
+are drawn, a bounded number of times. The caller commits.
+
+Codes are only held by matches that are still being played: a match that
+reaches "Completed" gives its code back (the column is set to NULL), so
+the active set stays small and codes get reused.
+
+Lookups are served from an in-process code -> match id map. On a miss the
+database is checked, so codes allocated by other workers still resolve.
+"""
+import secrets
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.match import Match
+
+
+ALPHABET = "ABCDEFGHJKMNPQRSTUVWXYZ23456789"
+CODE_LENGTH = 6
+MAX_ATTEMPTS = 8
+
+matches_table = Match.__table__
+
+set_room_code = (
+    update(matches_table)
+    .where(matches_table.c.id == bindparam("b_match_id"))
+    .values(room_code=bindparam("b_code"))
+)
+
+
+class RoomCodesExhausted(Exception):
+    pass
+
+
+def generate_room_code() -> str:
+    return "".join(secrets.choice(ALPHABET) for _ in range(CODE_LENGTH))
+
+
+class RoomCodeAllocator:
+    def __init__(self) -> None:
+        self._match_by_code: dict[str, int] = {}
+        self._code_by_match: dict[int, str] = {}
+        self.loaded = False
+        self.collisions = 0
+
+    def __len__(self) -> int:
+        return len(self._match_by_code)
+
+    async def ensure_loaded(self, db: AsyncSession) -> None:
+        if self.loaded:
+            return
+        rows = await db.execute(select(Match.room_code, Match.id).where(Match.room_code.is_not(None)))
+        for code, match_id in rows:
+            self._register(code, match_id)
+        self.loaded = True
+
+    def _register(self, code: str, match_id: int) -> None:
+        old = self._code_by_match.get(match_id)
+        if old is not None and old != code:
+            self._match_by_code.pop(old, None)
+        self._match_by_code[code] = match_id
+        self._code_by_match[match_id] = code
+
+    def release(self, match_id: int) -> None:
+        """Forget a match's code once it has been cleared in the database."""
+        code = self._code_by_match.pop(match_id, None)
+        if code is not None and self._match_by_code.get(code) == match_id:
+            del self._match_by_code[code]
+
+    def refresh(self, match_id: int, code: str | None) -> None:
+        """Take a match's current code as read from the database (None: it has none)."""
+        if code is None:
+            self.release(match_id)
+        elif self.loaded:
+            self._register(code, match_id)
+
+    def reset(self) -> None:
+        self._match_by_code.clear()
+        self._code_by_match.clear()
+        self.loaded = False
+
+    def _draw(self, count: int) -> list[str]:
+        codes: set[str] = set()
+        while len(codes) < count:
+            code = generate_room_code()
+            if code not in self._match_by_code:
+                codes.add(code)
+        return list(codes)
+
+    async def allocate(self, db: AsyncSession, match_ids: list[int]) -> dict[int, str]:
+        """Give each match a fresh code, replacing any code it had; the caller commits.
+
+        Codes enter the lookup map right away. Should the caller's commit
+        fail, the stale entries are caught where lookups are checked against
+        the match row (see the referee validate-code route).
+        """
+        await self.ensure_loaded(db)
+        if not match_ids:
+            return {}
+        for _ in range(MAX_ATTEMPTS):
+            assigned = dict(zip(match_ids, self._draw(len(match_ids))))
+            try:
+                async with db.begin_nested():
+                    await db.execute(set_room_code, [
+                        {"b_match_id": match_id, "b_code": code} for match_id, code in assigned.items()
+                    ])
+            except IntegrityError:
+                # Another worker took one of these codes first
+                self.collisions += 1
+                continue
+            for match_id, code in assigned.items():
+                self._register(code, match_id)
+            return assigned
+        raise RoomCodesExhausted(f"Could not allocate room codes after {MAX_ATTEMPTS} attempts")
+
+    async def lookup(self, db: AsyncSession, code: str) -> int | None:
+        """Match id holding `code`, or None."""
+        await self.ensure_loaded(db)
+        code = code.strip().upper()
+        match_id = self._match_by_code.get(code)
+        if match_id is not None:
+            return match_id
+        # Possibly allocated by another worker since we loaded
+        match_id = await db.scalar(select(Match.id).where(Match.room_code == code))
+        if match_id is not None:
+            self._register(code, match_id)
+        return match_id
+
+
+room_codes = RoomCodeAllocator()
@@ -0,0 +1,259 @@
+"""Time slot and station assignment for a tournament's fixtures.
+
+Time inside the given windows is cut into slots of `match_minutes`, and
+every station hosts at most one match per slot. Matches are placed one at a
+time in dependency order (a side named "Winner W1-3" waits for match W1-3),
+each at the earliest slot where
+
+- a station is free,
+- every match it depends on has finished, plus the rest time, and
+- neither team has another match within the rest time.
+
+The earliest slot with a free station is found through a union-find "next
+non-full slot" array, so full slots are skipped in near-constant time
+however crowded the calendar gets. A candidate slot that clashes with one
+of a team's matches (usually one pinned in place) is repaired by jumping
+past the clash and searching again. Matches that cannot fit before the last
+window closes, and the matches that depend on them, are reported as
+unscheduled rather than placed badly.
+
+Live and Completed matches are pinned, as are already scheduled ones unless
+`reschedule` is set: they keep their slot and station and the rest of the
+field is scheduled around them.
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+import re
+import time
+
+from sqlalchemy import bindparam, update
+
+from app.models.match import Match
+from app.services.fixtures import BRACKET_PREFIXES
+
+
+MAX_SLOTS = 100_000
+
+PLACEHOLDER = re.compile(r"^(?:Winner|Loser) ([A-Z]+\d+-\d+)$")
+
+matches_table = Match.__table__
+
+set_match_slot = (
+    update(matches_table)
+    .where(matches_table.c.id == bindparam("b_match_id"))
+    .values(scheduled_at=bindparam("b_scheduled_at"), station=bindparam("b_station"))
+)
+
+
+@dataclass(slots=True)
+class Placement:
+    match_id: int
+    scheduled_at: datetime
+    station: str
+
+
+def _naive_utc(value: datetime) -> datetime:
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def slot_starts(windows: list[tuple[datetime, datetime]], match_minutes: int) -> list[datetime]:
+    """Start times of every slot; overlapping windows are merged first so slots never overlap."""
+    if match_minutes <= 0:
+        raise ValueError("match_minutes must be positive")
+    merged: list[list[datetime]] = []
+    for start, end in sorted((_naive_utc(start), _naive_utc(end)) for start, end in windows):
+        if end <= start:
+            raise ValueError("Each window must end after it starts")
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    step = timedelta(minutes=match_minutes)
+    starts = []
+    for start, end in merged:
+        count = int((end - start) / step)
+        if len(starts) + count > MAX_SLOTS:
+            raise ValueError(f"Windows hold more than {MAX_SLOTS} slots; use longer matches or shorter windows")
+        starts.extend(start + i * step for i in range(count))
+    return starts
+
+
+def dependencies(matches: list[dict]) -> dict[int, list[int]]:
+    """match id -> ids of the matches its placeholder sides come from."""
+    labels: dict[str, int] = {}
+    numbers: dict[tuple[str, int], int] = defaultdict(int)
+    # Matches are numbered within their bracket round in insertion (id) order, as built by app.services.fixtures
+    for match in sorted(matches, key=lambda m: m["id"]):
+        prefix = BRACKET_PREFIXES.get(match["bracket"])
+        if prefix and match["round_number"]:
+            key = (match["bracket"], match["round_number"])
+            numbers[key] += 1
+            labels[f"{prefix}{match['round_number']}-{numbers[key]}"] = match["id"]
+    deps = {}
+    for match in matches:
+        sources = []
+        for name in (match["team1_name"], match["team2_name"]):
+            found = PLACEHOLDER.match(name)
+            if found and found.group(1) in labels:
+                sources.append(labels[found.group(1)])
+        deps[match["id"]] = sources
+    return deps
+
+
+def _team_keys(match: dict) -> list:
+    keys = []
+    for team_id, name in ((match["team1_id"], match["team1_name"]), (match["team2_id"], match["team2_name"])):
+        if team_id is not None:
+            keys.append(team_id)
+        elif not PLACEHOLDER.match(name):
+            keys.append(name)  # ad-hoc match between named teams
+    return keys
+
+
+def plan_schedule(
+    matches: list[dict],
+    stations: list[str],
+    windows: list[tuple[datetime, datetime]],
+    match_minutes: int,
+    rest_minutes: int = 0,
+    reschedule: bool = False,
+) -> tuple[list[Placement], dict]:
+    """Assign a slot and station to each unpinned match of one tournament.
+
+    `matches` are MatchOut-shaped dicts. Pure: nothing is written. Raises
+    ValueError for unusable windows or stations.
+    """
+    started = time.perf_counter()
+    if not stations or len(set(stations)) != len(stations):
+        raise ValueError("Stations must be a non-empty list of distinct names")
+    starts = slot_starts(windows, match_minutes)
+    if not starts:
+        raise ValueError("The windows are too short for a single match")
+    origin = starts[0]
+    seconds = [int((start - origin).total_seconds()) for start in starts]
+    duration = match_minutes * 60
+    rest = rest_minutes * 60
+    n_slots, n_stations = len(seconds), len(stations)
+    station_index = {name: i for i, name in enumerate(stations)}
+
+    used: dict[int, set[int]] = defaultdict(set)
+    next_open = list(range(n_slots + 1))  # union-find: slot -> a later slot that may still have room
+
+    def find_open(i: int) -> int:
+        root = i
+        while next_open[root] != root:
+            root = next_open[root]
+        while next_open[i] != root:
+            next_open[i], i = root, next_open[i]
+        return root
+
+    def occupy(slot: int, station: int) -> None:
+        used[slot].add(station)
+        if len(used[slot]) >= n_stations:
+            next_open[slot] = slot + 1
+
+    team_busy: dict[object, list[tuple[int, int]]] = defaultdict(list)
+    finish: dict[int, int | None] = {}  # match id -> end second; None when done at an unknown time
+
+    def clash(keys: list, start: int, end: int) -> int | None:
+        """End of the latest match of these teams too close to [start, end), if any."""
+        latest = None
+        for key in keys:
+            busy = team_busy[key]
+            j = bisect_left(busy, (end + rest,)) - 1
+            if j >= 0 and busy[j][1] + rest > start:
+                latest = max(latest or 0, busy[j][1])
+        return latest
+
+    pinned, todo = [], []
+    for match in matches:
+        if match["status"] != "Scheduled" or (match["scheduled_at"] is not None and not reschedule):
+            pinned.append(match)
+        else:
+            todo.append(match)
+
+    for match in pinned:
+        if match["scheduled_at"] is None:
+            finish[match["id"]] = None
+            continue
+        start = int((_naive_utc(match["scheduled_at"]) - origin).total_seconds())
+        finish[match["id"]] = start + duration
+        for key in _team_keys(match):
+            insort(team_busy[key], (start, start + duration))
+        slot = bisect_left(seconds, start)
+        if slot < n_slots and seconds[slot] == start and match["station"] in station_index:
+            occupy(slot, station_index[match["station"]])
+
+    deps = dependencies(matches)
+    depth: dict[int, int] = {}
+
+    def depth_of(match_id: int) -> int:
+        # Iterative: long double-elimination chains would overflow recursion
+        stack = [match_id]
+        while stack:
+            current = stack[-1]
+            pending = [d for d in deps.get(current, ()) if d not in depth]
+            if pending:
+                stack.extend(pending)
+                continue
+            depth[current] = 1 + max((depth[d] for d in deps.get(current, ())), default=0)
+            stack.pop()
+        return depth[match_id]
+
+    todo.sort(key=lambda m: (depth_of(m["id"]), m["round_number"] or 0, m["id"]))
+
+    placements: list[Placement] = []
+    unscheduled: list[int] = []
+    for match in todo:
+        ready = seconds[0]
+        blocked = False
+        for dep in deps[match["id"]]:
+            if dep not in finish:
+                blocked = True  # its source match could not be placed
+                break
+            if finish[dep] is not None:
+                ready = max(ready, finish[dep] + rest)
+        if blocked:
+            unscheduled.append(match["id"])
+            continue
+
+        keys = _team_keys(match)
+        slot = find_open(bisect_left(seconds, ready))
+        while slot < n_slots:
+            start = seconds[slot]
+            busy_until = clash(keys, start, start + duration)
+            if busy_until is None:
+                break
+            slot = find_open(bisect_left(seconds, busy_until + rest))
+        if slot >= n_slots:
+            unscheduled.append(match["id"])
+            continue
+
+        station = 0
+        while station in used[slot]:
+            station += 1
+        occupy(slot, station)
+        start = seconds[slot]
+        finish[match["id"]] = start + duration
+        for key in keys:
+            insort(team_busy[key], (start, start + duration))
+        placements.append(Placement(match["id"], starts[slot], stations[station]))
+
+    times = [placement.scheduled_at for placement in placements]
+    report = {
+        "matches": len(matches),
+        "scheduled": len(placements),
+        "pinned": len(pinned),
+        "unscheduled": unscheduled,
+        "slots": n_slots,
+        "stations": n_stations,
+        "first_start": min(times) if times else None,
+        "last_end": max(times) + timedelta(minutes=match_minutes) if times else None,
+        "elapsed_s": round(time.perf_counter() - started, 3),
+        "applied": False,
+    }
+    return placements, report
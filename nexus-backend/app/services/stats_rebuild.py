@@ -0,0 +1,153 @@
+"""Offline rebuild of Player.wins/losses/total_points from match_players.
+
+Completed-match rows are streamed in chunks (server-side cursor where the
+driver supports it) and summed per player with `np.bincount`, so the work
+per chunk is a handful of vectorized passes rather than a Python loop per
+row. The result is compared with the stored counters; drifted players are
+reported and, with `apply=True`, overwritten in one executemany.
+An optional `progress(fraction, message)` callback is called per chunk (it
+is how background jobs report progress and get cancelled).
+
+    python -m app.services.stats_rebuild [--apply] [--chunk-size N]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+
+from app.core.arrays import rows_to_array
+from app.db.session import SessionLocal
+from app.models.match import Match
+from app.models.match_player import MatchPlayer
+from app.models.player import Player
+from app.services.jobs import Progress
+
+
+players_table = Player.__table__
+
+set_player_stats = (
+    update(players_table)
+    .where(players_table.c.id == bindparam("b_player_id"))
+    .values(
+        wins=bindparam("b_wins"),
+        losses=bindparam("b_losses"),
+        total_points=bindparam("b_points"),
+    )
+)
+
+
+def expected_stats(
+    db: Session,
+    player_ids: np.ndarray,
+    chunk_size: int = 100_000,
+    progress: Progress | None = None,
+) -> tuple[np.ndarray, int]:
+    """Recompute [wins, losses, points] per player (rows aligned with sorted `player_ids`)."""
+    n = len(player_ids)
+    totals = np.zeros((3, n), dtype=np.int64)
+    completed_rows = (
+        select(MatchPlayer.id)
+        .join(Match, Match.id == MatchPlayer.match_id)
+        .where(Match.status == "Completed")
+    )
+    # Only worth a count when someone is watching
+    total_rows = db.scalar(select(func.count()).select_from(completed_rows.subquery())) if progress else 0
+    stmt = (
+        select(
+            MatchPlayer.player_id,
+            MatchPlayer.team == "team1",
+            MatchPlayer.score,
+            func.coalesce(Match.score_team1, 0) > func.coalesce(Match.score_team2, 0),
+        )
+        .join(Match, Match.id == MatchPlayer.match_id)
+        .where(Match.status == "Completed")
+        .execution_options(yield_per=chunk_size)
+    )
+    rows_seen = 0
+    # Core-level execute: no ORM row processing on the hot path
+    for chunk in db.connection().execute(stmt).partitions():
+        block = rows_to_array(chunk, 4)
+        rows_seen += len(block)
+        idx = np.searchsorted(player_ids, block[:, 0])
+        won = block[:, 1] == block[:, 3]
+        totals[0] += np.bincount(idx[won], minlength=n)
+        totals[1] += np.bincount(idx[~won], minlength=n)
+        totals[2] += np.bincount(idx, weights=block[:, 2], minlength=n).astype(np.int64)
+        if progress:
+            progress(rows_seen / max(total_rows, 1), f"Summed {rows_seen} of {total_rows} rows")
+    return totals, rows_seen
+
+
+def rebuild_player_stats(
+    db: Session,
+    apply: bool = False,
+    chunk_size: int = 100_000,
+    sample_size: int = 20,
+    progress: Progress | None = None,
+) -> dict:
+    """Recompute every player's counters and report (optionally fix) drift."""
+    started = time.perf_counter()
+    stored = rows_to_array(
+        db.connection().execute(
+            select(Player.id, Player.wins, Player.losses, Player.total_points).order_by(Player.id)
+        ).all(),
+        4,
+    )
+    player_ids = stored[:, 0]
+    expected, rows_seen = expected_stats(db, player_ids, chunk_size, progress)
+    expected = expected.T
+
+    drifted = np.flatnonzero((stored[:, 1:] != expected).any(axis=1))
+    report = {
+        "players": len(player_ids),
+        "rows": rows_seen,
+        "drifted": len(drifted),
+        "samples": [
+            {
+                "player_id": int(player_ids[i]),
+                "stored": dict(zip(("wins", "losses", "total_points"), map(int, stored[i, 1:]))),
+                "expected": dict(zip(("wins", "losses", "total_points"), map(int, expected[i]))),
+            }
+            for i in drifted[:sample_size]
+        ],
+        "applied": False,
+    }
+
+    if apply and len(drifted):
+        db.execute(set_player_stats, [
+            {
+                "b_player_id": int(player_ids[i]),
+                "b_wins": int(expected[i, 0]),
+                "b_losses": int(expected[i, 1]),
+                "b_points": int(expected[i, 2]),
+            }
+            for i in drifted
+        ])
+        db.commit()
+        report["applied"] = True
+
+    report["elapsed_s"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+def run_rebuild(apply: bool = False, chunk_size: int = 100_000, progress: Progress | None = None) -> dict:
+    """Rebuild on a fresh sync session (for threads, jobs and the CLI)."""
+    with SessionLocal() as db:
+        return rebuild_player_stats(db, apply=apply, chunk_size=chunk_size, progress=progress)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild player stats from match_players")
+    parser.add_argument("--apply", action="store_true", help="write corrected counters back")
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    args = parser.parse_args()
+
+    report = run_rebuild(apply=args.apply, chunk_size=args.chunk_size)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
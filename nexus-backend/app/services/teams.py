@@ -0,0 +1,59 @@
+"""Tournament teams and their rosters."""
+from collections import defaultdict
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models.player import Player
+from app.models.team import Team
+from app.models.team_member import TeamMember
+
+
+def tournament_teams(db: Session, tournament_id: int, default_count: int) -> list[Team]:
+    """The tournament's teams in seed order, creating "Team 1".."Team N" if it has none yet.
+
+    Sync, for fixture generation in a job thread or through `AsyncSession.run_sync`.
+    Does not commit.
+    """
+    teams = list(db.scalars(
+        select(Team).where(Team.tournament_id == tournament_id).order_by(Team.seed.asc().nulls_last(), Team.id)
+    ))
+    if teams:
+        return teams
+    rows = [{"tournament_id": tournament_id, "name": f"Team {i}", "seed": i} for i in range(1, default_count + 1)]
+    return list(db.scalars(insert(Team).returning(Team), rows))
+
+
+async def team_count(db: AsyncSession, tournament_id: int, default_count: int) -> int:
+    """How many teams fixture generation will pair (see `tournament_teams`)."""
+    return await db.scalar(select(func.count()).select_from(Team).where(Team.tournament_id == tournament_id)) or default_count
+
+
+async def missing_players(db: AsyncSession, player_ids: set[int]) -> bool:
+    if not player_ids:
+        return False
+    found = await db.scalar(select(func.count()).select_from(Player).where(Player.id.in_(player_ids)))
+    return found != len(player_ids)
+
+
+async def roster_ids(db: AsyncSession, team_ids: list[int]) -> dict[int, list[int]]:
+    """team id -> member player ids, in one query."""
+    rosters: dict[int, list[int]] = defaultdict(list)
+    if team_ids:
+        for team_id, player_id in await db.execute(
+            select(TeamMember.team_id, TeamMember.player_id)
+            .where(TeamMember.team_id.in_(team_ids))
+            .order_by(TeamMember.id)
+        ):
+            rosters[team_id].append(player_id)
+    return rosters
+
+
+async def replace_roster(db: AsyncSession, team_id: int, player_ids: list[int]) -> list[int]:
+    """Set the team's members; returns the previous member ids. Does not commit."""
+    previous = list(await db.scalars(select(TeamMember.player_id).where(TeamMember.team_id == team_id)))
+    await db.execute(delete(TeamMember).where(TeamMember.team_id == team_id))
+    if player_ids:
+        await db.execute(insert(TeamMember), [{"team_id": team_id, "player_id": pid} for pid in player_ids])
+    return previous
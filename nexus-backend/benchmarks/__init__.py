@@ -0,0 +1,5 @@
+"""Benchmarks and load tests, run from nexus-backend as `python -m benchmarks.<name>`.
+
+Start with `benchmarks.seed` for scale data and `benchmarks.load` for the
+hot-endpoint latency report; the others each measure one change in isolation.
+"""
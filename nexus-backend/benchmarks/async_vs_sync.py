@@ -0,0 +1,101 @@
+"""Requests/sec for the sync (threadpool) and async session stacks.
+
+Serves the same read (one match by id) through a sync `def` route backed by
+`SessionLocal` and an `async def` route backed by `AsyncSessionLocal`, then
+hammers each over real HTTP with a fixed number of concurrent clients.
+
+    python -m benchmarks.async_vs_sync --requests 5000 --concurrency 200
+
+Run it against the Postgres you care about (DATABASE_URL); SQLite has no
+network round trip, so it mostly measures framework overhead.
+"""
+import argparse
+import asyncio
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi import Depends, FastAPI, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.db.session import engine, get_db, get_sync_db, SessionLocal
+from app.models import Base, Match, Tournament
+
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync/matches/{match_id}")
+def sync_get_match(match_id: int, db: Session = Depends(get_sync_db)):
+    match = db.get(Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404)
+    return {"id": match.id, "status": match.status}
+
+
+@bench_app.get("/async/matches/{match_id}")
+async def async_get_match(match_id: int, db: AsyncSession = Depends(get_db)):
+    match = await db.get(Match, match_id)
+    if not match:
+        raise HTTPException(status_code=404)
+    return {"id": match.id, "status": match.status}
+
+
+def seed() -> int:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        tournament = Tournament(name="bench")
+        db.add(tournament)
+        db.flush()
+        match = Match(tournament_id=tournament.id, team1_name="A", team2_name="B")
+        db.add(match)
+        db.commit()
+        return match.id
+
+
+async def drive(url: str, total: int, concurrency: int) -> float:
+    remaining = total
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            response = await client.get(url)
+            response.raise_for_status()
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=60) as client:
+        await client.get(url)  # warm the pool
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    match_id = seed()
+    server = uvicorn.Server(uvicorn.Config(bench_app, port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        for mode in ("sync", "async"):
+            url = f"http://127.0.0.1:{args.port}/{mode}/matches/{match_id}"
+            rps = asyncio.run(drive(url, args.requests, args.concurrency))
+            print(f"{mode:>5}: {rps:8.1f} req/s  ({args.requests} requests, {args.concurrency} concurrent)")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
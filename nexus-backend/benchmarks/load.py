@@ -0,0 +1,309 @@
+"""Latency and throughput of the hot endpoints, as JSON that can be compared across commits.
+
+Drives the real app against a database seeded by benchmarks.seed, either
+in-process through httpx's ASGI transport (no sockets, measures the app
+alone) or over HTTP against `uvicorn app.main:app` started as a subprocess
+(with --workers). Each scenario runs --requests requests from --concurrency
+concurrent clients after a short warm-up, and reports throughput and
+p50/p95/p99/max latency:
+
+- leaderboard: GET /leaderboard, random pages, both orderings
+- matches:     GET /matches, first pages of random tournaments, some filtered by status
+- referee:     POST /referee/matches/{id}/result, walking the Scheduled matches
+- login:       POST /auth/login as seeded players (bcrypt cost is BCRYPT_ROUNDS)
+
+    python -m benchmarks.seed --reset --scale 0.1
+    python -m benchmarks.load --transport asgi --out before.json
+    python -m benchmarks.load --transport uvicorn --workers 4 --out after.json --compare before.json
+
+--compare prints the change per scenario and exits 1 when p95 latency rose or
+throughput fell by more than --threshold percent.
+
+The referee scenario completes the matches it submits, so reseed (same
+--seed, same data) before each run you want to compare.
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable
+
+import httpx
+from sqlalchemy import func, select
+
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.db.session import SessionLocal, engine
+from app.models import Match, Player, Tournament, User
+from app.models.match_player import MatchPlayer
+from benchmarks.seed import PASSWORD, REFEREE_EMAIL
+
+
+settings = get_settings()
+API = settings.api_v1_prefix
+SCENARIOS = ("leaderboard", "matches", "referee", "login")
+
+
+@dataclass
+class Fixture:
+    """What the scenarios need to know about the seeded data."""
+    player_ids: list[int]
+    player_emails: list[str]
+    tournament_ids: list[int]
+    scheduled_match_ids: list[int]
+    referee_headers: dict[str, str]
+    counts: dict[str, int]
+
+
+def load_fixture(scheduled_limit: int) -> Fixture:
+    with SessionLocal() as db:
+        referee = db.scalar(select(User).where(User.email == REFEREE_EMAIL))
+        if referee is None:
+            raise SystemExit("No benchmark data found; run `python -m benchmarks.seed --reset` first")
+        token = create_access_token({"sub": referee.email, "role": referee.role, "id": referee.id, "is_active": True})
+        return Fixture(
+            player_ids=list(db.scalars(select(Player.id))),
+            player_emails=list(db.scalars(select(User.email).where(User.role == "player").limit(10_000))),
+            tournament_ids=list(db.scalars(select(Tournament.id))),
+            scheduled_match_ids=list(db.scalars(
+                select(Match.id).where(Match.status == "Scheduled").order_by(Match.id).limit(scheduled_limit)
+            )),
+            referee_headers={"Authorization": f"Bearer {token}"},
+            counts={
+                "players": db.scalar(select(func.count()).select_from(Player)),
+                "matches": db.scalar(select(func.count()).select_from(Match)),
+                "match_players": db.scalar(select(func.count()).select_from(MatchPlayer)),
+            },
+        )
+
+
+# Each scenario turns (fixture, rng, request number) into httpx.request arguments
+
+def leaderboard_request(fixture: Fixture, rng: random.Random, n: int) -> dict:
+    by = "rating" if n % 4 == 0 else "points"
+    offset = rng.randrange(max(len(fixture.player_ids) - 50, 1))
+    return {"method": "GET", "url": f"{API}/leaderboard", "params": {"offset": offset, "limit": 50, "by": by}}
+
+
+def matches_request(fixture: Fixture, rng: random.Random, n: int) -> dict:
+    params = {"tournament_id": rng.choice(fixture.tournament_ids), "limit": 50}
+    if n % 2:
+        params["status"] = "Completed"
+    return {"method": "GET", "url": f"{API}/matches", "params": params}
+
+
+def referee_request(fixture: Fixture, rng: random.Random, n: int) -> dict:
+    match_id = fixture.scheduled_match_ids[n % len(fixture.scheduled_match_ids)]
+    picked = rng.sample(fixture.player_ids, 4)
+    team1 = [{"player_id": player_id, "score": rng.randint(0, 10)} for player_id in picked[:2]]
+    team2 = [{"player_id": player_id, "score": rng.randint(0, 10)} for player_id in picked[2:]]
+    body = {
+        "score_team1": sum(p["score"] for p in team1),
+        "score_team2": sum(p["score"] for p in team2),
+        "team1_players": team1,
+        "team2_players": team2,
+    }
+    return {
+        "method": "POST",
+        "url": f"{API}/referee/matches/{match_id}/result",
+        "json": body,
+        "headers": fixture.referee_headers,
+    }
+
+
+def login_request(fixture: Fixture, rng: random.Random, n: int) -> dict:
+    email = fixture.player_emails[n % len(fixture.player_emails)]
+    return {"method": "POST", "url": f"{API}/auth/login", "data": {"username": email, "password": PASSWORD}}
+
+
+REQUESTS: dict[str, Callable[[Fixture, random.Random, int], dict]] = {
+    "leaderboard": leaderboard_request,
+    "matches": matches_request,
+    "referee": referee_request,
+    "login": login_request,
+}
+
+
+def summarize(latencies: list[float], statuses: dict[int, int], elapsed: float, concurrency: int) -> dict:
+    if len(latencies) > 1:
+        quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    else:
+        quantiles = [latencies[0] if latencies else 0.0] * 99
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": sum(count for status, count in statuses.items() if status >= 400),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(quantiles[49], 2),
+        "p95_ms": round(quantiles[94], 2),
+        "p99_ms": round(quantiles[98], 2),
+        "max_ms": round(max(latencies, default=0.0), 2),
+    }
+
+
+def warmup_count(total: int) -> int:
+    return min(max(total // 10, 1), 50)
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, name: str, fixture: Fixture, total: int, concurrency: int, seed: int,
+) -> dict:
+    make_request = REQUESTS[name]
+    rng = random.Random(seed)
+    warmup = warmup_count(total)
+    for n in range(warmup):
+        await client.request(**make_request(fixture, rng, n))
+
+    latencies: list[float] = []
+    statuses: dict[int, int] = {}
+    issued = 0
+
+    async def worker() -> None:
+        nonlocal issued
+        while issued < total:
+            n = issued
+            issued += 1
+            kwargs = make_request(fixture, rng, warmup + n)
+            start = time.perf_counter()
+            response = await client.request(**kwargs)
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, time.perf_counter() - start, concurrency)
+
+
+async def run_all(client: httpx.AsyncClient, args, fixture: Fixture) -> dict:
+    results = {}
+    for name in args.scenarios:
+        concurrency = min(args.concurrency, args.login_concurrency) if name == "login" else args.concurrency
+        total = args.login_requests if name == "login" else args.requests
+        results[name] = await run_scenario(client, name, fixture, total, concurrency, args.seed)
+        print(f"{name:>12}: {json.dumps(results[name])}", file=sys.stderr)
+    return results
+
+
+async def run_asgi(args, fixture: Fixture) -> dict:
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            return await run_all(client, args, fixture)
+
+
+async def run_uvicorn(args, fixture: Fixture) -> dict:
+    server = subprocess.Popen([
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--port", str(args.port), "--workers", str(args.workers), "--log-level", "warning",
+    ])
+    base_url = f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+            deadline = time.monotonic() + 60
+            while True:
+                try:
+                    (await client.get("/openapi.json")).raise_for_status()
+                    break
+                except httpx.HTTPError:
+                    if time.monotonic() > deadline or server.poll() is not None:
+                        raise SystemExit("uvicorn did not come up")
+                    await asyncio.sleep(0.2)
+            return await run_all(client, args, fixture)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(__file__), text=True, stderr=subprocess.DEVNULL,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """Print per-scenario changes; True if anything regressed past `threshold` percent."""
+    regressed = False
+    print(f"{'scenario':>12} {'p50':>9} {'p95':>9} {'p99':>9} {'rps':>9}")
+    for name, now in current["scenarios"].items():
+        before = baseline["scenarios"].get(name)
+        if not before:
+            continue
+        change = {
+            key: (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            for key in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        }
+        flag = change["p95_ms"] > threshold or change["throughput_rps"] < -threshold
+        regressed |= flag
+        print(
+            f"{name:>12} {change['p50_ms']:>+8.1f}% {change['p95_ms']:>+8.1f}% {change['p99_ms']:>+8.1f}%"
+            f" {change['throughput_rps']:>+8.1f}%{'  REGRESSED' if flag else ''}"
+        )
+    return regressed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transport", choices=("asgi", "uvicorn"), default="asgi")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8767)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--login-requests", type=int, default=200, help="logins are bcrypt-bound, so fewer by default")
+    parser.add_argument("--login-concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", help="a previous report to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    needed = args.requests + warmup_count(args.requests)
+    fixture = load_fixture(scheduled_limit=needed)
+    if "referee" in args.scenarios and len(fixture.scheduled_match_ids) < needed:
+        raise SystemExit(
+            f"The referee scenario needs {needed} Scheduled matches, found {len(fixture.scheduled_match_ids)};"
+            " reseed with `python -m benchmarks.seed --reset`"
+        )
+    runner = run_asgi if args.transport == "asgi" else run_uvicorn
+    scenarios = asyncio.run(runner(args, fixture))
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "database": engine.dialect.name,
+        "data": fixture.counts,
+        "transport": args.transport,
+        "workers": args.workers if args.transport == "uvicorn" else None,
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "scenarios": scenarios,
+    }
+    body = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as out:
+            out.write(body + "\n")
+    print(body)
+    if args.compare:
+        with open(args.compare) as f:
+            if compare(json.load(f), report, args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
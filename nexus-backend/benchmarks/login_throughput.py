@@ -0,0 +1,117 @@
+"""Login throughput under concurrency, and what it does to everyone else.
+
+Starts the real app under uvicorn, fires concurrent logins for a fixed
+duration, and probes GET /leaderboard alongside them. It reports logins/sec,
+how many logins were shed with 503, and the probe latency, which is the
+number that used to collapse during a login storm.
+
+    python -m benchmarks.login_throughput --concurrency 64 --seconds 10
+    PASSWORD_HASH_WORKERS=0 python -m benchmarks.login_throughput   # threadpool baseline
+"""
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app.core.config import get_settings
+from app.core.security import get_password_hash
+from app.db.session import engine, SessionLocal
+from app.main import app
+from app.models import Base, User
+
+
+settings = get_settings()
+PASSWORD = "bench-password"
+
+
+def seed(users: int) -> list[str]:
+    Base.metadata.create_all(bind=engine)
+    hashed = get_password_hash(PASSWORD)
+    emails = [f"bench-login-{i}@example.com" for i in range(users)]
+    with SessionLocal() as db:
+        existing = {email for (email,) in db.query(User.email).filter(User.email.in_(emails))}
+        db.add_all(
+            User(email=email, hashed_password=hashed, role="player")
+            for email in emails
+            if email not in existing
+        )
+        db.commit()
+    return emails
+
+
+async def run(base_url: str, emails: list[str], concurrency: int, seconds: float) -> dict:
+    deadline = time.perf_counter() + seconds
+    counts = {"ok": 0, "shed": 0, "failed": 0}
+    probe_latencies: list[float] = []
+
+    async def login_worker(client: httpx.AsyncClient, worker: int) -> None:
+        i = worker
+        while time.perf_counter() < deadline:
+            response = await client.post(
+                f"{base_url}{settings.api_v1_prefix}/auth/login",
+                data={"username": emails[i % len(emails)], "password": PASSWORD},
+            )
+            if response.status_code == 200:
+                counts["ok"] += 1
+            elif response.status_code == 503:
+                counts["shed"] += 1
+                await asyncio.sleep(float(response.headers.get("Retry-After", "1")))
+            else:
+                counts["failed"] += 1
+            i += concurrency
+
+    async def probe(client: httpx.AsyncClient) -> None:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await client.get(f"{base_url}{settings.api_v1_prefix}/leaderboard")
+            probe_latencies.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=concurrency + 1)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        start = time.perf_counter()
+        await asyncio.gather(probe(client), *(login_worker(client, w) for w in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    quantiles = statistics.quantiles(probe_latencies, n=100) if len(probe_latencies) > 1 else [0.0] * 99
+    return {
+        "hash_workers": settings.password_hash_workers,
+        "bcrypt_rounds": settings.bcrypt_rounds,
+        "concurrency": concurrency,
+        "logins_per_sec": round(counts["ok"] / elapsed, 1),
+        **counts,
+        "probe_p50_ms": round(quantiles[49], 1),
+        "probe_p95_ms": round(quantiles[94], 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    emails = seed(args.users)
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    try:
+        result = asyncio.run(run(f"http://127.0.0.1:{args.port}", emails, args.concurrency, args.seconds))
+        for key, value in result.items():
+            print(f"{key:>16}: {value}")
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Wall time of app.services.scheduler on a synthetic field, with the result checked.
+
+Builds a tournament-sized field in memory (no database): round-robin groups
+plus double-elimination brackets from app.services.fixtures, numbered as
+persist_fixtures would insert them. Schedules it across --stations stations
+over daily windows, then verifies every constraint on the output (one match
+per station per slot, no team within the rest time of itself, no match
+before the matches it depends on have finished plus rest).
+
+    python -m benchmarks.scheduler --matches 5000 --stations 200 --rest 15
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime, timedelta
+import json
+
+from app.services.fixtures import double_elimination, round_robin
+from app.services.scheduler import dependencies, plan_schedule
+
+
+def build_field(matches: int, group_size: int, bracket_size: int) -> list[dict]:
+    rows: list[dict] = []
+    team_ids: dict[str, int] = {}
+
+    def add(fixtures, prefix: str) -> None:
+        for fixture in fixtures:
+            names = [f"{prefix}{fixture.team1_name}", f"{prefix}{fixture.team2_name}"]
+            ids = [None if name.startswith((f"{prefix}Winner", f"{prefix}Loser"))
+                   else team_ids.setdefault(name, len(team_ids) + 1) for name in names]
+            # Placeholders keep their bare label so the scheduler can resolve them per bracket block
+            rows.append({
+                "id": len(rows) + 1,
+                "team1_name": names[0] if ids[0] else fixture.team1_name,
+                "team2_name": names[1] if ids[1] else fixture.team2_name,
+                "team1_id": ids[0],
+                "team2_id": ids[1],
+                "round_number": fixture.round_number,
+                "bracket": fixture.bracket,
+                "status": "Scheduled",
+                "scheduled_at": None,
+                "station": None,
+            })
+
+    block = 0
+    while len(rows) < matches:
+        block += 1
+        teams = [f"Team {i}" for i in range(1, group_size + 1)]
+        add(round_robin(teams), f"G{block} ")
+        if bracket_size and len(rows) < matches and block == 1:
+            # One bracket: labels are per tournament, so a second would collide
+            add(double_elimination([f"Team {i}" for i in range(1, bracket_size + 1)]), "DE ")
+    return rows[:matches]
+
+
+def verify(rows: list[dict], placements, match_minutes: int, rest_minutes: int) -> list[str]:
+    problems = []
+    duration, rest = timedelta(minutes=match_minutes), timedelta(minutes=rest_minutes)
+    by_id = {row["id"]: row for row in rows}
+    at = {p.match_id: p for p in placements}
+
+    seen = set()
+    for p in placements:
+        if (p.scheduled_at, p.station) in seen:
+            problems.append(f"station {p.station} double-booked at {p.scheduled_at}")
+        seen.add((p.scheduled_at, p.station))
+
+    per_team = defaultdict(list)
+    for p in placements:
+        row = by_id[p.match_id]
+        for team_id in (row["team1_id"], row["team2_id"]):
+            if team_id is not None:
+                per_team[team_id].append(p.scheduled_at)
+    for team_id, starts in per_team.items():
+        starts.sort()
+        for a, b in zip(starts, starts[1:]):
+            if b < a + duration + rest:
+                problems.append(f"team {team_id} plays at {a} and {b}")
+
+    for match_id, sources in dependencies(rows).items():
+        if match_id not in at:
+            continue
+        for source in sources:
+            if source not in at:
+                problems.append(f"match {match_id} scheduled before its source {source}")
+            elif at[match_id].scheduled_at < at[source].scheduled_at + duration + rest:
+                problems.append(f"match {match_id} starts before source {source} finished")
+    return problems
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--matches", type=int, default=5000)
+    parser.add_argument("--stations", type=int, default=200)
+    parser.add_argument("--group-size", type=int, default=16, help="teams per round-robin group")
+    parser.add_argument("--bracket-size", type=int, default=256, help="teams in the double-elimination bracket")
+    parser.add_argument("--match-minutes", type=int, default=30)
+    parser.add_argument("--rest", type=int, default=15, help="rest minutes between a team's matches")
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    rows = build_field(args.matches, args.group_size, args.bracket_size)
+    day = datetime(2026, 1, 1, 10)
+    windows = [(day + timedelta(days=d), day + timedelta(days=d, hours=10)) for d in range(args.days)]
+    stations = [f"Station {i}" for i in range(1, args.stations + 1)]
+
+    timings = []
+    for _ in range(args.repeat):
+        placements, report = plan_schedule(rows, stations, windows, args.match_minutes, args.rest)
+        timings.append(report["elapsed_s"])
+    problems = verify(rows, placements, args.match_minutes, args.rest)
+
+    print(json.dumps({
+        "matches": len(rows),
+        "stations": len(stations),
+        "scheduled": report["scheduled"],
+        "unscheduled": len(report["unscheduled"]),
+        "slots": report["slots"],
+        "first_start": str(report["first_start"]),
+        "last_end": str(report["last_end"]),
+        "best_s": min(timings),
+        "violations": len(problems),
+        "examples": problems[:5],
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""Deterministic scale data for benchmarks: users, players, tournaments, matches, lineups.
+
+Fills the database named by DATABASE_URL (SQLite or Postgres) with:
+
+- one admin, one referee and --users player accounts, all with the password
+  PASSWORD (hashed once, at the configured BCRYPT_ROUNDS);
+- --matches matches split into tournaments of --per-tournament, of which
+  --scheduled are left "Scheduled" for result submission benchmarks and the
+  rest are "Completed" with a --lineup player lineup each (so the defaults
+  give 100k players, 1M matches and ~9.5M match_players rows).
+
+Ids are assigned here rather than by the database, so every row can be
+generated without reading anything back. Postgres is loaded with COPY,
+anything else with executemany in --batch sized chunks. Player counters are
+then rebuilt from the lineups (app.services.stats_rebuild) so the
+leaderboard has something to rank; --ratings also replays Elo ratings.
+
+    python -m benchmarks.seed --reset                  # full scale
+    python -m benchmarks.seed --reset --scale 0.01     # 1k players, 10k matches
+
+The same --seed always produces the same data.
+"""
+import argparse
+import csv
+from datetime import datetime, timedelta
+import io
+import json
+import math
+import random
+import time
+from typing import Iterator
+
+from sqlalchemy import func, select, text
+
+from app.core.security import get_password_hash
+from app.db.session import engine
+from app.models import Base, Match, Player, Tournament, User
+from app.models.match_player import MatchPlayer
+from app.services.ratings import run_replay
+from app.services.stats_rebuild import run_rebuild
+
+
+PASSWORD = "bench-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+REFEREE_EMAIL = "bench-referee@example.com"
+START = datetime(2026, 1, 1)
+SQLITE_DATETIME = "%Y-%m-%d %H:%M:%S.%f"
+
+
+def player_email(i: int) -> str:
+    return f"bench-player-{i}@example.com"
+
+
+def users(count: int, hashed: str) -> Iterator[tuple]:
+    yield (1, ADMIN_EMAIL, hashed, "admin", True)
+    yield (2, REFEREE_EMAIL, hashed, "referee", True)
+    for i in range(1, count + 1):
+        yield (i + 2, player_email(i), hashed, "player", True)
+
+
+def players(count: int) -> Iterator[tuple]:
+    for i in range(1, count + 1):
+        yield (i, i + 2, f"Player {i}", 0, 0, 0, 1500.0)
+
+
+def tournaments(count: int, per_tournament: int) -> Iterator[tuple]:
+    for i in range(1, count + 1):
+        yield (i, f"Bench Cup {i}", START, per_tournament, "Ongoing")
+
+
+def matches_and_lineups(
+    rng: random.Random, count: int, per_tournament: int, scheduled: float, player_count: int, lineup: int, block: int,
+) -> Iterator[tuple[list[tuple], list[tuple]]]:
+    """Match rows, and the match_players rows of the completed ones, `block` matches at a time."""
+    per_team = max(lineup // 2, 1)
+    row_id = 0
+    for first in range(1, count + 1, block):
+        match_rows, lineup_rows = [], []
+        for match_id in range(first, min(first + block, count + 1)):
+            tournament_id = (match_id - 1) // per_tournament + 1
+            index = (match_id - 1) % per_tournament
+            team1, team2 = f"Team {2 * index % 64 + 1}", f"Team {2 * index % 64 + 2}"
+            scheduled_at = START + timedelta(minutes=10 * match_id)
+            if rng.random() < scheduled:
+                match_rows.append((match_id, tournament_id, team1, team2, scheduled_at, "Scheduled", None, None, index // 32 + 1))
+                continue
+            picked = rng.sample(range(1, player_count + 1), per_team * 2)
+            scores = [rng.randint(0, 10) for _ in picked]
+            for k, (player_id, score) in enumerate(zip(picked, scores)):
+                row_id += 1
+                lineup_rows.append((row_id, match_id, player_id, "team1" if k < per_team else "team2", score))
+            match_rows.append((
+                match_id, tournament_id, team1, team2, scheduled_at, "Completed",
+                sum(scores[:per_team]), sum(scores[per_team:]), index // 32 + 1,
+            ))
+        yield match_rows, lineup_rows
+
+
+COLUMNS = {
+    User: ("id", "email", "hashed_password", "role", "is_active"),
+    Player: ("id", "user_id", "player_name", "wins", "losses", "total_points", "rating"),
+    Tournament: ("id", "name", "start_date", "number_of_teams", "status"),
+    Match: (
+        "id", "tournament_id", "team1_name", "team2_name", "scheduled_at", "status",
+        "score_team1", "score_team2", "round_number",
+    ),
+    MatchPlayer: ("id", "match_id", "player_id", "team", "score"),
+}
+
+
+def _chunks(rows, size: int) -> Iterator[list]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def copy_rows(model, rows, batch: int) -> int:
+    """COPY rows into `model`'s table through the psycopg2 connection."""
+    table, columns = model.__tablename__, COLUMNS[model]
+    statement = f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    raw = engine.raw_connection()
+    try:
+        with raw.cursor() as cursor:
+            for chunk in _chunks(rows, batch):
+                buffer = io.StringIO()
+                # COPY csv reads an unquoted empty field as NULL
+                csv.writer(buffer).writerows(
+                    ["" if value is None else value for value in row] for row in chunk
+                )
+                buffer.seek(0)
+                cursor.copy_expert(statement, buffer)
+                total += len(chunk)
+            cursor.execute(f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT max(id) FROM {table}))")
+        raw.commit()
+    finally:
+        raw.close()
+    return total
+
+
+def insert_rows(model, rows, batch: int) -> int:
+    """executemany straight on the DBAPI cursor; plain tuples skip per-row dict handling."""
+    columns = COLUMNS[model]
+    placeholder = "?" if engine.dialect.paramstyle == "qmark" else "%s"
+    statement = (
+        f"INSERT INTO {model.__tablename__} ({', '.join(columns)}) "
+        f"VALUES ({', '.join([placeholder] * len(columns))})"
+    )
+    if engine.dialect.name == "sqlite" and model in (Tournament, Match):
+        # Store datetimes the way SQLAlchemy's SQLite DateTime does, or range
+        # and keyset comparisons (done as strings) would be off
+        rows = (
+            tuple(value.strftime(SQLITE_DATETIME) if isinstance(value, datetime) else value for value in row)
+            for row in rows
+        )
+    total = 0
+    with engine.begin() as conn:
+        for chunk in _chunks(rows, batch):
+            conn.exec_driver_sql(statement, chunk)
+            total += len(chunk)
+    return total
+
+
+def seed(args) -> dict:
+    if args.reset:
+        Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.scalar(select(func.count()).select_from(User)):
+            raise SystemExit("Database is not empty; pass --reset to drop and recreate every table")
+
+    player_count = max(int(args.users * args.scale), 2 * max(args.lineup // 2, 1))
+    match_count = max(int(args.matches * args.scale), 1)
+    tournament_count = math.ceil(match_count / args.per_tournament)
+    load = copy_rows if engine.dialect.name == "postgresql" else insert_rows
+    rng = random.Random(args.seed)
+    timings = {}
+
+    def timed(name: str, model, rows) -> int:
+        start = time.perf_counter()
+        count = load(model, rows, args.batch)
+        timings[name] = round(time.perf_counter() - start, 2)
+        return count
+
+    counts = {
+        "users": timed("users", User, users(player_count, get_password_hash(PASSWORD))),
+        "players": timed("players", Player, players(player_count)),
+        "tournaments": timed("tournaments", Tournament, tournaments(tournament_count, args.per_tournament)),
+    }
+    counts.update(matches=0, scheduled_matches=0, match_players=0)
+    timings.update(matches=0.0, match_players=0.0)
+    for match_rows, lineup_rows in matches_and_lineups(
+        rng, match_count, args.per_tournament, args.scheduled, player_count, args.lineup, args.batch,
+    ):
+        for name, model, rows in (("matches", Match, match_rows), ("match_players", MatchPlayer, lineup_rows)):
+            start = time.perf_counter()
+            counts[name] += load(model, rows, args.batch)
+            timings[name] = round(timings[name] + time.perf_counter() - start, 2)
+        counts["scheduled_matches"] += sum(1 for row in match_rows if row[5] == "Scheduled")
+
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+    start = time.perf_counter()
+    run_rebuild(apply=True)
+    timings["stats_rebuild"] = round(time.perf_counter() - start, 2)
+    if args.ratings:
+        start = time.perf_counter()
+        run_replay(apply=True)
+        timings["ratings_replay"] = round(time.perf_counter() - start, 2)
+    return {"database": engine.dialect.name, "seed": args.seed, "counts": counts, "seconds": timings}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--matches", type=int, default=1_000_000)
+    parser.add_argument("--lineup", type=int, default=10, help="players per completed match, split across both teams")
+    parser.add_argument("--per-tournament", type=int, default=1000)
+    parser.add_argument("--scheduled", type=float, default=0.05, help="fraction of matches left Scheduled")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies --users and --matches")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch", type=int, default=50_000)
+    parser.add_argument("--ratings", action="store_true", help="also replay Elo ratings")
+    parser.add_argument("--reset", action="store_true", help="drop and recreate every table first")
+    args = parser.parse_args()
+
+    print(json.dumps(seed(args), indent=2))
+
+
+if __name__ == "__main__":
+    main()
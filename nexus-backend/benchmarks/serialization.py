@@ -0,0 +1,104 @@
+"""List-response encoding: ORM + response_model validation vs column rows + orjson.
+
+For each row count, seeds that many matches and players into a scratch
+SQLite database, then times building the JSON body of a full list both ways:
+
+- "orm": select(Model) -> ORM instances -> validate against list[Schema]
+  (from_attributes) -> to JSON-compatible python -> stdlib json, which is
+  what a `response_model=list[Schema]` route returning ORM objects costs;
+- "rows": select of the schema's columns -> dicts -> orjson, the path the
+  list routes use now (app.core.serialization).
+
+    python -m benchmarks.serialization --rows 10000 100000 --repeat 3
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import sessionmaker
+
+from app.core.serialization import dump_rows, select_for, type_adapter
+from app.models import Base, Match, Player, Tournament, User
+from app.schemas.match import MatchOut
+from app.schemas.player import PlayerOut
+
+
+def seed(url: str, rows: int) -> None:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(insert(Tournament), [{"name": "bench"}])
+        conn.execute(insert(Match), [
+            {
+                "tournament_id": 1,
+                "team1_name": f"Team {i}",
+                "team2_name": f"Team {i + 1}",
+                "status": "Scheduled",
+                "round_number": i % 16,
+                "bracket": "main",
+            }
+            for i in range(rows)
+        ])
+        conn.execute(insert(User), [
+            {"email": f"user{i}@bench", "hashed_password": "x", "role": "player"} for i in range(rows)
+        ])
+        conn.execute(insert(Player), [
+            {"user_id": i + 1, "player_name": f"Player {i}", "wins": i % 7, "losses": i % 5, "total_points": i}
+            for i in range(rows)
+        ])
+    engine.dispose()
+
+
+def orm_path(db, model, schema) -> bytes:
+    db.expunge_all()  # hydrate fresh instances every run, as a new request would
+    adapter = type_adapter(list[schema])
+    objects = db.scalars(select(model).order_by(model.id)).all()
+    content = adapter.dump_python(adapter.validate_python(objects, from_attributes=True), mode="json")
+    # Same settings as starlette's JSONResponse.render
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def rows_path(db, model, schema) -> bytes:
+    return dump_rows(schema, db.execute(select_for(schema, model).order_by(model.id)).all())
+
+
+def best_of(repeat: int, fn, *args) -> tuple[float, bytes]:
+    best, body = float("inf"), b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'table':<8} {'orm ms':>9} {'rows ms':>9} {'speedup':>8} {'bytes':>10}")
+    for count in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.sqlite')}"
+            seed(url, count)
+            engine = create_engine(url)
+            Session = sessionmaker(bind=engine)
+            for model, schema in ((Match, MatchOut), (Player, PlayerOut)):
+                with Session() as db:
+                    orm_s, orm_body = best_of(args.repeat, orm_path, db, model, schema)
+                    rows_s, rows_body = best_of(args.repeat, rows_path, db, model, schema)
+                # Both paths must produce the same document
+                assert json.loads(orm_body) == json.loads(rows_body)
+                print(
+                    f"{count:>8} {model.__tablename__:<8} {orm_s * 1000:>9.1f} {rows_s * 1000:>9.1f}"
+                    f" {orm_s / rows_s:>7.1f}x {len(rows_body):>10}"
+                )
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""WebSocket fan-out load test: N concurrent subscribers on one match.
+
+Starts the app under uvicorn in a subprocess, connects --clients WebSocket
+subscribers to /ws/matches/{id}, then pushes --updates match updates
+through PUT /matches/{id}. Per update it reports how long it took to reach
+the subscribers (p50/p95/p99/max). It also counts subscribers the server
+dropped as too slow.
+
+    python -m benchmarks.ws_load --clients 10000 --updates 20
+
+10k sockets need a matching open-file limit (the script raises its own soft
+limit; the server inherits it).
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+from websockets.asyncio.client import connect
+
+from app.core.config import get_settings
+from app.core.security import create_access_token
+from app.db.session import engine, SessionLocal
+from app.models import Base, Match, Tournament, User
+
+
+settings = get_settings()
+
+
+def seed() -> tuple[int, str]:
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        admin = db.query(User).filter(User.email == "bench-ws-admin@example.com").first()
+        if not admin:
+            admin = User(email="bench-ws-admin@example.com", hashed_password="!", role="admin")
+            db.add(admin)
+        tournament = Tournament(name="ws-load")
+        db.add(tournament)
+        db.flush()
+        match = Match(tournament_id=tournament.id, team1_name="A", team2_name="B")
+        db.add(match)
+        db.commit()
+        token = create_access_token({"sub": admin.email, "role": "admin", "id": admin.id, "is_active": True})
+        return match.id, token
+
+
+def raise_fd_limit(wanted: int) -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = min(max(soft, wanted), hard)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (target, hard))
+
+
+async def subscriber(url: str, received: dict[str, list[float]], stats: dict, ready: asyncio.Event) -> None:
+    try:
+        async with connect(url, open_timeout=60, max_queue=None) as ws:
+            stats["connected"] += 1
+            await ready.wait()
+            async for raw in ws:
+                now = time.perf_counter()
+                for message in json.loads(raw):
+                    status = message["data"].get("status")
+                    if status:
+                        received.setdefault(status, []).append(now)
+    except Exception as e:
+        if getattr(getattr(e, "rcvd", None), "code", None) == 1013:
+            stats["dropped"] += 1
+        else:
+            stats["errors"] += 1
+
+
+async def run(args, match_id: int, token: str) -> dict:
+    base = f"127.0.0.1:{args.port}{settings.api_v1_prefix}"
+    received: dict[str, list[float]] = {}
+    stats = {"connected": 0, "dropped": 0, "errors": 0}
+    ready = asyncio.Event()
+
+    tasks = []
+    for i in range(args.clients):
+        tasks.append(asyncio.create_task(subscriber(f"ws://{base}/ws/matches/{match_id}", received, stats, ready)))
+        if i % 500 == 499:
+            await asyncio.sleep(0.2)  # don't flood the accept queue
+    while stats["connected"] + stats["errors"] < args.clients:
+        await asyncio.sleep(0.1)
+    ready.set()
+
+    sent_at: dict[str, float] = {}
+    async with httpx.AsyncClient(headers={"Authorization": f"Bearer {token}"}, timeout=60) as client:
+        for i in range(args.updates):
+            status = f"Live-{i}"
+            sent_at[status] = time.perf_counter()
+            response = await client.put(f"http://{base}/matches/{match_id}", json={"status": status})
+            response.raise_for_status()
+            await asyncio.sleep(args.interval)
+    await asyncio.sleep(2)
+    for task in tasks:
+        task.cancel()
+
+    latencies = [
+        (arrived - sent_at[status]) * 1000
+        for status, arrivals in received.items()
+        for arrived in arrivals
+    ]
+    quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else [0.0] * 99
+    return {
+        "clients": args.clients,
+        **stats,
+        "updates": args.updates,
+        "deliveries": len(latencies),
+        "p50_ms": round(quantiles[49], 1),
+        "p95_ms": round(quantiles[94], 1),
+        "p99_ms": round(quantiles[98], 1),
+        "max_ms": round(max(latencies, default=0.0), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clients", type=int, default=10000)
+    parser.add_argument("--updates", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between updates")
+    parser.add_argument("--port", type=int, default=8767)
+    args = parser.parse_args()
+
+    raise_fd_limit(args.clients * 2 + 256)
+    match_id, token = seed()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(args.port),
+         "--log-level", "warning", "--ws-max-queue", "1", "--backlog", "4096"],
+        env=os.environ.copy(),
+    )
+    try:
+        deadline = time.time() + 30
+        while time.time() < deadline:
+            try:
+                httpx.get(f"http://127.0.0.1:{args.port}/docs")
+                break
+            except httpx.TransportError:
+                time.sleep(0.2)
+        result = asyncio.run(run(args, match_id, token))
+        print(json.dumps(result, indent=2))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Test settings: a throwaway SQLite database, no job worker threads.
+
+Settings are read when app modules are first imported, so the environment
+is set here before any test imports the app.
+"""
+import os
+import tempfile
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="nexus-tests-"), "test.sqlite")
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ.pop("READ_DATABASE_URLS", None)
+os.environ["JOB_WORKERS"] = "0"
+os.environ["INVALIDATION_BACKEND"] = "local"
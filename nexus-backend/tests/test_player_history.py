@@ -0,0 +1,118 @@
+"""Player history and profile: statements per request, ordering and cursors (app.services.history)."""
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+import pytest
+from sqlalchemy import event
+
+from app.db.session import SessionLocal, async_engine
+from app.main import app
+from app.models import Match, MatchPlayer, Player, Tournament, User
+
+
+MATCHES = 60
+LINEUP = 3  # players per side
+
+
+@pytest.fixture(scope="module")
+def seeded():
+    """Player 1's completed matches, scheduled out of id order, some unscheduled."""
+    with TestClient(app) as client:
+        with SessionLocal() as db:
+            users = [User(email=f"history{i}@example.com", hashed_password="x", role="player") for i in range(2 * LINEUP)]
+            db.add_all(users)
+            db.flush()
+            players = [Player(user_id=user.id, player_name=f"Player {i}") for i, user in enumerate(users)]
+            tournament = Tournament(name="History Cup", number_of_teams=2)
+            db.add_all([*players, tournament])
+            db.flush()
+            start = datetime(2026, 1, 1, 12)
+            for i in range(MATCHES):
+                match = Match(
+                    tournament_id=tournament.id,
+                    team1_name="Alpha",
+                    team2_name="Beta",
+                    status="Completed",
+                    score_team1=LINEUP * 2,
+                    score_team2=LINEUP,
+                    # Ids ascend while times jump around; every tenth match was never scheduled
+                    scheduled_at=None if i % 10 == 9 else start + timedelta(hours=(i * 37) % MATCHES),
+                )
+                db.add(match)
+                db.flush()
+                db.add_all(
+                    MatchPlayer(match_id=match.id, player_id=player.id, team="team1" if j < LINEUP else "team2",
+                                score=2 if j < LINEUP else 1)
+                    for j, player in enumerate(players)
+                )
+            db.commit()
+            player_id = players[0].id
+        yield client, player_id
+
+
+@pytest.fixture
+def statements():
+    executed: list[str] = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(async_engine.sync_engine, "before_cursor_execute", count)
+
+
+def statements_for(client: TestClient, executed: list[str], url: str) -> int:
+    executed.clear()
+    response = client.get(url)
+    assert response.status_code == 200, response.text
+    return len(executed)
+
+
+def test_history_statement_count_does_not_depend_on_page_size(seeded, statements):
+    client, player_id = seeded
+    counts = {
+        limit: statements_for(client, statements, f"/api/v1/players/{player_id}/history?limit={limit}")
+        for limit in (1, 2, 50)
+    }
+    # Player check, the keyset page, the lineups of every match on it
+    assert counts == {1: 3, 2: 3, 50: 3}
+
+
+def test_profile_statement_count_does_not_depend_on_page_size(seeded, statements):
+    client, player_id = seeded
+    client.get(f"/api/v1/players/{player_id}/profile?warm=1")  # loads the leaderboard index once
+    counts = {
+        limit: statements_for(client, statements, f"/api/v1/players/{player_id}/profile?limit={limit}")
+        for limit in (1, 2, 50)
+    }
+    # The player, the recent matches page, their lineups
+    assert counts == {1: 3, 2: 3, 50: 3}
+
+
+def test_history_pages_newest_first_by_schedule(seeded, statements):
+    client, player_id = seeded
+    entries, cursor, pages = [], None, 0
+    while True:
+        url = f"/api/v1/players/{player_id}/history?limit=7" + (f"&cursor={cursor}" if cursor else "")
+        assert statements_for(client, statements, url) == 3
+        body = client.get(url).json()
+        entries += body["items"]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+
+    assert pages == -(-MATCHES // 7)
+    assert len({entry["match_id"] for entry in entries}) == MATCHES
+    scheduled = [entry for entry in entries if entry["scheduled_at"] is not None]
+    unscheduled = entries[len(scheduled):]
+    assert all(entry["scheduled_at"] is None for entry in unscheduled)
+    assert len(unscheduled) == MATCHES // 10
+    keys = [(entry["scheduled_at"], entry["match_id"]) for entry in scheduled]
+    assert keys == sorted(keys, reverse=True)
+    assert [entry["match_id"] for entry in unscheduled] == sorted(
+        (entry["match_id"] for entry in unscheduled), reverse=True
+    )
+    first = entries[0]
+    assert first["result"] == "win" and len(first["teammates"]) == LINEUP - 1 and len(first["opponents"]) == LINEUP